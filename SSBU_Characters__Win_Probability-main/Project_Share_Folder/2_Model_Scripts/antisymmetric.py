@@ -0,0 +1,93 @@
+"""
+Antisymmetric wrapper for the binary matchup classifiers
+
+The pairwise features are char1 - char2 differences, so swapping the two
+characters negates them and swaps the labels. A model fitted on one
+orientation does not know that, and P(A beats B) and 1 - P(B beats A) can
+disagree. AntisymmetricClassifier makes the model antisymmetric in two ways:
+
+- fit() trains the base model on both orientations of every matchup, with
+  negated features and the opposite label.
+- predict_proba() averages both orientations,
+
+      P(char1 wins | x) = (p(Char1_Wins | x) + p(Char2_Wins | -x)) / 2
+
+  scoring them in a single call to the base model.
+
+P(A beats B) = 1 - P(B beats A) then holds exactly, for any base model.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+
+
+def _both_orientations(X):
+    """The rows of X followed by the same matchups with the characters swapped"""
+    if isinstance(X, pd.DataFrame):
+        return pd.concat([X, -X], ignore_index=True)
+    X = np.asarray(X, dtype=np.float64)
+    return np.concatenate([X, -X])
+
+
+class AntisymmetricClassifier(ClassifierMixin, BaseEstimator):
+    """Two-class classifier whose probabilities swap when the features change sign"""
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+
+    @classmethod
+    def from_fitted(cls, estimator):
+        """Wrap an already fitted two-class model, e.g. one loaded from the registry"""
+        wrapper = cls(estimator)
+        wrapper._set_fitted(estimator)
+        return wrapper
+
+    def _set_fitted(self, estimator):
+        if len(estimator.classes_) != 2:
+            raise ValueError(f"AntisymmetricClassifier needs two classes, got {list(estimator.classes_)}")
+        self.estimator_ = estimator
+        self.classes_ = estimator.classes_
+        self.n_features_in_ = estimator.n_features_in_
+        if hasattr(estimator, 'feature_names_in_'):
+            self.feature_names_in_ = estimator.feature_names_in_
+
+    @staticmethod
+    def _mirrored(X, y, sample_weight, classes):
+        """Rows, labels and fit parameters of both orientations"""
+        y = np.asarray(y)
+        mirrored = np.where(y == classes[0], classes[1], classes[0])
+        fit_params = {}
+        if sample_weight is not None:
+            fit_params['sample_weight'] = np.concatenate([sample_weight, sample_weight])
+        return _both_orientations(X), np.concatenate([y, mirrored]), fit_params
+
+    def fit(self, X, y, sample_weight=None):
+        """Fit a clone of the base model on every row and its mirror image"""
+        classes = np.unique(np.asarray(y))
+        if len(classes) != 2:
+            raise ValueError(f"AntisymmetricClassifier needs two classes, got {list(classes)}")
+        X_both, y_both, fit_params = self._mirrored(X, y, sample_weight, classes)
+        self._set_fitted(clone(self.estimator).fit(X_both, y_both, **fit_params))
+        return self
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """Update a base model that supports partial_fit with new rows and their mirror images"""
+        if not hasattr(self, 'estimator_'):
+            return self.fit(X, y, sample_weight)
+        X_both, y_both, fit_params = self._mirrored(X, y, sample_weight, self.classes_)
+        self.estimator_.partial_fit(X_both, y_both, **fit_params)
+        return self
+
+    def predict_proba(self, X):
+        """Class probabilities averaged over both orientations of every row"""
+        n_rows = len(X)
+        proba = self.estimator_.predict_proba(_both_orientations(X))
+        # Swapping the characters swaps the two classes
+        return (proba[:n_rows] + proba[n_rows:, ::-1]) / 2
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def feature_importances_(self):
+        return self.estimator_.feature_importances_
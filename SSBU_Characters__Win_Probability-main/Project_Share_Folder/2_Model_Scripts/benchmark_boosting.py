@@ -0,0 +1,144 @@
+"""
+Fit-time scaling of exact vs histogram gradient boosting
+
+Training on the full tournament database means one row per set instead of
+one per character pair. This simulates that: rows are drawn from the
+pairwise feature table (with technical parameters) in proportion to
+total_games, and each row's outcome is a coin flip with the pair's win rate.
+Both backends then fit 100 depth-5 trees on 10k up to 10M rows:
+
+    exact  GradientBoostingClassifier, missing parameters filled with 0
+           (as build_enhanced_classifier.py does)
+    hist   HistGradientBoostingClassifier, missing parameters left as NaN
+
+Exact boosting is skipped once its linearly extrapolated fit time exceeds
+--exact-limit seconds; those rows are reported as estimates. Results are
+written to boosting_benchmark.csv.
+
+    python benchmark_boosting.py
+    python benchmark_boosting.py --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score
+
+from feature_store import load_pairwise_features
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+TEST_ROWS = 50_000
+
+
+def get_data_path(filename):
+    """Find data file in 1_Data_Files or current directory"""
+    script_dir = Path(__file__).parent
+    data_dir = script_dir.parent / "1_Data_Files"
+    if data_dir.exists():
+        file_path = data_dir / filename
+        if file_path.exists():
+            return str(file_path)
+    if Path(filename).exists():
+        return filename
+    return str(data_dir / filename) if data_dir.exists() else filename
+
+
+def simulate_sets(features, winrate, weights, n_rows, rng):
+    """n_rows simulated set results: pair features and whether char1 won"""
+    pairs = rng.choice(len(features), size=n_rows, p=weights)
+    X = features[pairs]
+    y = rng.random(n_rows) < winrate[pairs]
+    return X, y
+
+
+def make_model(backend):
+    """100 depth-5 trees with learning rate 0.1 in both backends"""
+    if backend == 'hist':
+        # Fixed number of iterations so both backends do the same work
+        return HistGradientBoostingClassifier(max_iter=100, max_depth=5, learning_rate=0.1,
+                                              early_stopping=False, random_state=42)
+    return GradientBoostingClassifier(n_estimators=100, max_depth=5, learning_rate=0.1, random_state=42)
+
+
+def time_fit(backend, X, y, X_test, y_test):
+    """(fit seconds, test accuracy) of one backend"""
+    if backend == 'exact':
+        X, X_test = np.nan_to_num(X, nan=0.0), np.nan_to_num(X_test, nan=0.0)
+    model = make_model(backend)
+    start = time.perf_counter()
+    model.fit(X, y)
+    seconds = time.perf_counter() - start
+    return seconds, accuracy_score(y_test, model.predict(X_test))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark exact vs histogram gradient boosting")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Training set sizes (default: 10k 100k 1M 10M)")
+    parser.add_argument('--exact-limit', type=float, default=600,
+                        help="Skip exact fits estimated to take longer than this many seconds (default: 600)")
+    parser.add_argument('--output', default='boosting_benchmark.csv')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    print("=" * 70)
+    print("GRADIENT BOOSTING BENCHMARK (EXACT VS HISTOGRAM)")
+    print("=" * 70)
+
+    print("\n1. Loading pairwise features...")
+    pairwise = load_pairwise_features(get_data_path('character_matchups.csv'), get_data_path('smash.csv'),
+                                      get_data_path('ultimate_param.csv'))
+    frame = pairwise.frame
+    features = frame[pairwise.feature_names].to_numpy(dtype=np.float32)
+    winrate = frame['char1_winrate'].to_numpy(dtype=np.float64)
+    games = frame['total_games'].to_numpy(dtype=np.float64)
+    weights = games / games.sum()
+    missing = np.isnan(features).any(axis=1).mean()
+    print(f"   {len(frame)} pairs, {len(pairwise.feature_names)} features, "
+          f"{missing:.1%} of pairs missing a technical parameter")
+
+    rng = np.random.default_rng(42)
+    X_test, y_test = simulate_sets(features, winrate, weights, TEST_ROWS, rng)
+
+    print(f"\n2. Fitting on {', '.join(f'{size:,}' for size in args.sizes)} simulated sets...")
+    rows = []
+    last_exact = None
+    for size in sorted(args.sizes):
+        X, y = simulate_sets(features, winrate, weights, size, rng)
+        for backend in ('exact', 'hist'):
+            if backend == 'exact' and last_exact is not None:
+                # Exact boosting scales roughly linearly with rows at fixed depth
+                estimate = last_exact[1] * size / last_exact[0]
+                if estimate > args.exact_limit:
+                    rows.append({'rows': size, 'backend': backend, 'fit_seconds': estimate,
+                                 'estimated': True, 'accuracy': np.nan})
+                    approx = f"~{estimate:.1f}"
+                    print(f"   {size:>11,} {backend:<6} {approx:>10}s  (estimated, not run)")
+                    continue
+            seconds, accuracy = time_fit(backend, X, y, X_test, y_test)
+            if backend == 'exact':
+                last_exact = (size, seconds)
+            rows.append({'rows': size, 'backend': backend, 'fit_seconds': seconds,
+                         'estimated': False, 'accuracy': accuracy})
+            print(f"   {size:>11,} {backend:<6} {seconds:10.1f}s  accuracy {accuracy:.4f}")
+        del X, y
+
+    print("\n3. Summary:")
+    results = pd.DataFrame(rows)
+    table = results.pivot(index='rows', columns='backend', values='fit_seconds')
+    table['speedup'] = table['exact'] / table['hist']
+    print(table.to_string(float_format=lambda value: f"{value:.1f}"))
+    results.to_csv(args.output, index=False)
+    print(f"\n   Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
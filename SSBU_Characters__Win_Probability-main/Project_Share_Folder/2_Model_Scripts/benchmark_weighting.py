@@ -0,0 +1,128 @@
+"""
+Games-weighted aggregated rows vs one row per set
+
+Compares three ways of training the binary classifiers on the same matchup
+train/test split (train_all_models.py):
+
+    matchup   one row per matchup, label = whoever wins the majority of sets
+              (what the build scripts do; 5 games count as much as 500)
+    weighted  two rows per matchup, one per outcome, weighted by its count
+              (train_all_models.py --weighting games)
+    per-set   one row per set, the table the weighted rows stand in for
+
+and reports training rows, fit time, matchup accuracy, set accuracy and the
+log loss per test set. --scale multiplies every win/loss count to see how
+the per-set table grows with a larger database while the weighted rows stay
+the same size. Results are written to weighting_benchmark.csv.
+
+    python benchmark_weighting.py
+    python benchmark_weighting.py --scale 1 10 100 --models logistic
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, log_loss
+
+from feature_store import load_pairwise_features
+from set_weights import binomial_rows, expand_sets, set_accuracy
+from train_all_models import MODELS, get_data_path, prepare_data
+
+# Model name -> key of train_all_models.MODELS
+BENCHMARK_MODELS = {
+    'logistic': 'logistic',
+    'random_forest': 'rf_classifier',
+    'gradient_boosting': 'gb_classifier',
+}
+
+MODES = ('matchup', 'weighted', 'per-set')
+
+
+def training_rows(mode, X, labels, wins, losses):
+    """(X, y, sample_weight) of one training mode"""
+    if mode == 'matchup':
+        return X, labels, None
+    if mode == 'weighted':
+        return binomial_rows(X, wins, losses)
+    X_sets, y_sets = expand_sets(X, wins, losses)
+    return X_sets, y_sets, None
+
+
+def evaluate(model, X_test, labels, wins, losses):
+    """Matchup accuracy, set accuracy and log loss per set on the test matchups"""
+    pred = model.predict(X_test)
+    X_sets, y_sets, weights = binomial_rows(X_test, wins, losses)
+    proba = model.predict_proba(X_sets)
+    return {
+        'matchup_accuracy': accuracy_score(labels, pred),
+        'set_accuracy': set_accuracy(pred, wins, losses),
+        'set_log_loss': log_loss(y_sets, proba, sample_weight=weights, labels=model.classes_),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark games-weighted training against per-set rows")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10],
+                        help="Multiply every win/loss count by these factors (default: 1 10)")
+    parser.add_argument('--models', nargs='+', choices=sorted(BENCHMARK_MODELS), default=list(BENCHMARK_MODELS))
+    parser.add_argument('--output', default='weighting_benchmark.csv')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    print("=" * 70)
+    print("WEIGHTED AGGREGATED ROWS VS PER-SET TRAINING")
+    print("=" * 70)
+
+    print("\n1. Loading pairwise features...")
+    matchups_path = get_data_path('character_matchups.csv')
+    smash_path = get_data_path('smash.csv')
+    attrs = load_pairwise_features(matchups_path, smash_path)
+    tech = load_pairwise_features(matchups_path, smash_path, get_data_path('ultimate_param.csv'))
+    arrays, splits, _ = prepare_data(attrs, tech)
+    train, test = splits['binary']['train'], splits['binary']['test']
+    X, labels = arrays['attrs'], arrays['binary']
+    print(f"   {len(train)} training / {len(test)} test matchups, "
+          f"{int(arrays['wins'][train].sum() + arrays['losses'][train].sum())} training sets")
+
+    print("\n2. Fitting...")
+    rows = []
+    for scale in args.scale:
+        wins, losses = arrays['wins'] * scale, arrays['losses'] * scale
+        for name in args.models:
+            probabilities = {}
+            for mode in MODES:
+                X_train, y_train, weights = training_rows(mode, X[train], labels[train], wins[train], losses[train])
+                model = MODELS[BENCHMARK_MODELS[name]]()
+                start = time.perf_counter()
+                model.fit(X_train, y_train, sample_weight=weights)
+                seconds = time.perf_counter() - start
+                scores = evaluate(model, X[test], labels[test], wins[test], losses[test])
+                probabilities[mode] = model.predict_proba(X[test])[:, 0]
+                rows.append({'scale': scale, 'model': name, 'mode': mode, 'train_rows': len(X_train),
+                             'fit_seconds': seconds, **scores})
+                print(f"   x{scale:<4} {name:<18} {mode:<9} {len(X_train):>9,} rows {seconds:8.2f}s  "
+                      f"matchup acc {scores['matchup_accuracy']:.4f}  set acc {scores['set_accuracy']:.4f}  "
+                      f"log loss {scores['set_log_loss']:.4f}")
+            # How closely the weighted fit reproduces the per-set fit (stored on the weighted row)
+            gap = np.abs(probabilities['weighted'] - probabilities['per-set']).max()
+            rows[-2]['max_proba_gap'] = gap
+            print(f"   {'':5} {name:<18} weighted vs per-set: max probability difference {gap:.2e}")
+        del wins, losses
+
+    print("\n3. Summary:")
+    results = pd.DataFrame(rows)
+    table = results.pivot_table(index=['scale', 'model'], columns='mode', values='fit_seconds')[list(MODES)]
+    table['per-set / weighted'] = table['per-set'] / table['weighted']
+    print(table.to_string(float_format=lambda value: f"{value:.2f}"))
+    results.to_csv(args.output, index=False)
+    print(f"\n   Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
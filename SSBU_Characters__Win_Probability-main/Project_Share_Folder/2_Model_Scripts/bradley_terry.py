@@ -0,0 +1,227 @@
+"""
+Bradley-Terry matchup model with low-rank interaction terms
+
+Fits the win counts of the whole roster directly, without character
+attributes:
+
+    logit P(i beats j) = h + s_i - s_j + u_i . v_j - u_j . v_i
+
+s_i is each character's overall strength. The rank-k term is the
+skew-symmetric matrix U V' - V U', so apart from h the model is
+antisymmetric by construction while counter-picks (A beats B beats C beats
+A) can still be represented. h is the advantage of the side listed first:
+char1_wins counts the sets won from the p1 slot, so the table orientation
+carries information of its own (the home advantage of the classic
+Bradley-Terry model). Fitted on character_matchups.csv, h = +0.448, i.e. the
+p1 slot wins 61% of sets between equal characters (main() prints it).
+win_matrix() leaves it out.
+
+Every pair is scored at once as n x n matrix operations and the
+L2-penalised log-likelihood is minimised by L-BFGS on its analytic gradient,
+which takes a fraction of a second for the full roster. Sparse pairs borrow
+strength from everyone else's results, so every pair of characters gets a
+prediction, including the ones below the total_games >= 5 cutoff of
+character_matchups.csv.
+
+BradleyTerryRegressor wraps it as a win-rate regressor on character codes,
+which is how it runs next to the attribute models in build_matchup_model.py
+and train_all_models.py (the 'Bradley-Terry' row of model_results.csv). As a
+win-rate baseline it scores slightly below predicting the mean
+(R2 of about -0.003 on the shared test split): per-pair win rates carry little
+character signal.
+
+    python bradley_terry.py
+    python bradley_terry.py --rank 0        # plain Bradley-Terry
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import expit
+from sklearn.base import BaseEstimator, RegressorMixin
+
+# Columns of character_codes()
+PAIR_COLUMNS = ['char1_code', 'char2_code']
+
+
+def get_data_path(filename):
+    """Find data file in 1_Data_Files or current directory"""
+    script_dir = Path(__file__).parent
+    data_dir = script_dir.parent / "1_Data_Files"
+    if data_dir.exists():
+        file_path = data_dir / filename
+        if file_path.exists():
+            return str(file_path)
+    if Path(filename).exists():
+        return filename
+    return str(data_dir / filename) if data_dir.exists() else filename
+
+
+class BradleyTerry:
+    """Per-character strengths plus a rank-k antisymmetric interaction, fitted from win counts"""
+
+    def __init__(self, rank=1, l2=30.0, strength_l2=30.0, max_iter=1000, random_state=42):
+        self.rank = rank                  # interaction rank k (0 = plain Bradley-Terry)
+        self.l2 = l2                      # penalty on the interaction factors
+        self.strength_l2 = strength_l2    # shrinks strengths towards 0 (also pins their mean)
+        self.max_iter = max_iter
+        self.random_state = random_state
+
+    def _unpack(self, theta, n):
+        k = self.rank
+        return (theta[0], theta[1:n + 1], theta[n + 1:n + 1 + n * k].reshape(n, k),
+                theta[n + 1 + n * k:].reshape(n, k))
+
+    def _logits(self, strengths, U, V):
+        """n x n matrix of logit P(row beats column)"""
+        interaction = U @ V.T
+        return strengths[:, None] - strengths[None, :] + interaction - interaction.T
+
+    def _loss(self, theta, wins, losses):
+        """Penalised negative log-likelihood of the ordered win/loss matrices and its gradient"""
+        advantage, strengths, U, V = self._unpack(theta, len(wins))
+        logits = advantage + self._logits(strengths, U, V)
+        # -log P(win) = log(1 + exp(-logit)) per win, -log P(loss) = log(1 + exp(logit)) per loss
+        loss = (wins * np.logaddexp(0, -logits) + losses * np.logaddexp(0, logits)).sum()
+        loss += 0.5 * self.strength_l2 * strengths @ strengths + 0.5 * self.l2 * ((U ** 2).sum() + (V ** 2).sum())
+        # d loss / d logit_ij, folded onto the skew-symmetric parameterisation
+        residual = losses * expit(logits) - wins * expit(-logits)
+        skew = residual - residual.T
+        grad_strengths = skew.sum(axis=1) + self.strength_l2 * strengths
+        grad_U = skew @ V + self.l2 * U
+        grad_V = -skew @ U + self.l2 * V
+        return loss, np.concatenate([[residual.sum()], grad_strengths, grad_U.ravel(), grad_V.ravel()])
+
+    def fit(self, char1, char2, char1_wins, char2_wins):
+        """Fit from per-pair results (character names and each side's wins, char1 listed first)"""
+        char1, char2 = np.asarray(char1), np.asarray(char2)
+        self.characters_ = sorted(set(char1) | set(char2))
+        index = {name: i for i, name in enumerate(self.characters_)}
+        rows = np.array([index[name] for name in char1], dtype=np.int64)
+        cols = np.array([index[name] for name in char2], dtype=np.int64)
+
+        # Row = character listed first; a pair listed both ways fills both cells
+        n = len(self.characters_)
+        wins, losses = np.zeros((n, n)), np.zeros((n, n))
+        np.add.at(wins, (rows, cols), np.asarray(char1_wins, dtype=np.float64))
+        np.add.at(losses, (rows, cols), np.asarray(char2_wins, dtype=np.float64))
+
+        # Small random factors: U = V = 0 is a stationary point of the interaction
+        rng = np.random.default_rng(self.random_state)
+        theta = np.concatenate([np.zeros(n + 1), rng.normal(scale=0.01, size=2 * n * self.rank)])
+        start = time.perf_counter()
+        result = minimize(self._loss, theta, args=(wins, losses), jac=True, method='L-BFGS-B',
+                          options={'maxiter': self.max_iter})
+        self.fit_seconds_ = time.perf_counter() - start
+        self.n_iter_ = result.nit
+        self.advantage_, self.strengths_, self.U_, self.V_ = self._unpack(result.x, n)
+        self.index_ = index
+        return self
+
+    @property
+    def strengths(self):
+        """Strength of every character, strongest first"""
+        return pd.Series(self.strengths_, index=self.characters_, name='strength').sort_values(ascending=False)
+
+    def win_matrix(self):
+        """DataFrame of P(row character beats column character) for the whole roster,
+        without the first-listed advantage"""
+        return pd.DataFrame(expit(self._logits(self.strengths_, self.U_, self.V_)),
+                            index=self.characters_, columns=self.characters_)
+
+    def predict(self, char1, char2, advantage=True):
+        """P(char1 beats char2) per pair, as listed in character_matchups.csv unless
+        advantage=False; characters never seen in fit() get zero parameters"""
+        n = len(self.characters_)
+        # Unknown characters index an extra all-zero row
+        strengths = np.append(self.strengths_, 0.0)
+        U = np.vstack([self.U_, np.zeros((1, self.rank))])
+        V = np.vstack([self.V_, np.zeros((1, self.rank))])
+        rows = np.array([self.index_.get(name, n) for name in char1], dtype=np.int64)
+        cols = np.array([self.index_.get(name, n) for name in char2], dtype=np.int64)
+        logits = (strengths[rows] - strengths[cols]
+                  + (U[rows] * V[cols]).sum(axis=1) - (U[cols] * V[rows]).sum(axis=1))
+        return expit(logits + self.advantage_ if advantage else logits)
+
+
+def character_codes(frame):
+    """(char1, char2) of every matchup as codes in sorted name order (NaN if unknown)"""
+    names = sorted(set(frame['char1_normalized'].dropna()) | set(frame['char2_normalized'].dropna()))
+    codes = np.column_stack([pd.Categorical(frame[column], categories=names).codes
+                             for column in ('char1_normalized', 'char2_normalized')]).astype(np.float64)
+    codes[codes < 0] = np.nan
+    return codes
+
+
+class BradleyTerryRegressor(RegressorMixin, BaseEstimator):
+    """BradleyTerry as a regressor of char1_winrate on character_codes() columns.
+
+    sample_weight is the number of sets behind each row, so y * sample_weight
+    and (1 - y) * sample_weight are the two sides' wins. Without it every row
+    counts as a single set.
+    """
+
+    def __init__(self, rank=1, l2=30.0, strength_l2=30.0):
+        self.rank = rank
+        self.l2 = l2
+        self.strength_l2 = strength_l2
+
+    def fit(self, X, y, sample_weight=None):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        games = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        self.model_ = BradleyTerry(rank=self.rank, l2=self.l2, strength_l2=self.strength_l2)
+        self.model_.fit(X[:, 0], X[:, 1], y * games, (1 - y) * games)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return self.model_.predict(X[:, 0], X[:, 1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fit a Bradley-Terry model to the whole roster")
+    parser.add_argument('--rank', type=int, default=1, help="Interaction rank (default: 1; 0 = plain Bradley-Terry)")
+    parser.add_argument('--output', default='character_strengths.csv')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from feature_store import load_pairwise_features
+
+    args = parse_args(argv)
+
+    print("=" * 70)
+    print("BRADLEY-TERRY MATCHUP MODEL")
+    print("=" * 70)
+
+    print("\n1. Loading matchups...")
+    frame = load_pairwise_features(get_data_path('character_matchups.csv'), get_data_path('smash.csv')).frame
+    frame = frame.dropna(subset=['char1_normalized', 'char2_normalized'])
+    print(f"   {len(frame)} matchups, {int(frame['total_games'].sum())} sets")
+
+    print(f"\n2. Fitting strengths and rank-{args.rank} interactions...")
+    model = BradleyTerry(rank=args.rank).fit(frame['char1_normalized'], frame['char2_normalized'],
+                                             frame['char1_wins'], frame['char2_wins'])
+    n = len(model.characters_)
+    observed = {frozenset(pair) for pair in zip(frame['char1_normalized'], frame['char2_normalized'])
+                if pair[0] != pair[1]}
+    print(f"   {n} characters, {n * (n - 1) // 2} pairs predicted from {len(observed)} observed "
+          f"({model.n_iter_} iterations, {model.fit_seconds_ * 1000:.0f} ms)")
+    print(f"   First-listed advantage: {model.advantage_:+.3f} "
+          f"(P = {1 / (1 + np.exp(-model.advantage_)):.3f} between equal characters)")
+
+    print("\n3. Strongest characters:")
+    strengths = model.strengths
+    for name, strength in strengths.head(10).items():
+        print(f"   {name:<20} {strength:+.3f}")
+    strengths.rename_axis('character').reset_index().to_csv(args.output, index=False)
+    print(f"\n   Saved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
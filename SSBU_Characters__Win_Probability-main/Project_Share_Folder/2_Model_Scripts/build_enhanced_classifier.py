@@ -1,15 +1,25 @@
 """
 Enhanced classifier with technical parameters from ultimate_param.csv
+
+    python build_enhanced_classifier.py                  # random forest
+    python build_enhanced_classifier.py --backend hist   # histogram gradient boosting
 """
+import argparse
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import warnings
 warnings.filterwarnings('ignore')
 from pathlib import Path
 
+from data_store import load_table, save_table
+from feature_store import ATTRIBUTES, TECH_FEATURES, load_pairwise_features
+from model_registry import save_model
+from tech_params import load_tech_params
+
 def get_data_path(filename):
     """Find data file in 1_Data_Files or current directory"""
     # Try 1_Data_Files first
@@ -27,155 +37,46 @@ def get_data_path(filename):
     # Return the path anyway (will raise error if doesn't exist)
     return str(data_dir / filename) if data_dir.exists() else filename
 
+parser = argparse.ArgumentParser(description="Enhanced classifier with technical parameters")
+parser.add_argument('--backend', choices=['rf', 'hist'], default='rf',
+                    help="rf: random forest on 0-filled parameters; hist: histogram gradient "
+                         "boosting with native missing values (default: rf)")
+args = parser.parse_args()
+
 print("=" * 70)
 print("BUILDING ENHANCED CLASSIFIER WITH TECHNICAL PARAMETERS")
 print("=" * 70)
 
 # 1. Load data
 print("\n1. Loading data...")
-matchups_df = pd.read_csv(get_data_path('character_matchups.csv'))
-char_attrs = pd.read_csv(get_data_path('smash.csv'))
-tech_params = pd.read_csv(get_data_path('ultimate_param.csv'), skiprows=2)
+matchups_df = load_table(get_data_path('character_matchups.csv'))
+char_attrs = load_table(get_data_path('smash.csv'))
+tech_params = load_tech_params(get_data_path('ultimate_param.csv'))
 
 print(f"   Matchups: {len(matchups_df)}")
 print(f"   Character attributes: {len(char_attrs)}")
 print(f"   Technical parameters: {len(tech_params)}")
 
-# Clean technical params - remove unnamed columns
-tech_params = tech_params.loc[:, ~tech_params.columns.str.startswith('Unnamed')]
-
-# 2. Normalize character names
-print("\n2. Normalizing character names...")
-name_variations = {
-    'metaknight': 'Meta Knight',
-    'littlemac': 'Little Mac',
-    'pokemon trainer': 'Pokemon Trainer',
-    'king k. rool': 'King K. Rool',
-    'king dedede': 'King Dedede',
-    'diddy kong': 'Diddy Kong',
-    'young link': 'Young Link',
-    'toon link': 'Toon Link',
-    'dr. mario': 'Dr. Mario',
-    'mr. game & watch': 'Mr. Game & Watch',
-    'zero suit samus': 'Zero Suit Samus',
-    'wii fit trainer': 'Wii Fit Trainer',
-    'rosalina & luma': 'Rosalina & Luma',
-    'banjo & kazooie': 'Banjo & Kazooie',
-    'piranha plant': 'Piranha Plant',
-    'pyra mythra': 'Pyra Mythra',
-    'mii brawler': 'Mii Brawler',
-    'mii swordfighter': 'Mii Swordfighter',
-    'mii gunner': 'Mii Gunner',
-    'ice climbers': 'Ice Climbers'
-}
-
-def normalize_char_name(matchup_name):
-    matchup_name = matchup_name.lower().strip()
-    if matchup_name in name_variations:
-        return name_variations[matchup_name]
-    for smash_name in char_attrs['name']:
-        if smash_name.lower() == matchup_name:
-            return smash_name
-    return matchup_name.title()
-
-# Normalize technical params character names
-tech_params['char_normalized'] = tech_params['Description'].apply(normalize_char_name)
-
-# Key technical parameters to extract
-tech_features = [
-    'Weight', 'Gravity', 'Run Maximum Velocity', 'Walk Maximum Velocity',
-    'Maximum Horizontal Air Speed', 'Maximum Fall Speed', 'Dash Initial Velocity',
-    'Maximum Air Acceleration'
-]
-
-print(f"\n3. Extracting technical parameters...")
-print(f"   Looking for: {tech_features}")
-
-# Find which columns exist
-available_tech_features = []
-for feat in tech_features:
-    matching_cols = [col for col in tech_params.columns if feat.lower() in col.lower()]
-    if matching_cols:
-        available_tech_features.append(matching_cols[0])
-        print(f"   Found: {matching_cols[0]}")
-
-# 4. Merge matchup data with character attributes
-print("\n4. Merging character attributes...")
-matchups_df['char1_normalized'] = matchups_df['character_1'].apply(normalize_char_name)
-matchups_df['char2_normalized'] = matchups_df['character_2'].apply(normalize_char_name)
-
-char1_attrs = char_attrs.add_suffix('_char1')
-char1_attrs = char1_attrs.rename(columns={'name_char1': 'char1_normalized'})
-char2_attrs = char_attrs.add_suffix('_char2')
-char2_attrs = char2_attrs.rename(columns={'name_char2': 'char2_normalized'})
-
-matchups_with_attrs = matchups_df.merge(
-    char1_attrs, on='char1_normalized', how='inner'
-).merge(
-    char2_attrs, on='char2_normalized', how='inner'
-)
-
-# 5. Merge technical parameters
-print("\n5. Merging technical parameters...")
-tech_params_char1 = tech_params[['char_normalized'] + available_tech_features].copy()
-tech_params_char1 = tech_params_char1.add_suffix('_char1')
-tech_params_char1 = tech_params_char1.rename(columns={'char_normalized_char1': 'char1_normalized'})
-
-tech_params_char2 = tech_params[['char_normalized'] + available_tech_features].copy()
-tech_params_char2 = tech_params_char2.add_suffix('_char2')
-tech_params_char2 = tech_params_char2.rename(columns={'char_normalized_char2': 'char2_normalized'})
-
-# Convert technical params to numeric
-for col in available_tech_features:
-    if f"{col}_char1" in tech_params_char1.columns:
-        tech_params_char1[f"{col}_char1"] = pd.to_numeric(tech_params_char1[f"{col}_char1"], errors='coerce')
-    if f"{col}_char2" in tech_params_char2.columns:
-        tech_params_char2[f"{col}_char2"] = pd.to_numeric(tech_params_char2[f"{col}_char2"], errors='coerce')
-
-matchups_enhanced = matchups_with_attrs.merge(
-    tech_params_char1, on='char1_normalized', how='left'
-).merge(
-    tech_params_char2, on='char2_normalized', how='left'
-)
+# 2. Pairwise features: normalized names, merged attributes and technical
+# parameters, and _diff columns
+print("\n2. Loading pairwise features with technical parameters...")
+features = load_pairwise_features(get_data_path('character_matchups.csv'), get_data_path('smash.csv'),
+                                  get_data_path('ultimate_param.csv'))
+matchups_enhanced = features.frame
+attributes = ATTRIBUTES
+all_features = features.feature_names
+print(f"   {'Reused' if features.cached else 'Built and stored'} feature table {features.key[:12]}")
+print(f"   Looking for: {TECH_FEATURES}")
+for col in features.tech_columns:
+    print(f"   Found: {col}")
 
 print(f"   Matchups with all data: {len(matchups_enhanced)}")
-
-# 6. Create feature differences
-print("\n6. Creating feature differences...")
-
-# Character attribute differences
-attributes = ['weight', 'recovery', 'speed', 'combo_game', 'projectiles', 
-              'killpower', 'ledgetrap', 'edgeguard', 'spacing', 'cheese']
-
-all_features = []
-
-# Attribute differences
-for attr in attributes:
-    char1_col = f"{attr}_char1"
-    char2_col = f"{attr}_char2"
-    if char1_col in matchups_enhanced.columns and char2_col in matchups_enhanced.columns:
-        matchups_enhanced[f"{attr}_diff"] = (
-            matchups_enhanced[char1_col] - matchups_enhanced[char2_col]
-        )
-        all_features.append(f"{attr}_diff")
-
-# Technical parameter differences
-for tech_feat in available_tech_features:
-    char1_col = f"{tech_feat}_char1"
-    char2_col = f"{tech_feat}_char2"
-    if char1_col in matchups_enhanced.columns and char2_col in matchups_enhanced.columns:
-        matchups_enhanced[f"{tech_feat}_diff"] = (
-            pd.to_numeric(matchups_enhanced[char1_col], errors='coerce') - 
-            pd.to_numeric(matchups_enhanced[char2_col], errors='coerce')
-        )
-        all_features.append(f"{tech_feat}_diff")
-
 print(f"   Total features: {len(all_features)}")
 print(f"   Attribute features: {len(attributes)}")
 print(f"   Technical features: {len(all_features) - len(attributes)}")
 
-# 7. Create classification labels
-print("\n7. Creating classification labels...")
+# 3. Create classification labels
+print("\n3. Creating classification labels...")
 def classify_matchup_binary(winrate):
     if winrate >= 0.50:
         return 'Char1_Wins'
@@ -184,8 +85,8 @@ def classify_matchup_binary(winrate):
 
 matchups_enhanced['matchup_binary'] = matchups_enhanced['char1_winrate'].apply(classify_matchup_binary)
 
-# 8. Prepare training data
-print("\n8. Preparing training data...")
+# 4. Prepare training data
+print("\n4. Preparing training data...")
 X = matchups_enhanced[all_features].copy()
 y = matchups_enhanced['matchup_binary'].copy()
 
@@ -194,8 +95,10 @@ valid_mask = ~(X.isnull().all(axis=1) | y.isnull())
 X = X[valid_mask]
 y = y[valid_mask]
 
-# Fill remaining NaN with 0 (for missing technical params)
-X = X.fillna(0)
+# Fill remaining NaN with 0 (for missing technical params); histogram
+# boosting learns which side of each split missing values go to instead
+if args.backend != 'hist':
+    X = X.fillna(0)
 
 print(f"   Final dataset: {len(X)} matchups")
 print(f"   Features: {len(all_features)}")
@@ -205,38 +108,58 @@ X_train, X_test, y_train, y_test = train_test_split(
     X, y, test_size=0.2, random_state=42, stratify=y
 )
 
-# 9. Train enhanced model
-print("\n9. Training enhanced model...")
-rf_enhanced = RandomForestClassifier(
-    n_estimators=100, 
-    max_depth=10, 
-    random_state=42, 
-    n_jobs=-1,
-    class_weight='balanced'
-)
+# 5. Train enhanced model
+print(f"\n5. Training enhanced model ({args.backend})...")
+if args.backend == 'hist':
+    rf_enhanced = HistGradientBoostingClassifier(
+        max_iter=100,
+        max_depth=5,
+        random_state=42,
+        class_weight='balanced'
+    )
+else:
+    rf_enhanced = RandomForestClassifier(
+        n_estimators=100, 
+        max_depth=10, 
+        random_state=42, 
+        n_jobs=-1,
+        class_weight='balanced'
+    )
 rf_enhanced.fit(X_train, y_train)
 rf_enhanced_pred = rf_enhanced.predict(X_test)
 
-# 10. Evaluate
-print("\n10. Evaluating enhanced model...")
+# 6. Evaluate
+print("\n6. Evaluating enhanced model...")
 accuracy = accuracy_score(y_test, rf_enhanced_pred)
 print(f"\nEnhanced Model Accuracy: {accuracy:.4f} ({accuracy*100:.2f}%)")
 print("\nClassification Report:")
 print(classification_report(y_test, rf_enhanced_pred))
 
-# 11. Feature importance
-print("\n11. Feature Importance:")
+# 7. Feature importance
+print("\n7. Feature Importance:")
+if args.backend == 'hist':
+    # Histogram boosting has no impurity importances; use the test-set
+    # accuracy drop when each feature is shuffled
+    importances = permutation_importance(rf_enhanced, X_test, y_test, n_repeats=10,
+                                         random_state=42).importances_mean
+else:
+    importances = rf_enhanced.feature_importances_
 feature_importance = pd.DataFrame({
     'feature': all_features,
-    'importance': rf_enhanced.feature_importances_
+    'importance': importances
 }).sort_values('importance', ascending=False)
 
 print("\nTop 15 Most Important Features:")
 print(feature_importance.head(15).to_string(index=False))
 
 # Save results
-matchups_enhanced.to_csv('matchups_enhanced.csv', index=False)
-feature_importance.to_csv('feature_importance_enhanced.csv', index=False)
+importance_file = 'feature_importance_enhanced.csv' if args.backend == 'rf' else 'feature_importance_enhanced_hist.csv'
+save_table(matchups_enhanced, 'matchups_enhanced.csv')
+feature_importance.to_csv(importance_file, index=False)
+model_name = 'enhanced_classifier' if args.backend == 'rf' else 'enhanced_classifier_hist'
+model_path = save_model(model_name, rf_enhanced, all_features, data_key=features.key,
+                        metrics={'accuracy': accuracy, 'n_train': len(X_train)},
+                        extra={'tech_features': features.tech_columns})
 
 print("\n" + "=" * 70)
 print("ENHANCED MODEL COMPLETE!")
@@ -245,5 +168,6 @@ print(f"\nAccuracy: {accuracy*100:.2f}%")
 print(f"Features: {len(all_features)} (including {len(all_features) - len(attributes)} technical params)")
 print("\nSaved files:")
 print("  - matchups_enhanced.csv")
-print("  - feature_importance_enhanced.csv")
+print(f"  - {importance_file}")
+print(f"  - {model_path}")
 
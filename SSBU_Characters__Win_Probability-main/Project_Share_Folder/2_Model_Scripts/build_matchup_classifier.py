@@ -14,6 +14,11 @@ import warnings
 warnings.filterwarnings('ignore')
 from pathlib import Path
 
+from data_store import load_table
+from feature_store import ATTRIBUTES, load_pairwise_features
+from model_registry import save_model
+from roster import load_roster
+
 def get_data_path(filename):
     """Find data file in 1_Data_Files or current directory"""
     script_dir = Path(__file__).parent
@@ -32,89 +37,31 @@ print("=" * 70)
 
 # 1. Load data
 print("\n1. Loading data...")
-matchups_df = pd.read_csv(get_data_path('character_matchups.csv'))
-char_attrs = pd.read_csv(get_data_path('smash.csv'))
+matchups_df = load_table(get_data_path('character_matchups.csv'))
+char_attrs = load_table(get_data_path('smash.csv'))
 
 print(f"   Matchups: {len(matchups_df)}")
 print(f"   Characters: {len(char_attrs)}")
 
-# 2. Normalize character names (same as before)
-print("\n2. Normalizing character names...")
-name_variations = {
-    'metaknight': 'Meta Knight',
-    'littlemac': 'Little Mac',
-    'pokemon trainer': 'Pokemon Trainer',
-    'king k. rool': 'King K. Rool',
-    'king dedede': 'King Dedede',
-    'diddy kong': 'Diddy Kong',
-    'young link': 'Young Link',
-    'toon link': 'Toon Link',
-    'dr. mario': 'Dr. Mario',
-    'mr. game & watch': 'Mr. Game & Watch',
-    'zero suit samus': 'Zero Suit Samus',
-    'wii fit trainer': 'Wii Fit Trainer',
-    'rosalina & luma': 'Rosalina & Luma',
-    'banjo & kazooie': 'Banjo & Kazooie',
-    'piranha plant': 'Piranha Plant',
-    'pyra mythra': 'Pyra Mythra',
-    'mii brawler': 'Mii Brawler',
-    'mii swordfighter': 'Mii Swordfighter',
-    'mii gunner': 'Mii Gunner',
-    'ice climbers': 'Ice Climbers'
-}
+# 2. Pairwise features: normalized names, merged attributes and _diff columns
+print("\n2. Loading pairwise features...")
+roster = load_roster(get_data_path('smash.csv'))
 
 def normalize_char_name(matchup_name):
     """Convert matchup character name to match smash.csv format"""
-    matchup_name = matchup_name.lower().strip()
-    
-    if matchup_name in name_variations:
-        return name_variations[matchup_name]
-    
-    for smash_name in char_attrs['name']:
-        if smash_name.lower() == matchup_name:
-            return smash_name
-    
-    return matchup_name.title()
-
-matchups_df['char1_normalized'] = matchups_df['character_1'].apply(normalize_char_name)
-matchups_df['char2_normalized'] = matchups_df['character_2'].apply(normalize_char_name)
-
-# 3. Merge with character attributes
-print("\n3. Merging with character attributes...")
-char1_attrs = char_attrs.add_suffix('_char1')
-char1_attrs = char1_attrs.rename(columns={'name_char1': 'char1_normalized'})
+    return roster.normalize(matchup_name)
 
-char2_attrs = char_attrs.add_suffix('_char2')
-char2_attrs = char2_attrs.rename(columns={'name_char2': 'char2_normalized'})
-
-matchups_with_attrs = matchups_df.merge(
-    char1_attrs, on='char1_normalized', how='inner'
-).merge(
-    char2_attrs, on='char2_normalized', how='inner'
-)
+features = load_pairwise_features(get_data_path('character_matchups.csv'), get_data_path('smash.csv'))
+matchups_with_attrs = features.frame
+feature_data = features.attribute_features
+attributes = ATTRIBUTES
+print(f"   {'Reused' if features.cached else 'Built and stored'} feature table {features.key[:12]}")
 
 print(f"   Matchups with attributes: {len(matchups_with_attrs)}")
-
-# 4. Create feature differences
-print("\n4. Creating feature differences...")
-attributes = ['weight', 'recovery', 'speed', 'combo_game', 'projectiles', 
-              'killpower', 'ledgetrap', 'edgeguard', 'spacing', 'cheese']
-
-feature_data = []
-for attr in attributes:
-    char1_col = f"{attr}_char1"
-    char2_col = f"{attr}_char2"
-    
-    if char1_col in matchups_with_attrs.columns and char2_col in matchups_with_attrs.columns:
-        matchups_with_attrs[f"{attr}_diff"] = (
-            matchups_with_attrs[char1_col] - matchups_with_attrs[char2_col]
-        )
-        feature_data.append(f"{attr}_diff")
-
 print(f"   Created {len(feature_data)} features")
 
-# 5. Create classification labels
-print("\n5. Creating classification labels...")
+# 3. Create classification labels
+print("\n3. Creating classification labels...")
 
 # Option 1: Three-class classification (Advantaged/Even/Disadvantaged)
 def classify_matchup_tier(winrate):
@@ -142,8 +89,8 @@ print(matchups_with_attrs['matchup_tier'].value_counts())
 print("\n   Binary distribution:")
 print(matchups_with_attrs['matchup_binary'].value_counts())
 
-# 6. Prepare training data for both tasks
-print("\n6. Preparing training data...")
+# 4. Prepare training data for both tasks
+print("\n4. Preparing training data...")
 
 X = matchups_with_attrs[feature_data].copy()
 y_tier = matchups_with_attrs['matchup_tier'].copy()
@@ -163,15 +110,16 @@ X_train, X_test, y_tier_train, y_tier_test, y_binary_train, y_binary_test = trai
 
 print(f"   Training: {len(X_train)}, Test: {len(X_test)}")
 
-# 7. Train models - THREE CLASS CLASSIFICATION
+# 5. Train models - THREE CLASS CLASSIFICATION
 print("\n" + "=" * 70)
 print("THREE-CLASS CLASSIFICATION (Advantaged/Even/Disadvantaged)")
 print("=" * 70)
 
-print("\n7. Training three-class models...")
+print("\n5. Training three-class models...")
 
-# Logistic Regression (multi-class)
-lr_tier = LogisticRegression(max_iter=1000, random_state=42, multi_class='multinomial')
+# Logistic Regression (multi-class); lbfgs already fits the multinomial model
+# for three classes, and newer scikit-learn no longer accepts multi_class
+lr_tier = LogisticRegression(max_iter=1000, random_state=42)
 lr_tier.fit(X_train, y_tier_train)
 lr_tier_pred = lr_tier.predict(X_test)
 
@@ -185,8 +133,8 @@ gb_tier = GradientBoostingClassifier(n_estimators=100, max_depth=5, random_state
 gb_tier.fit(X_train, y_tier_train)
 gb_tier_pred = gb_tier.predict(X_test)
 
-# 8. Evaluate three-class models
-print("\n8. Evaluating three-class models...")
+# 6. Evaluate three-class models
+print("\n6. Evaluating three-class models...")
 
 def evaluate_classifier(y_true, y_pred, model_name):
     accuracy = accuracy_score(y_true, y_pred)
@@ -210,12 +158,12 @@ cm_tier = confusion_matrix(y_tier_test, rf_tier_pred)
 print(cm_tier)
 print("\n   Classes:", rf_tier.classes_)
 
-# 9. Train models - BINARY CLASSIFICATION
+# 7. Train models - BINARY CLASSIFICATION
 print("\n" + "=" * 70)
 print("BINARY CLASSIFICATION (Char1 Wins / Char2 Wins)")
 print("=" * 70)
 
-print("\n9. Training binary models...")
+print("\n7. Training binary models...")
 
 # Split for binary classification
 X_train_bin, X_test_bin, y_binary_train_bin, y_binary_test_bin = train_test_split(
@@ -237,8 +185,8 @@ gb_binary = GradientBoostingClassifier(n_estimators=100, max_depth=5, random_sta
 gb_binary.fit(X_train_bin, y_binary_train_bin)
 gb_binary_pred = gb_binary.predict(X_test_bin)
 
-# 10. Evaluate binary models
-print("\n10. Evaluating binary models...")
+# 8. Evaluate binary models
+print("\n8. Evaluating binary models...")
 
 binary_results = []
 binary_results.append(evaluate_classifier(y_binary_test_bin, lr_binary_pred, "Logistic Regression (binary)"))
@@ -251,12 +199,12 @@ cm_binary = confusion_matrix(y_binary_test_bin, rf_binary_pred)
 print(cm_binary)
 print("\n   Classes:", rf_binary.classes_)
 
-# 11. Feature importance
+# 9. Feature importance
 print("\n" + "=" * 70)
 print("FEATURE IMPORTANCE")
 print("=" * 70)
 
-print("\n11. Feature Importance (Random Forest - 3-class):")
+print("\n9. Feature Importance (Random Forest - 3-class):")
 feature_importance_tier = pd.DataFrame({
     'feature': feature_data,
     'importance': rf_tier.feature_importances_
@@ -265,20 +213,25 @@ feature_importance_tier = pd.DataFrame({
 print("\nTop 10 Most Important Features:")
 print(feature_importance_tier.head(10).to_string(index=False))
 
-# 12. Save results
-print("\n12. Saving results...")
+# 10. Save results
+print("\n10. Saving results...")
 tier_results_df = pd.DataFrame(tier_results)
 binary_results_df = pd.DataFrame(binary_results)
 feature_importance_tier.to_csv('feature_importance_classifier.csv', index=False)
 tier_results_df.to_csv('classifier_tier_results.csv', index=False)
 binary_results_df.to_csv('classifier_binary_results.csv', index=False)
+tier_model_path = save_model('matchup_classifier_tier', rf_tier, feature_data, data_key=features.key,
+                             metrics={'accuracy': tier_results[1]['accuracy'], 'n_train': len(X_train)})
+binary_model_path = save_model('matchup_classifier_binary', rf_binary, feature_data, data_key=features.key,
+                               metrics={'accuracy': binary_results[1]['accuracy'], 'n_train': len(X_train_bin)})
 
 print("   Saved files:")
 print("     - feature_importance_classifier.csv")
 print("     - classifier_tier_results.csv")
 print("     - classifier_binary_results.csv")
+print(f"     - Random Forest models: {tier_model_path}, {binary_model_path}")
 
-# 13. Example predictions
+# 11. Example predictions
 print("\n" + "=" * 70)
 print("EXAMPLE PREDICTIONS")
 print("=" * 70)
@@ -322,7 +275,7 @@ def predict_matchup_classifier(char1_name, char2_name, model_tier=rf_tier, model
     
     return tier_pred, binary_pred
 
-print("\n13. Example Predictions:")
+print("\n11. Example Predictions:")
 
 predict_matchup_classifier('Mario', 'Fox')
 print("\n" + "-" * 70)
@@ -330,7 +283,7 @@ predict_matchup_classifier('Pikachu', 'Bowser')
 print("\n" + "-" * 70)
 predict_matchup_classifier('Sonic', 'Joker')
 
-# 14. Summary
+# 12. Summary
 print("\n" + "=" * 70)
 print("CLASSIFICATION MODEL SUMMARY")
 print("=" * 70)
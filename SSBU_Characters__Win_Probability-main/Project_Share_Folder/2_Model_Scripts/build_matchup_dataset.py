@@ -3,213 +3,962 @@ Build character matchup dataset from tournament data
 """
 import sqlite3
 import pandas as pd
-import json
-from collections import defaultdict
+import numpy as np
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-print("=" * 70)
-print("BUILDING MATCHUP DATASET")
-print("=" * 70)
+from data_store import save_table
+from matchup_matrix import build_matchup_matrix, default_matrix_path
+from player_mains import load_player_mains
+from roster import load_roster
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module
+    resource = None
 
-# Use relative path from script location
 script_dir = Path(__file__).parent
-db_path = script_dir.parent / 'ultimate_player_database' / 'ultimate_player_database.db'
 
-# Try multiple possible locations
-if not db_path.exists():
-    # Try current directory
-    db_path = Path('ultimate_player_database/ultimate_player_database.db')
+# Number of sets pulled from SQLite per chunk when streaming the sets table
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def find_database():
+    """Locate ultimate_player_database.db relative to the script"""
+    db_path = script_dir.parent / 'ultimate_player_database' / 'ultimate_player_database.db'
+
+    # Try multiple possible locations
     if not db_path.exists():
-        # Try parent directory
-        db_path = script_dir.parent.parent / 'ultimate_player_database' / 'ultimate_player_database.db'
-
-if not db_path.exists():
-    print(f"ERROR: Could not find database at {db_path}")
-    print("Please ensure ultimate_player_database/ultimate_player_database.db exists")
-    exit(1)
-
-conn = sqlite3.connect(str(db_path))
-
-# Step 1: Get all players with their character usage
-print("\n1. Loading player character data...")
-players_query = """
-    SELECT player_id, characters
-    FROM players
-    WHERE game = 'ultimate' 
-      AND characters IS NOT NULL 
-      AND characters != ''
-      AND characters != '{}'
-"""
+        # Try current directory
+        db_path = Path('ultimate_player_database/ultimate_player_database.db')
+        if not db_path.exists():
+            # Try parent directory
+            db_path = script_dir.parent.parent / 'ultimate_player_database' / 'ultimate_player_database.db'
+
+    if not db_path.exists():
+        print(f"ERROR: Could not find database at {db_path}")
+        print("Please ensure ultimate_player_database/ultimate_player_database.db exists")
+        sys.exit(1)
+
+    return db_path
 
-players_df = pd.read_sql_query(players_query, conn)
-print(f"   Loaded {len(players_df)} players with character data")
-
-# Parse character data and get primary characters for each player
-def get_primary_characters(char_string, top_n=3):
-    """Extract top N most used characters for a player"""
-    try:
-        chars = json.loads(char_string)
-        if not chars:
-            return []
-        
-        # Sort by usage count (descending)
-        sorted_chars = sorted(chars.items(), key=lambda x: x[1], reverse=True)
-        
-        # Extract character names (remove 'ultimate/' prefix)
-        primary = []
-        for char_key, count in sorted_chars[:top_n]:
-            char_name = char_key.replace('ultimate/', '').strip()
-            if char_name and char_name != 'random':
-                primary.append(char_name.lower())
-        
-        return primary
-    except:
-        return []
 
-# Create player -> characters mapping
-player_chars = {}
-for _, row in players_df.iterrows():
-    player_id = row['player_id']
-    primary_chars = get_primary_characters(row['characters'])
-    if primary_chars:
-        player_chars[player_id] = primary_chars
-
-print(f"   {len(player_chars)} players with valid character data")
-
-# Step 2: Get tournament sets
-print("\n2. Loading tournament sets...")
-# Get a sample first to test
-sets_query = """
-    SELECT key, tournament_key, winner_id, p1_id, p2_id, p1_score, p2_score
-    FROM sets
-    WHERE game = 'ultimate'
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+SETS_COLUMNS = "key, tournament_key, winner_id, p1_id, p2_id, p1_score, p2_score"
+
+SETS_FILTER = """
+      game = 'ultimate'
       AND winner_id IS NOT NULL
       AND p1_id IS NOT NULL
       AND p2_id IS NOT NULL
       AND winner_id IN (p1_id, p2_id)
-    LIMIT 100000
 """
 
-sets_df = pd.read_sql_query(sets_query, conn)
-print(f"   Loaded {len(sets_df)} sets")
 
-# Step 3: Build matchup pairs
-print("\n3. Building matchup pairs...")
-matchups = []  # List of (char1, char2, winner_is_p1, ...)
+def iter_set_chunks(conn, chunk_size=DEFAULT_CHUNK_SIZE, limit=None, after_rowid=-1, until_rowid=None):
+    """Stream the sets table in rowid order, chunk_size rows at a time.
+
+    Uses keyset pagination on rowid so each query is an index range scan and
+    only one chunk is held in memory at once, however large the table is.
+    Only sets with after_rowid < rowid <= until_rowid are returned.
+    """
+    chunk_query = f"""
+        SELECT rowid AS set_rowid, {SETS_COLUMNS}
+        FROM sets
+        WHERE rowid > ?
+          AND rowid <= ?
+          AND {SETS_FILTER}
+        ORDER BY rowid
+        LIMIT ?
+    """
+    if until_rowid is None:
+        until_rowid = np.iinfo(np.int64).max
+    last_rowid = after_rowid
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        chunk = pd.read_sql_query(chunk_query, conn, params=(last_rowid, int(until_rowid), size))
+        if chunk.empty:
+            break
+        yield chunk
+        last_rowid = int(chunk['set_rowid'].iloc[-1])
+        if remaining is not None:
+            remaining -= len(chunk)
+        if len(chunk) < size:
+            break
+
 
 def normalize_character_name(char_name):
-    """Normalize character names to match smash.csv"""
-    char_map = {
-        'pokemontrainer': 'pokemon trainer',
-        'pyra': 'pyra mythra',
-        'pyramythra': 'pyra mythra',
-        'mii brawler': 'mii brawler',
-        'mii swordfighter': 'mii swordfighter',
-        'mii gunner': 'mii gunner',
-        'mr game & watch': 'mr. game & watch',
-        'gamewatch': 'mr. game & watch',
-        'dr mario': 'dr. mario',
-        'mariod': 'dr. mario',
-        'toonlink': 'toon link',
-        'younglink': 'young link',
-        'wiifittrainer': 'wii fit trainer',
-        'king k rool': 'king k. rool',
-        'kingkr': 'king k. rool',
-        'kingdedede': 'king dedede',
-        'banjokazooie': 'banjo & kazooie',
-        'diddykong': 'diddy kong',
-        'iceclimbers': 'ice climbers',
-        'rosalina': 'rosalina & luma',
-        'piranhaplant': 'piranha plant',
-        'zero suitsamus': 'zero suit samus',
-        'zerosuitsamus': 'zero suit samus',
-        'ridley': 'ridley',
-    }
-    
+    """Normalize character names to match smash.csv (lowercase, as stored in character_matchups.csv)"""
     char_name = char_name.lower().strip()
     # Remove 'ultimate/' prefix if present
     char_name = char_name.replace('ultimate/', '')
-    
-    # Check direct mapping
-    if char_name in char_map:
-        return char_map[char_name]
-    
-    # Try to match by removing spaces/special chars
-    for key, value in char_map.items():
-        if key.replace(' ', '').replace('.', '').replace('&', '') == char_name.replace(' ', '').replace('.', '').replace('&', ''):
-            return value
-    
-    # Return as-is (will need manual matching later)
+
+    resolved = load_roster().resolve(char_name)
+    if resolved is not None:
+        return resolved.lower()
+
+    # Return as-is (not in smash.csv, e.g. echo fighters)
     return char_name
 
-matchup_counts = defaultdict(lambda: {'p1_wins': 0, 'p2_wins': 0})
-
-for _, row in sets_df.iterrows():
-    winner_id = str(row['winner_id'])
-    p1_id = str(row['p1_id'])
-    p2_id = str(row['p2_id'])
-    
-    # Skip if players not in our character database
-    if p1_id not in player_chars or p2_id not in player_chars:
-        continue
-    
-    # Get primary characters for each player
-    p1_chars = player_chars[p1_id]
-    p2_chars = player_chars[p2_id]
-    
-    # For now, use most-used character (could improve this logic)
-    if not p1_chars or not p2_chars:
-        continue
-    
-    char1 = normalize_character_name(p1_chars[0])
-    char2 = normalize_character_name(p2_chars[0])
-    
-    # Determine winner
-    winner_is_p1 = (winner_id == p1_id)
-    
-    # Create matchup key (alphabetically sorted to avoid duplicates)
-    matchup_key = tuple(sorted([char1, char2]))
-    
-    if winner_is_p1:
-        matchup_counts[matchup_key]['p1_wins'] += 1
+
+class MatchupCounts:
+    """Set wins per character pair, accumulated in an N x N x 2 int32 tensor.
+
+    Characters are coded in sorted name order, so for a pair (lo, hi) with
+    lo <= hi the first axis is already the alphabetical first character.
+    wins[lo, hi, 0] counts sets won by the set's p1 and wins[lo, hi, 1] sets
+    won by p2, matching the p1_wins/p2_wins bookkeeping of the original loop.
+    games[lo, hi, 0] and games[lo, hi, 1] count individual games won by
+    character lo and character hi, taken from p1_score/p2_score.
+    Top-3 attribution spreads sets fractionally and uses a float64 dtype.
+    """
+
+    def __init__(self, characters, dtype=np.int32):
+        self.characters = list(characters)
+        n = len(self.characters)
+        self.wins = np.zeros((n, n, 2), dtype=dtype)
+        self.games = np.zeros((n, n, 2), dtype=dtype)
+        # sets.rowid of the first set seen for each pair, used to keep CSV row order stable
+        self.first_seen = np.full(n * n, np.iinfo(np.int64).max, dtype=np.int64)
+        self.sets_seen = 0
+        # High-water mark: largest sets.rowid folded into these counts
+        self.last_rowid = -1
+
+    def __len__(self):
+        """Number of pairs with at least one set"""
+        return int(np.count_nonzero(self.wins.sum(axis=2)))
+
+    def with_characters(self, characters):
+        """Return a copy re-indexed onto a superset of this roster"""
+        characters = sorted(set(characters) | set(self.characters))
+        if characters == self.characters:
+            return self
+        remapped = MatchupCounts(characters, self.wins.dtype)
+        code_of = {name: code for code, name in enumerate(characters)}
+        old_to_new = np.array([code_of[name] for name in self.characters], dtype=np.int64)
+        # Both rosters are sorted, so (lo, hi) pairs stay ordered after remapping
+        remapped.wins[np.ix_(old_to_new, old_to_new)] = self.wins
+        remapped.games[np.ix_(old_to_new, old_to_new)] = self.games
+        n_old, n_new = len(self.characters), len(characters)
+        first_seen = remapped.first_seen.reshape(n_new, n_new)
+        first_seen[np.ix_(old_to_new, old_to_new)] = self.first_seen.reshape(n_old, n_old)
+        remapped.sets_seen = self.sets_seen
+        remapped.last_rowid = self.last_rowid
+        return remapped
+
+    def save(self, path):
+        """Persist raw counts and the high-water mark for incremental rebuilds"""
+        # Write through a file handle so numpy does not append its own .npz suffix
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                characters=np.array(self.characters, dtype=str),
+                wins=self.wins,
+                games=self.games,
+                first_seen=self.first_seen,
+                sets_seen=np.int64(self.sets_seen),
+                last_rowid=np.int64(self.last_rowid),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Load counts written by save()"""
+        with np.load(path) as state:
+            if 'games' not in state.files:
+                raise ValueError(f"'{path}' predates game-level counts")
+            counts = cls(state['characters'].tolist(), state['wins'].dtype)
+            counts.wins = state['wins']
+            counts.games = state['games']
+            counts.first_seen = state['first_seen'].astype(np.int64)
+            counts.sets_seen = int(state['sets_seen'])
+            counts.last_rowid = int(state['last_rowid'])
+        return counts
+
+
+class MatchupCube:
+    """Matchup counts split by tournament date into a (bucket, N, N, 2) cube.
+
+    Each bucket holds the same wins/games layout as MatchupCounts for the
+    sets played in one calendar week or month, so any window or decayed
+    rolling win rate is a sum over the first axis instead of a DB rescan.
+    Buckets are numbered from the Unix epoch in numpy datetime64 units
+    (so weeks start on Thursdays); sets whose tournament has no known date
+    are counted in undated_sets.
+    """
+
+    BUCKET_UNITS = {'week': 'W', 'month': 'M'}
+
+    def __init__(self, characters, bucket='month', dtype=np.int32):
+        if bucket not in self.BUCKET_UNITS:
+            raise ValueError(f"Unknown bucket size '{bucket}'")
+        self.characters = list(characters)
+        self.bucket = bucket
+        n = len(self.characters)
+        self.first_bucket = 0
+        self.wins = np.zeros((0, n, n, 2), dtype=dtype)
+        self.games = np.zeros((0, n, n, 2), dtype=dtype)
+        self.undated_sets = 0
+        # High-water mark of the MatchupCounts these slices were folded with
+        self.last_rowid = -1
+
+    def __len__(self):
+        """Number of time buckets"""
+        return len(self.wins)
+
+    @property
+    def unit(self):
+        return self.BUCKET_UNITS[self.bucket]
+
+    @property
+    def periods(self):
+        """Start date of every bucket"""
+        return (self.first_bucket + np.arange(len(self))).astype(f'datetime64[{self.unit}]')
+
+    def bucket_of(self, dates):
+        """Bucket numbers of datetime-like values (float, NaN where missing)"""
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy()
+        buckets = dates.astype(f'datetime64[{self.unit}]').astype(np.int64).astype(float)
+        buckets[np.isnat(dates)] = np.nan
+        return buckets
+
+    def _cover(self, low, high):
+        """Grow the bucket axis so buckets low..high exist"""
+        if len(self):
+            low = min(low, self.first_bucket)
+            high = max(high, self.first_bucket + len(self) - 1)
+        if len(self) and low == self.first_bucket and high - low + 1 == len(self):
+            return
+        n = len(self.characters)
+        offset = self.first_bucket - low if len(self) else 0
+        for name in ('wins', 'games'):
+            grown = np.zeros((high - low + 1, n, n, 2), dtype=self.wins.dtype)
+            old = getattr(self, name)
+            grown[offset:offset + len(old)] = old
+            setattr(self, name, grown)
+        self.first_bucket = low
+
+    def add(self, buckets, pair, p1_wins, p2_wins, lo_games, hi_games):
+        """Add per-set (or per-group) counts, with buckets NaN where the date is unknown"""
+        dated = ~np.isnan(buckets)
+        # Attributed sets are split into fractions that sum back to one per set
+        self.undated_sets += int(round(p1_wins[~dated].sum() + p2_wins[~dated].sum()))
+        if not dated.any():
+            return
+        bucket = buckets[dated].astype(np.int64)
+        self._cover(int(bucket.min()), int(bucket.max()))
+        n = len(self.characters)
+        cell = (bucket - self.first_bucket) * n * n + pair[dated]
+        shape = (len(self), n, n)
+        for target, side, weights in ((self.wins, 0, p1_wins), (self.wins, 1, p2_wins),
+                                      (self.games, 0, lo_games), (self.games, 1, hi_games)):
+            added = np.bincount(cell, weights=weights[dated], minlength=shape[0] * n * n)
+            target[:, :, :, side] += added.astype(target.dtype).reshape(shape)
+
+    def merge(self, other):
+        """Add another cube over the same roster into this one"""
+        if not len(other):
+            self.undated_sets += other.undated_sets
+            return self
+        self._cover(other.first_bucket, other.first_bucket + len(other) - 1)
+        start = other.first_bucket - self.first_bucket
+        self.wins[start:start + len(other)] += other.wins
+        self.games[start:start + len(other)] += other.games
+        self.undated_sets += other.undated_sets
+        return self
+
+    def with_characters(self, characters):
+        """Return a copy re-indexed onto a superset of this roster"""
+        characters = sorted(set(characters) | set(self.characters))
+        if characters == self.characters:
+            return self
+        remapped = MatchupCube(characters, self.bucket, self.wins.dtype)
+        code_of = {name: code for code, name in enumerate(characters)}
+        old_to_new = np.array([code_of[name] for name in self.characters], dtype=np.int64)
+        n = len(characters)
+        remapped.first_bucket = self.first_bucket
+        remapped.wins = np.zeros((len(self), n, n, 2), dtype=self.wins.dtype)
+        remapped.games = np.zeros((len(self), n, n, 2), dtype=self.wins.dtype)
+        index = (slice(None),) + np.ix_(old_to_new, old_to_new)
+        remapped.wins[index] = self.wins
+        remapped.games[index] = self.games
+        remapped.undated_sets = self.undated_sets
+        remapped.last_rowid = self.last_rowid
+        return remapped
+
+    def _collapse(self, weights):
+        """MatchupCounts holding the bucket-weighted sum of the cube"""
+        counts = MatchupCounts(self.characters)
+        counts.wins = np.tensordot(weights, self.wins, axes=1)
+        counts.games = np.tensordot(weights, self.games, axes=1)
+        counts.sets_seen = counts.wins.sum()
+        return counts
+
+    def window(self, start=None, end=None):
+        """Counts for the buckets from the one holding start up to (not including) the one holding end"""
+        numbers = self.first_bucket + np.arange(len(self))
+        keep = np.ones(len(self), dtype=bool)
+        if start is not None:
+            keep &= numbers >= self.bucket_of([start])[0]
+        if end is not None:
+            keep &= numbers < self.bucket_of([end])[0]
+        return self._collapse(keep.astype(np.int64))
+
+    def decayed(self, half_life_days, as_of=None):
+        """Counts with each bucket down-weighted by 0.5 ** (age / half_life_days)"""
+        starts = self.periods.astype('datetime64[D]')
+        if as_of is None:
+            # Default to the end of the last bucket
+            as_of = np.datetime64(self.first_bucket + len(self), self.unit)
+        age = (np.datetime64(pd.Timestamp(as_of), 'D') - starts).astype(float)
+        # Buckets starting after as_of are in the future of the query
+        weights = np.where(age >= 0, 0.5 ** (age / half_life_days), 0.0)
+        return self._collapse(weights)
+
+    def save(self, path):
+        """Persist the cube next to the raw counts"""
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                characters=np.array(self.characters, dtype=str),
+                bucket=np.array(self.bucket),
+                first_bucket=np.int64(self.first_bucket),
+                wins=self.wins,
+                games=self.games,
+                undated_sets=np.int64(self.undated_sets),
+                last_rowid=np.int64(self.last_rowid),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Load a cube written by save()"""
+        with np.load(path) as state:
+            cube = cls(state['characters'].tolist(), str(state['bucket']), state['wins'].dtype)
+            cube.first_bucket = int(state['first_bucket'])
+            cube.wins = state['wins']
+            cube.games = state['games']
+            cube.undated_sets = int(state['undated_sets'])
+            cube.last_rowid = int(state['last_rowid'])
+        return cube
+
+
+def load_tournament_buckets(conn, cube):
+    """Map tournament_key to the cube bucket of the tournament's start date"""
+    tournaments = pd.read_sql_query(
+        "SELECT key, MIN(start) AS start FROM tournament_info WHERE start IS NOT NULL GROUP BY key", conn
+    )
+    # start is stored as Unix seconds; fall back to parsing date strings
+    seconds = pd.to_numeric(tournaments['start'], errors='coerce')
+    dates = pd.to_datetime(seconds, unit='s', errors='coerce')
+    dates = dates.fillna(pd.to_datetime(tournaments['start'].where(seconds.isna()), errors='coerce'))
+    return pd.Series(cube.bucket_of(dates), index=tournaments['key'].to_numpy()).dropna()
+
+
+def primary_characters(player_mains):
+    """Normalized most-used character of every player, keyed by player id"""
+    # Normalize each distinct raw name once rather than once per player
+    normalized = np.array([normalize_character_name(name) for name in player_mains.names], dtype=object)
+    return pd.Series(normalized[player_mains.char_codes[:, 0]], index=player_mains.player_ids)
+
+
+def build_player_codes(player_mains):
+    """Map player ids to integer codes of their normalized most-used character"""
+    primary = primary_characters(player_mains)
+    characters = sorted(set(primary))
+    code_of = {name: code for code, name in enumerate(characters)}
+    player_codes = primary.map(code_of).astype(np.int64)
+    return characters, player_codes
+
+
+class PlayerShares:
+    """Each player's top mains as sparse usage-share vectors.
+
+    codes[r, k] is the character code of the k-th main of player row r (-1
+    for an empty slot) and shares[r, k] its share of the player's top-N usage,
+    so every row is a probability vector over the roster with at most N
+    non-zero entries. rows maps player ids to row numbers.
+    """
+
+    def __init__(self, rows, codes, shares):
+        self.rows = rows
+        self.codes = codes
+        self.shares = shares
+
+    def remapped(self, old_to_new):
+        """Copy with character codes moved onto a larger roster"""
+        codes = np.where(self.codes >= 0, old_to_new[np.maximum(self.codes, 0)], -1)
+        return PlayerShares(self.rows, codes, self.shares)
+
+
+def build_player_shares(player_mains):
+    """Usage-share vectors over every player's normalized top mains"""
+    normalized = [normalize_character_name(name) for name in player_mains.names]
+    characters = sorted(set(normalized))
+    code_of = {name: code for code, name in enumerate(characters)}
+    name_to_code = np.array([code_of[name] for name in normalized] + [-1], dtype=np.int64)
+    # -1 padding indexes the trailing -1 entry
+    codes = name_to_code[player_mains.char_codes]
+
+    usage = np.where(codes >= 0, player_mains.usage, 0).astype(float)
+    totals = usage.sum(axis=1, keepdims=True)
+    # Players whose top mains all report zero usage split evenly between them
+    even = (codes >= 0) / np.maximum((codes >= 0).sum(axis=1, keepdims=True), 1)
+    shares = np.divide(usage, totals, out=even, where=totals > 0)
+
+    rows = pd.Series(np.arange(len(player_mains), dtype=np.int64), index=player_mains.player_ids)
+    return characters, PlayerShares(rows, codes, shares)
+
+
+def game_scores(sets_df):
+    """p1/p2 game counts per set, zeroed where a score is missing or negative (DQ)"""
+    p1_score = pd.to_numeric(sets_df['p1_score'], errors='coerce').to_numpy(dtype=float)
+    p2_score = pd.to_numeric(sets_df['p2_score'], errors='coerce').to_numpy(dtype=float)
+    reported = (p1_score >= 0) & (p2_score >= 0)
+    return np.where(reported, p1_score, 0), np.where(reported, p2_score, 0)
+
+
+def fold_sets(sets_df, player_codes, counts, cube=None, tournament_buckets=None):
+    """Add one chunk of sets into the running matchup counts (and time cube).
+
+    player_codes maps player ids to their main's code, or is a PlayerShares
+    to spread each set across both players' top mains.
+    """
+    if isinstance(player_codes, PlayerShares):
+        return attribute_sets(sets_df, player_codes, counts, cube, tournament_buckets)
+    n = len(counts.characters)
+    winner_id = sets_df['winner_id'].astype(str).to_numpy()
+    p1_id = sets_df['p1_id'].astype(str)
+    p2_id = sets_df['p2_id'].astype(str)
+
+    # Skip sets where either player is not in our character database
+    code1 = p1_id.map(player_codes).to_numpy()
+    code2 = p2_id.map(player_codes).to_numpy()
+    valid = ~(np.isnan(code1) | np.isnan(code2))
+    positions = sets_df['set_rowid'].to_numpy()[valid]
+    counts.sets_seen += len(sets_df)
+    if len(sets_df):
+        counts.last_rowid = max(counts.last_rowid, int(sets_df['set_rowid'].max()))
+
+    code1 = code1[valid].astype(np.int64)
+    code2 = code2[valid].astype(np.int64)
+    winner_is_p1 = winner_id[valid] == p1_id.to_numpy()[valid]
+
+    # Matchup key is the alphabetically sorted pair (codes follow name order)
+    pair = np.minimum(code1, code2) * n + np.maximum(code1, code2)
+    slot = pair * 2 + (~winner_is_p1)
+    counts.wins += np.bincount(slot, minlength=n * n * 2).astype(np.int32).reshape(n, n, 2)
+
+    # Games are credited to characters: p1's score goes to lo when p1 plays lo
+    p1_games, p2_games = game_scores(sets_df)
+    p1_is_lo = code1 < code2
+    lo_games = np.where(p1_is_lo, p1_games[valid], p2_games[valid])
+    hi_games = np.where(p1_is_lo, p2_games[valid], p1_games[valid])
+    counts.games[:, :, 0] += np.bincount(pair, weights=lo_games, minlength=n * n).astype(np.int32).reshape(n, n)
+    counts.games[:, :, 1] += np.bincount(pair, weights=hi_games, minlength=n * n).astype(np.int32).reshape(n, n)
+
+    if cube is not None:
+        buckets = sets_df['tournament_key'].map(tournament_buckets).to_numpy(dtype=float, na_value=np.nan)
+        cube.add(buckets[valid], pair, winner_is_p1, ~winner_is_p1, lo_games, hi_games)
+
+    # Remember where each pair first appeared
+    first = pd.Series(pair).drop_duplicates()
+    first_pos = positions[first.index.to_numpy()]
+    pair_ids = first.to_numpy()
+    counts.first_seen[pair_ids] = np.minimum(counts.first_seen[pair_ids], first_pos)
+
+    return counts
+
+
+def counts_dtype(player_codes):
+    """Count dtype for a player mapping: top-3 attribution adds fractional sets"""
+    return np.float64 if isinstance(player_codes, PlayerShares) else np.int32
+
+
+def attribute_sets(sets_df, player_shares, counts, cube=None, tournament_buckets=None):
+    """Fold sets spread over all pairs of the two players' top mains.
+
+    Each set adds the outer product of the two players' usage-share vectors
+    to its outcome slot. With at most N mains per player that outer product
+    has at most N * N non-zero cells, so a chunk is expanded to that many
+    weighted (set, char1, char2) cells and scattered with one bincount per
+    slot, the batched equivalent of summing share1^T x outcome x share2.
+    """
+    n = len(counts.characters)
+    winner_id = sets_df['winner_id'].astype(str).to_numpy()
+    p1_id = sets_df['p1_id'].astype(str)
+    p2_id = sets_df['p2_id'].astype(str)
+
+    # Skip sets where either player is not in our character database
+    row1 = p1_id.map(player_shares.rows).to_numpy(dtype=float, na_value=np.nan)
+    row2 = p2_id.map(player_shares.rows).to_numpy(dtype=float, na_value=np.nan)
+    valid = ~(np.isnan(row1) | np.isnan(row2))
+    positions = sets_df['set_rowid'].to_numpy()[valid]
+    counts.sets_seen += len(sets_df)
+    if len(sets_df):
+        counts.last_rowid = max(counts.last_rowid, int(sets_df['set_rowid'].max()))
+
+    row1 = row1[valid].astype(np.int64)
+    row2 = row2[valid].astype(np.int64)
+    winner_is_p1 = winner_id[valid] == p1_id.to_numpy()[valid]
+
+    # (sets, N, N) grid of main pairs and their share products
+    top_n = player_shares.codes.shape[1]
+    code1 = np.repeat(player_shares.codes[row1][:, :, None], top_n, axis=2)
+    code2 = np.repeat(player_shares.codes[row2][:, None, :], top_n, axis=1)
+    weight = player_shares.shares[row1][:, :, None] * player_shares.shares[row2][:, None, :]
+    cells = weight > 0
+    set_index = np.broadcast_to(np.arange(len(row1))[:, None, None], weight.shape)[cells]
+    code1, code2, weight = code1[cells], code2[cells], weight[cells]
+
+    # Matchup key is the alphabetically sorted pair (codes follow name order)
+    pair = np.minimum(code1, code2) * n + np.maximum(code1, code2)
+    p1_won = winner_is_p1[set_index]
+    p1_wins = np.where(p1_won, weight, 0.0)
+    p2_wins = np.where(p1_won, 0.0, weight)
+    counts.wins[:, :, 0] += np.bincount(pair, weights=p1_wins, minlength=n * n).reshape(n, n)
+    counts.wins[:, :, 1] += np.bincount(pair, weights=p2_wins, minlength=n * n).reshape(n, n)
+
+    # Games are credited to characters: p1's score goes to lo when p1 plays lo
+    p1_games, p2_games = game_scores(sets_df)
+    p1_games, p2_games = p1_games[valid][set_index], p2_games[valid][set_index]
+    p1_is_lo = code1 < code2
+    lo_games = np.where(p1_is_lo, p1_games, p2_games) * weight
+    hi_games = np.where(p1_is_lo, p2_games, p1_games) * weight
+    counts.games[:, :, 0] += np.bincount(pair, weights=lo_games, minlength=n * n).reshape(n, n)
+    counts.games[:, :, 1] += np.bincount(pair, weights=hi_games, minlength=n * n).reshape(n, n)
+
+    if cube is not None:
+        buckets = sets_df['tournament_key'].map(tournament_buckets).to_numpy(dtype=float, na_value=np.nan)
+        cube.add(buckets[valid][set_index], pair, p1_wins, p2_wins, lo_games, hi_games)
+
+    # Remember where each pair first appeared
+    first = pd.Series(pair).drop_duplicates()
+    first_pos = positions[set_index[first.index.to_numpy()]]
+    pair_ids = first.to_numpy()
+    counts.first_seen[pair_ids] = np.minimum(counts.first_seen[pair_ids], first_pos)
+
+    return counts
+
+
+# Roster and player codes shared by every shard a pool worker processes
+_shard_state = {}
+
+
+def _init_shard_worker(db_path, characters, player_codes, chunk_size, cube_bucket, tournament_buckets):
+    """Give each pool worker its own read-only connection and the player codes"""
+    _shard_state['conn'] = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    _shard_state['characters'] = characters
+    _shard_state['player_codes'] = player_codes
+    _shard_state['chunk_size'] = chunk_size
+    _shard_state['cube_bucket'] = cube_bucket
+    _shard_state['tournament_buckets'] = tournament_buckets
+
+
+def count_shard(rowid_range):
+    """Count the sets with rowid in (low, high] into a fresh MatchupCounts (and cube)"""
+    low, high = rowid_range
+    dtype = counts_dtype(_shard_state['player_codes'])
+    counts = MatchupCounts(_shard_state['characters'], dtype)
+    cube = None
+    if _shard_state['cube_bucket'] is not None:
+        cube = MatchupCube(_shard_state['characters'], _shard_state['cube_bucket'], dtype)
+    for sets_df in iter_set_chunks(_shard_state['conn'], _shard_state['chunk_size'],
+                                   after_rowid=low, until_rowid=high):
+        fold_sets(sets_df, _shard_state['player_codes'], counts, cube, _shard_state['tournament_buckets'])
+    return counts, cube
+
+
+def shard_rowid_ranges(conn, after_rowid, shards):
+    """Split the rowids past after_rowid into contiguous (low, high] ranges"""
+    low, high = conn.execute(
+        "SELECT MIN(rowid), MAX(rowid) FROM sets WHERE rowid > ?", (after_rowid,)
+    ).fetchone()
+    if low is None:
+        return []
+    bounds = np.linspace(low - 1, high, shards + 1).astype(np.int64)
+    bounds[0], bounds[-1] = low - 1, high
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def fold_sets_parallel(db_path, player_codes, counts, workers, chunk_size=DEFAULT_CHUNK_SIZE,
+                       cube=None, tournament_buckets=None):
+    """Scan the sets table with a process pool and reduce the shard counts.
+
+    The rowid range is cut into several shards per worker so a slow shard
+    does not leave the other processes idle; each worker reads its shards
+    over its own read-only SQLite connection.
+    """
+    with sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True) as conn:
+        ranges = shard_rowid_ranges(conn, counts.last_rowid, workers * 4)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_shard_worker,
+        initargs=(str(db_path), counts.characters, player_codes, chunk_size,
+                  cube.bucket if cube is not None else None, tournament_buckets),
+    ) as pool:
+        for shard, shard_cube in pool.map(count_shard, ranges):
+            if cube is not None:
+                cube.merge(shard_cube)
+            counts.wins += shard.wins
+            counts.games += shard.games
+            np.minimum(counts.first_seen, shard.first_seen, out=counts.first_seen)
+            counts.sets_seen += shard.sets_seen
+            counts.last_rowid = max(counts.last_rowid, shard.last_rowid)
+            print(f"   Shard done: {counts.sets_seen} sets processed")
+
+    return counts
+
+
+def materialize_primary_characters(conn, player_mains):
+    """Write each player's normalized most-used character into SQLite.
+
+    The table and the covering index on sets let the whole join and GROUP BY
+    run inside SQLite, so only one row per character pair crosses back into
+    Python instead of every player and every set.
+    """
+    primary = primary_characters(player_mains)
+
+    conn.execute("DROP TABLE IF EXISTS player_primary_character")
+    # player_id is left untyped so it keeps the storage class used in players/sets
+    conn.execute("""
+        CREATE TABLE player_primary_character (
+            player_id PRIMARY KEY,
+            character TEXT NOT NULL
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO player_primary_character (player_id, character) VALUES (?, ?)",
+        zip(primary.index.tolist(), primary.tolist())
+    )
+    # Superseded by the covering index below, which also carries the scores
+    conn.execute("DROP INDEX IF EXISTS idx_sets_game_players_winner")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sets_game_players_winner_scores
+        ON sets (game, p1_id, p2_id, winner_id, p1_score, p2_score)
+    """)
+    conn.commit()
+
+
+def materialize_tournament_buckets(conn, tournament_buckets):
+    """Write each tournament's cube bucket into SQLite for the in-database GROUP BY"""
+    conn.execute("DROP TABLE IF EXISTS tournament_bucket")
+    conn.execute("""
+        CREATE TABLE tournament_bucket (
+            tournament_key TEXT PRIMARY KEY,
+            bucket INTEGER NOT NULL
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO tournament_bucket (tournament_key, bucket) VALUES (?, ?)",
+        zip(tournament_buckets.index.tolist(), tournament_buckets.astype(np.int64).tolist())
+    )
+    conn.commit()
+
+
+def aggregate_in_database(conn, counts, cube=None):
+    """Fold per-pair counts computed by a single SQLite aggregate query.
+
+    With a cube the query also groups by tournament_bucket, which
+    materialize_tournament_buckets() must have written first.
+    """
+    bucket_column = "tb.bucket" if cube is not None else "NULL"
+    bucket_join = "LEFT JOIN tournament_bucket AS tb ON tb.tournament_key = s.tournament_key" \
+        if cube is not None else ""
+    pair_query = f"""
+        SELECT c1.character AS char1,
+               c2.character AS char2,
+               {bucket_column} AS bucket,
+               SUM(s.winner_id = s.p1_id) AS p1_wins,
+               SUM(s.winner_id != s.p1_id) AS p2_wins,
+               SUM(CASE WHEN s.p1_score >= 0 AND s.p2_score >= 0 THEN s.p1_score ELSE 0 END) AS p1_games,
+               SUM(CASE WHEN s.p1_score >= 0 AND s.p2_score >= 0 THEN s.p2_score ELSE 0 END) AS p2_games,
+               MIN(s.rowid) AS first_rowid,
+               MAX(s.rowid) AS last_rowid
+        FROM sets AS s
+        JOIN player_primary_character AS c1 ON c1.player_id = s.p1_id
+        JOIN player_primary_character AS c2 ON c2.player_id = s.p2_id
+        {bucket_join}
+        WHERE s.rowid > ?
+          AND {SETS_FILTER}
+        GROUP BY c1.character, c2.character, bucket
+    """
+    pairs_df = pd.read_sql_query(pair_query, conn, params=(counts.last_rowid,))
+    if pairs_df.empty:
+        return pairs_df
+
+    n = len(counts.characters)
+    code_of = {name: code for code, name in enumerate(counts.characters)}
+    code1 = pairs_df['char1'].map(code_of).to_numpy(dtype=np.int64)
+    code2 = pairs_df['char2'].map(code_of).to_numpy(dtype=np.int64)
+    lo = np.minimum(code1, code2)
+    hi = np.maximum(code1, code2)
+
+    # (a, b) and (b, a) rows land on the same sorted pair, so accumulate with add.at
+    np.add.at(counts.wins, (lo, hi, 0), pairs_df['p1_wins'].to_numpy(dtype=np.int32))
+    np.add.at(counts.wins, (lo, hi, 1), pairs_df['p2_wins'].to_numpy(dtype=np.int32))
+    p1_games = pairs_df['p1_games'].to_numpy(dtype=np.int32)
+    p2_games = pairs_df['p2_games'].to_numpy(dtype=np.int32)
+    p1_is_lo = code1 < code2
+    np.add.at(counts.games, (lo, hi, 0), np.where(p1_is_lo, p1_games, p2_games))
+    np.add.at(counts.games, (lo, hi, 1), np.where(p1_is_lo, p2_games, p1_games))
+    if cube is not None:
+        cube.add(pairs_df['bucket'].to_numpy(dtype=float, na_value=np.nan), lo * n + hi,
+                 pairs_df['p1_wins'].to_numpy(), pairs_df['p2_wins'].to_numpy(),
+                 np.where(p1_is_lo, p1_games, p2_games), np.where(p1_is_lo, p2_games, p1_games))
+    np.minimum.at(counts.first_seen, lo * n + hi, pairs_df['first_rowid'].to_numpy(dtype=np.int64))
+    counts.sets_seen += int(pairs_df['p1_wins'].sum() + pairs_df['p2_wins'].sum())
+    counts.last_rowid = max(counts.last_rowid, int(pairs_df['last_rowid'].max()))
+    return pairs_df
+
+
+def counts_to_dataframe(counts, min_games=5, games=False):
+    """Convert pair counts to the character_matchups.csv layout.
+
+    With games=True the game-level columns are added and min_games applies
+    to the number of games played rather than the number of sets.
+    """
+    n = len(counts.characters)
+    # Integer counts widen to int64; decayed cube counts stay float
+    dtype = np.promote_types(counts.wins.dtype, np.int64)
+    p1_wins = counts.wins[:, :, 0].ravel().astype(dtype)
+    p2_wins = counts.wins[:, :, 1].ravel().astype(dtype)
+    total_games = p1_wins + p2_wins
+    char1_games = counts.games[:, :, 0].ravel().astype(dtype)
+    char2_games = counts.games[:, :, 1].ravel().astype(dtype)
+    game_count = char1_games + char2_games
+
+    # Only keep matchups with at least min_games games, in first-seen order
+    keep = np.flatnonzero((game_count if games else total_games) >= min_games)
+    keep = keep[np.argsort(counts.first_seen[keep], kind='stable')]
+
+    lo, hi = np.divmod(keep, n)
+    names = np.array(counts.characters, dtype=object)
+    # Mirror matchups fall into the char1 >= char2 branch of the original comparison
+    distinct = lo != hi
+    char1_wins = np.where(distinct, p1_wins[keep], p2_wins[keep])
+    char2_wins = np.where(distinct, p2_wins[keep], p1_wins[keep])
+
+    matchups_df = pd.DataFrame({
+        'character_1': names[lo],
+        'character_2': names[hi],
+        'char1_wins': char1_wins,
+        'char2_wins': char2_wins,
+        'total_games': total_games[keep],
+        'char1_winrate': char1_wins / total_games[keep],
+    })
+    if games:
+        matchups_df['char1_game_wins'] = char1_games[keep]
+        matchups_df['char2_game_wins'] = char2_games[keep]
+        matchups_df['game_count'] = game_count[keep]
+        # Pairs whose sets all lack scores have no games to divide by
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matchups_df['char1_game_winrate'] = char1_games[keep] / game_count[keep]
+    return matchups_df
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build character_matchups.csv from the tournament database")
+    parser.add_argument('--db', help="Path to ultimate_player_database.db (searched for if omitted)")
+    parser.add_argument('--output', help="Output CSV path (defaults to 1_Data_Files/character_matchups.csv)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Sets read from SQLite per chunk (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="Only process the first N sets (default: the whole table)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only process sets newer than the saved high-water mark and merge "
+                             "them into the saved counts (assumes existing sets are never edited)")
+    parser.add_argument('--in-db', action='store_true',
+                        help="Aggregate inside SQLite: materializes player_primary_character, "
+                             "adds a covering index on sets and runs one GROUP BY query")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Scan the sets table with this many processes (default 1)")
+    parser.add_argument('--state', help="Raw counts state file (defaults to "
+                                        "character_matchup_counts.npz next to the output CSV)")
+    parser.add_argument('--games', action='store_true',
+                        help="Add game-level win columns from p1_score/p2_score and apply "
+                             "--min-games to games played instead of sets")
+    parser.add_argument('--min-games', type=int, default=5,
+                        help="Drop matchups with fewer sets (or games with --games) than this (default 5)")
+    parser.add_argument('--attribution', choices=['primary', 'top3'], default='primary',
+                        help="Credit each set to both players' most-used character (primary, default) "
+                             "or spread it over all pairs of their top-3 mains by usage share (top3)")
+    parser.add_argument('--cube', action='store_true',
+                        help="Also save counts per tournament-date bucket to character_matchup_cube.npz "
+                             "(query it with query_matchup_cube.py)")
+    parser.add_argument('--cube-bucket', choices=sorted(MatchupCube.BUCKET_UNITS), default='month',
+                        help="Time bucket size of the cube (default month)")
+    parser.add_argument('--player-cache', help="Parsed player characters cache (defaults to "
+                                               "player_mains.npz next to the output CSV)")
+    args = parser.parse_args(argv)
+    if args.in_db and args.limit is not None:
+        parser.error("--limit only applies to streaming ingestion, not --in-db")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and (args.in_db or args.limit is not None):
+        parser.error("--workers cannot be combined with --in-db or --limit")
+    if args.in_db and args.attribution != 'primary':
+        parser.error("--in-db only supports --attribution primary")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 70)
+    print("BUILDING MATCHUP DATASET")
+    print("=" * 70)
+
+    db_path = Path(args.db) if args.db else find_database()
+    conn = sqlite3.connect(str(db_path))
+    start_time = time.perf_counter()
+
+    # Save to CSV (save to 1_Data_Files directory if it exists)
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        data_dir = script_dir.parent / "1_Data_Files"
+        if data_dir.exists():
+            output_path = data_dir / 'character_matchups.csv'
+        else:
+            output_path = script_dir / 'character_matchups.csv'
+    state_path = Path(args.state) if args.state else output_path.parent / 'character_matchup_counts.npz'
+    cache_path = Path(args.player_cache) if args.player_cache else output_path.parent / 'player_mains.npz'
+    cube_path = output_path.parent / 'character_matchup_cube.npz'
+
+    # Step 1: Get all players with their character usage
+    print("\n1. Loading player character data...")
+    player_mains = load_player_mains(conn, cache_path)
+    print(f"   {len(player_mains)} players with valid character data")
+
+    # Step 2 + 3: Stream tournament sets and fold them into matchup pairs
+    if args.attribution == 'top3':
+        characters, player_codes = build_player_shares(player_mains)
+    else:
+        characters, player_codes = build_player_codes(player_mains)
+    dtype = counts_dtype(player_codes)
+    matchup_counts = None
+    cube = None
+    if args.incremental and state_path.exists():
+        try:
+            matchup_counts = MatchupCounts.load(state_path).with_characters(characters)
+            if matchup_counts.wins.dtype != dtype:
+                raise ValueError(f"'{state_path}' was built with a different --attribution")
+            if args.cube:
+                if not cube_path.exists():
+                    raise ValueError(f"no saved cube at '{cube_path}'")
+                cube = MatchupCube.load(cube_path).with_characters(matchup_counts.characters)
+                if cube.bucket != args.cube_bucket or cube.last_rowid != matchup_counts.last_rowid:
+                    raise ValueError(f"'{cube_path}' is out of sync with the saved counts")
+        except ValueError as e:
+            print(f"\n   Cannot resume ({e}), doing a full rebuild")
+            matchup_counts = cube = None
+        else:
+            print(f"\n2. Resuming from '{state_path}' (sets after rowid {matchup_counts.last_rowid})...")
+    elif args.incremental:
+        print(f"\n   No saved counts at '{state_path}', doing a full rebuild")
+    if matchup_counts is None:
+        matchup_counts = MatchupCounts(characters, dtype)
+        if args.cube:
+            cube = MatchupCube(characters, args.cube_bucket, dtype)
+        if args.in_db:
+            print("\n2. Reading tournament sets inside SQLite...")
+        else:
+            print(f"\n2. Streaming tournament sets ({args.chunk_size} per chunk)...")
+    # Player codes must index the (possibly larger) merged roster
+    if matchup_counts.characters != characters:
+        code_of = {name: code for code, name in enumerate(matchup_counts.characters)}
+        old_to_new = np.array([code_of[name] for name in characters], dtype=np.int64)
+        if isinstance(player_codes, PlayerShares):
+            player_codes = player_codes.remapped(old_to_new)
+        else:
+            player_codes = pd.Series(old_to_new[player_codes.to_numpy()], index=player_codes.index)
+
+    tournament_buckets = None
+    if cube is not None:
+        tournament_buckets = load_tournament_buckets(conn, cube)
+        print(f"   Dated {len(tournament_buckets)} tournaments into {cube.bucket}ly buckets")
+
+    print("\n3. Building matchup pairs...")
+    sets_start = time.perf_counter()
+    total_sets = 0
+    if args.in_db:
+        print("   Aggregating inside SQLite...")
+        materialize_primary_characters(conn, player_mains)
+        if cube is not None:
+            materialize_tournament_buckets(conn, tournament_buckets)
+        sets_before = matchup_counts.sets_seen
+        pairs_df = aggregate_in_database(conn, matchup_counts, cube)
+        total_sets = matchup_counts.sets_seen - sets_before
+        print(f"   {len(pairs_df)} pair rows returned for {total_sets} matched sets")
+    elif args.workers > 1:
+        print(f"   Scanning with {args.workers} worker processes...")
+        sets_before = matchup_counts.sets_seen
+        fold_sets_parallel(db_path, player_codes, matchup_counts, args.workers, args.chunk_size,
+                           cube, tournament_buckets)
+        total_sets = matchup_counts.sets_seen - sets_before
     else:
-        matchup_counts[matchup_key]['p2_wins'] += 1
-
-print(f"\n4. Found {len(matchup_counts)} unique matchup pairs")
-
-# Convert to dataframe
-matchup_data = []
-for (char1, char2), counts in matchup_counts.items():
-    total_games = counts['p1_wins'] + counts['p2_wins']
-    if total_games >= 5:  # Only keep matchups with at least 5 games
-        matchup_data.append({
-            'character_1': char1,
-            'character_2': char2,
-            'char1_wins': counts['p1_wins'] if char1 < char2 else counts['p2_wins'],
-            'char2_wins': counts['p2_wins'] if char1 < char2 else counts['p1_wins'],
-            'total_games': total_games,
-            'char1_winrate': counts['p1_wins'] / total_games if char1 < char2 else counts['p2_wins'] / total_games
-        })
-
-matchups_df = pd.DataFrame(matchup_data)
-print(f"   {len(matchups_df)} matchups with >= 5 games")
-
-# Save to CSV (save to 1_Data_Files directory if it exists)
-data_dir = script_dir.parent / "1_Data_Files"
-if data_dir.exists():
-    output_path = data_dir / 'character_matchups.csv'
-else:
-    output_path = script_dir / 'character_matchups.csv'
-
-matchups_df.to_csv(output_path, index=False)
-print(f"\n5. Saved matchup data to '{output_path}'")
-
-# Show sample
-print("\n6. Sample matchup data:")
-print(matchups_df.head(20))
-
-conn.close()
-print("\n" + "=" * 70)
-print("DATASET BUILDING COMPLETE")
-print("=" * 70)
+        set_chunks = iter_set_chunks(conn, args.chunk_size, args.limit, after_rowid=matchup_counts.last_rowid)
+        for chunk_number, sets_df in enumerate(set_chunks, 1):
+            fold_sets(sets_df, player_codes, matchup_counts, cube, tournament_buckets)
+            total_sets += len(sets_df)
+            elapsed = time.perf_counter() - sets_start
+            print(f"   Chunk {chunk_number}: {total_sets} sets processed "
+                  f"({total_sets / elapsed if elapsed > 0 else 0:,.0f} sets/sec)")
+    sets_elapsed = time.perf_counter() - sets_start
+    print(f"   Loaded {total_sets} sets")
+
+    print(f"\n4. Found {len(matchup_counts)} unique matchup pairs")
+
+    # Convert to dataframe
+    matchups_df = counts_to_dataframe(matchup_counts, args.min_games, games=args.games)
+    counted = "games" if args.games else "sets"
+    print(f"   {len(matchups_df)} matchups with >= {args.min_games} {counted}")
+
+    save_table(matchups_df, output_path)
+    matchup_counts.save(state_path)
+    build_matchup_matrix(output_path)
+    print(f"\n5. Saved matchup data to '{output_path}'")
+    print(f"   Saved dense matchup matrix to '{default_matrix_path(output_path)}'")
+    print(f"   Saved raw counts (high-water rowid {matchup_counts.last_rowid}) to '{state_path}'")
+    if cube is not None:
+        cube.last_rowid = matchup_counts.last_rowid
+        cube.save(cube_path)
+        print(f"   Saved {len(cube)} {cube.bucket}ly buckets to '{cube_path}' "
+              f"({cube.undated_sets} sets without a tournament date)")
+
+    # Show sample
+    print("\n6. Sample matchup data:")
+    print(matchups_df.head(20))
+
+    conn.close()
+
+    # Throughput report for sizing hardware
+    total_elapsed = time.perf_counter() - start_time
+    rss = peak_rss_mb()
+    print("\n7. Run statistics:")
+    print(f"   Sets processed: {total_sets}")
+    print(f"   Set throughput: {total_sets / sets_elapsed if sets_elapsed > 0 else 0:,.0f} rows/sec")
+    print(f"   Total time:     {total_elapsed:.2f}s")
+    print(f"   Peak RSS:       {f'{rss:.1f} MB' if rss is not None else 'n/a'}")
+
+    print("\n" + "=" * 70)
+    print("DATASET BUILDING COMPLETE")
+    print("=" * 70)
+
 
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,12 @@ import warnings
 warnings.filterwarnings('ignore')
 from pathlib import Path
 
+from bradley_terry import PAIR_COLUMNS, BradleyTerryRegressor, character_codes
+from data_store import load_table, save_table
+from feature_store import ATTRIBUTES, load_pairwise_features
+from model_registry import save_model
+from roster import load_roster
+
 def get_data_path(filename):
     """Find data file in 1_Data_Files or current directory"""
     script_dir = Path(__file__).parent
@@ -31,89 +37,31 @@ print("=" * 70)
 
 # 1. Load data
 print("\n1. Loading data...")
-matchups_df = pd.read_csv(get_data_path('character_matchups.csv'))
-char_attrs = pd.read_csv(get_data_path('smash.csv'))
+matchups_df = load_table(get_data_path('character_matchups.csv'))
+char_attrs = load_table(get_data_path('smash.csv'))
 
 print(f"   Matchups: {len(matchups_df)}")
 print(f"   Characters: {len(char_attrs)}")
 
-# 2. Normalize character names
-print("\n2. Normalizing character names...")
-name_variations = {
-    'metaknight': 'Meta Knight',
-    'littlemac': 'Little Mac',
-    'pokemon trainer': 'Pokemon Trainer',
-    'king k. rool': 'King K. Rool',
-    'king dedede': 'King Dedede',
-    'diddy kong': 'Diddy Kong',
-    'young link': 'Young Link',
-    'toon link': 'Toon Link',
-    'dr. mario': 'Dr. Mario',
-    'mr. game & watch': 'Mr. Game & Watch',
-    'zero suit samus': 'Zero Suit Samus',
-    'wii fit trainer': 'Wii Fit Trainer',
-    'rosalina & luma': 'Rosalina & Luma',
-    'banjo & kazooie': 'Banjo & Kazooie',
-    'piranha plant': 'Piranha Plant',
-    'pyra mythra': 'Pyra Mythra',
-    'mii brawler': 'Mii Brawler',
-    'mii swordfighter': 'Mii Swordfighter',
-    'mii gunner': 'Mii Gunner',
-    'ice climbers': 'Ice Climbers'
-}
+# 2. Pairwise features: normalized names, merged attributes and _diff columns
+print("\n2. Loading pairwise features...")
+roster = load_roster(get_data_path('smash.csv'))
 
 def normalize_char_name(matchup_name):
     """Convert matchup character name to match smash.csv format"""
-    matchup_name = matchup_name.lower().strip()
-    
-    if matchup_name in name_variations:
-        return name_variations[matchup_name]
-    
-    for smash_name in char_attrs['name']:
-        if smash_name.lower() == matchup_name:
-            return smash_name
-    
-    return matchup_name.title()
+    return roster.normalize(matchup_name)
 
-matchups_df['char1_normalized'] = matchups_df['character_1'].apply(normalize_char_name)
-matchups_df['char2_normalized'] = matchups_df['character_2'].apply(normalize_char_name)
-
-# 3. Merge with character attributes
-print("\n3. Merging with character attributes...")
-char1_attrs = char_attrs.add_suffix('_char1')
-char1_attrs = char1_attrs.rename(columns={'name_char1': 'char1_normalized'})
-
-char2_attrs = char_attrs.add_suffix('_char2')
-char2_attrs = char2_attrs.rename(columns={'name_char2': 'char2_normalized'})
-
-matchups_with_attrs = matchups_df.merge(
-    char1_attrs, on='char1_normalized', how='inner'
-).merge(
-    char2_attrs, on='char2_normalized', how='inner'
-)
+features = load_pairwise_features(get_data_path('character_matchups.csv'), get_data_path('smash.csv'))
+matchups_with_attrs = features.frame
+feature_data = features.attribute_features
+attributes = ATTRIBUTES
+print(f"   {'Reused' if features.cached else 'Built and stored'} feature table {features.key[:12]}")
 
 print(f"   Matchups with attributes: {len(matchups_with_attrs)}")
-
-# 4. Create feature differences
-print("\n4. Creating feature differences...")
-attributes = ['weight', 'recovery', 'speed', 'combo_game', 'projectiles', 
-              'killpower', 'ledgetrap', 'edgeguard', 'spacing', 'cheese']
-
-feature_data = []
-for attr in attributes:
-    char1_col = f"{attr}_char1"
-    char2_col = f"{attr}_char2"
-    
-    if char1_col in matchups_with_attrs.columns and char2_col in matchups_with_attrs.columns:
-        matchups_with_attrs[f"{attr}_diff"] = (
-            matchups_with_attrs[char1_col] - matchups_with_attrs[char2_col]
-        )
-        feature_data.append(f"{attr}_diff")
-
 print(f"   Created {len(feature_data)} features")
 
-# 5. Prepare training data
-print("\n5. Preparing training data...")
+# 3. Prepare training data
+print("\n3. Preparing training data...")
 X = matchups_with_attrs[feature_data].copy()
 y = matchups_with_attrs['char1_winrate'].copy()
 
@@ -130,8 +78,8 @@ X_train, X_test, y_train, y_test = train_test_split(
 
 print(f"   Training: {len(X_train)}, Test: {len(X_test)}")
 
-# 6. Train models
-print("\n6. Training models...")
+# 4. Train models
+print("\n4. Training models...")
 
 # Linear Regression
 lr_model = LinearRegression()
@@ -148,10 +96,17 @@ gb_model = GradientBoostingRegressor(n_estimators=100, max_depth=5, random_state
 gb_model.fit(X_train, y_train)
 gb_pred = gb_model.predict(X_test)
 
+# Bradley-Terry: the two characters alone, fitted from the training matchups' win counts
+pairs = pd.DataFrame(character_codes(matchups_with_attrs), columns=PAIR_COLUMNS, index=matchups_with_attrs.index)
+bt_model = BradleyTerryRegressor()
+bt_model.fit(pairs.loc[X_train.index], y_train,
+             sample_weight=matchups_with_attrs.loc[X_train.index, 'total_games'])
+bt_pred = bt_model.predict(pairs.loc[X_test.index])
+
 print("   Models trained!")
 
-# 7. Evaluate models
-print("\n7. Evaluating models...")
+# 5. Evaluate models
+print("\n5. Evaluating models...")
 
 def evaluate_model(y_true, y_pred, model_name):
     mse = mean_squared_error(y_true, y_pred)
@@ -170,12 +125,13 @@ results = []
 results.append(evaluate_model(y_test, lr_pred, "Linear Regression"))
 results.append(evaluate_model(y_test, rf_pred, "Random Forest"))
 results.append(evaluate_model(y_test, gb_pred, "Gradient Boosting"))
+results.append(evaluate_model(y_test, bt_pred, "Bradley-Terry"))
 
 results_df = pd.DataFrame(results)
 print("\n" + "=" * 70)
 
-# 8. Feature importance
-print("\n8. Feature Importance (Random Forest):")
+# 6. Feature importance
+print("\n6. Feature Importance (Random Forest):")
 feature_importance = pd.DataFrame({
     'feature': feature_data,
     'importance': rf_model.feature_importances_
@@ -184,19 +140,24 @@ feature_importance = pd.DataFrame({
 print("\nTop 10 Most Important Features:")
 print(feature_importance.head(10).to_string(index=False))
 
-# 9. Save model and results
-print("\n9. Saving results...")
-matchups_with_attrs.to_csv('matchups_with_attributes.csv', index=False)
+# 7. Save model and results
+print("\n7. Saving results...")
+save_table(matchups_with_attrs, 'matchups_with_attributes.csv')
 results_df.to_csv('model_results.csv', index=False)
 feature_importance.to_csv('feature_importance.csv', index=False)
+rf_results = results[1]
+model_path = save_model('matchup_regressor', rf_model, feature_data, data_key=features.key,
+                        metrics={'r2': rf_results['r2'], 'rmse': rf_results['rmse'],
+                                 'mae': rf_results['mae'], 'n_train': len(X_train)})
 
 print("   Saved files:")
 print("     - matchups_with_attributes.csv")
 print("     - model_results.csv")
 print("     - feature_importance.csv")
+print(f"     - Random Forest model: {model_path}")
 
-# 10. Example predictions
-print("\n10. Example Predictions:")
+# 8. Example predictions
+print("\n8. Example Predictions:")
 
 def predict_matchup(char1_name, char2_name, model=rf_model):
     char1_norm = normalize_char_name(char1_name)
@@ -10,6 +10,9 @@ import warnings
 warnings.filterwarnings('ignore')
 from pathlib import Path
 
+from data_store import load_table
+from matchup_matrix import load_matchup_matrix
+
 def get_data_path(filename, results_dir=False):
     """Find data file in 1_Data_Files, 4_Results, or current directory"""
     script_dir = Path(__file__).parent
@@ -48,8 +51,8 @@ print("=" * 70)
 
 # 1. Load data
 print("\n1. Loading data...")
-matchups_df = pd.read_csv(get_data_path('character_matchups.csv'))
-char_attrs = pd.read_csv(get_data_path('smash.csv'))
+matchups_df = load_table(get_data_path('character_matchups.csv'))
+char_attrs = load_table(get_data_path('smash.csv'))
 try:
     feature_importance = pd.read_csv(get_data_path('feature_importance_enhanced.csv', results_dir=True))
     enhanced = True
@@ -161,31 +164,10 @@ print("\n6. Creating matchup matrix heatmap...")
 # Select top characters by popularity
 top_chars = char_attrs.nlargest(15, 'popularity')['name'].tolist()
 
-# Create matchup matrix for top characters
-matchup_matrix = pd.DataFrame(index=top_chars, columns=top_chars)
-for char1 in top_chars:
-    for char2 in top_chars:
-        if char1 == char2:
-            matchup_matrix.loc[char1, char2] = 0.5  # Even for same character
-        else:
-            # Find matchup
-            matchup = matchups_df[
-                ((matchups_df['character_1'] == char1.lower()) & 
-                 (matchups_df['character_2'] == char2.lower())) |
-                ((matchups_df['character_1'] == char2.lower()) & 
-                 (matchups_df['character_2'] == char1.lower()))
-            ]
-            if len(matchup) > 0:
-                row = matchup.iloc[0]
-                if row['character_1'] == char1.lower():
-                    winrate = row['char1_winrate']
-                else:
-                    winrate = 1 - row['char1_winrate']
-                matchup_matrix.loc[char1, char2] = winrate
-            else:
-                matchup_matrix.loc[char1, char2] = np.nan
-
-matchup_matrix = matchup_matrix.astype(float)
+# Slice the top characters out of the dense matchup matrix (names resolved
+# through the roster, so every spelling in the matchup data is counted)
+matrix = load_matchup_matrix(get_data_path('character_matchups.csv'))
+matchup_matrix = matrix.submatrix(top_chars)
 
 plt.figure(figsize=(12, 10))
 sns.heatmap(matchup_matrix, annot=True, fmt='.2f', cmap='RdYlGn', center=0.5, 
@@ -0,0 +1,219 @@
+"""
+Typed columnar storage for the tables in 1_Data_Files
+
+Every CSV keeps being written as the export format, but next to it an Arrow
+IPC (Feather v2) copy with a fixed schema is stored (character_matchups.csv
+-> character_matchups.arrow). load_table() memory-maps that copy when it is
+up to date, projects columns and applies row filters on the Arrow side, and
+only converts what is left to pandas, so scripts skip text parsing and dtype
+inference. Otherwise it parses the CSV once with the explicit dtypes below
+and writes the columnar copy for the next run.
+
+pyarrow is optional: without it load_table() falls back to pandas' CSV
+reader with the same dtypes, projection and filters.
+"""
+import operator
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+except ImportError:  # CSV-only installs keep working, just without the columnar copies
+    pa = pc = feather = None
+
+# Explicit dtypes per table (keyed by CSV file name). Columns not listed are
+# inferred once when the CSV is converted and then fixed by the Arrow schema.
+_MATCHUP_COLUMNS = {
+    'character_1': 'str',
+    'character_2': 'str',
+    'char1_wins': 'int64',
+    'char2_wins': 'int64',
+    'total_games': 'int64',
+    'char1_winrate': 'float64',
+}
+_ATTRIBUTE_COLUMNS = {
+    **_MATCHUP_COLUMNS,
+    'char1_normalized': 'str',
+    'char2_normalized': 'str',
+}
+SCHEMAS = {
+    'character_matchups.csv': _MATCHUP_COLUMNS,
+    'smash.csv': {
+        'id': 'int64',
+        'name': 'str',
+        'weight': 'int64',
+        'recovery': 'int64',
+        'speed': 'int64',
+        'combo_game': 'int64',
+        'projectiles': 'int64',
+        'killpower': 'int64',
+        'ledgetrap': 'int64',
+        'edgeguard': 'int64',
+        'spacing': 'int64',
+        'cheese': 'float64',
+        'popularity': 'int64',
+        'pro_scene': 'float64',
+        'online_winrate': 'float64',
+        'easy': 'float64',
+    },
+    'ultimate_param.csv': {'Description': 'str'},
+    'matchups_with_attributes.csv': _ATTRIBUTE_COLUMNS,
+    'matchups_enhanced.csv': {**_ATTRIBUTE_COLUMNS, 'matchup_binary': 'str'},
+}
+
+# Extra pd.read_csv arguments for CSVs that are not plain tables
+READ_OPTIONS = {
+    'ultimate_param.csv': {'skiprows': 2},
+}
+
+# Schema metadata key recording which CSV the columnar copy was written from
+_SOURCE_KEY = b'source_csv'
+
+# Comparison operators of (column, op, value) filters; the same functions
+# work on pandas Series and, via pyarrow.compute, on Arrow columns
+_OPERATORS = {
+    '==': operator.eq, '=': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+_ARROW_OPERATORS = {
+    '==': 'equal', '=': 'equal', '!=': 'not_equal',
+    '<': 'less', '<=': 'less_equal', '>': 'greater', '>=': 'greater_equal',
+}
+
+
+def columnar_path(csv_path):
+    """Arrow IPC path stored next to a CSV"""
+    return Path(csv_path).with_suffix('.arrow')
+
+
+def csv_signature(csv_path):
+    """Size and modification time identifying one version of a CSV"""
+    stat = Path(csv_path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+
+def _is_current(table, csv_path):
+    """True when a columnar copy was written from the CSV as it is now"""
+    if not Path(csv_path).exists():
+        return True
+    metadata = table.schema.metadata or {}
+    return metadata.get(_SOURCE_KEY) == csv_signature(csv_path)
+
+
+def _write_columnar(df, csv_path):
+    """Write df as the uncompressed (memory-mappable) Arrow copy of csv_path"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_SOURCE_KEY] = csv_signature(csv_path)
+    table = table.replace_schema_metadata(metadata)
+    # Swap the new file in whole so other processes never map a partial copy
+    path = columnar_path(csv_path)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Still mapped by another process (Windows); the next load rewrites it
+        tmp_path.unlink(missing_ok=True)
+    return table
+
+
+def read_csv_typed(csv_path, columns=None):
+    """Parse a CSV with its declared dtypes"""
+    name = Path(csv_path).name
+    options = dict(READ_OPTIONS.get(name, {}))
+    dtypes = SCHEMAS.get(name, {})
+    if columns is not None:
+        options['usecols'] = columns
+    try:
+        return pd.read_csv(csv_path, dtype=dtypes, **options)
+    except (ValueError, TypeError):
+        # e.g. fractional counts from --attribution top3 in an int64 column
+        return pd.read_csv(csv_path, **options)
+
+
+def _arrow_filter(table, filters):
+    """Rows of an Arrow table where every (column, op, value) filter holds"""
+    mask = None
+    for column, op, value in filters:
+        if op in ('in', 'not in'):
+            keep = pc.is_in(table[column], value_set=pa.array(list(value)))
+            if op == 'not in':
+                keep = pc.invert(keep)
+        else:
+            keep = getattr(pc, _ARROW_OPERATORS[op])(table[column], value)
+        mask = keep if mask is None else pc.and_(mask, keep)
+    return table.filter(pc.fill_null(mask, False))
+
+
+def _apply_filters(df, filters):
+    """Row filter for the CSV fallback, same semantics as _arrow_filter()"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        if op == 'in':
+            mask &= df[column].isin(value).to_numpy()
+        elif op == 'not in':
+            mask &= ~df[column].isin(value).to_numpy()
+        else:
+            mask &= _OPERATORS[op](df[column], value).to_numpy()
+    return df[mask].reset_index(drop=True)
+
+
+def _select(csv_path, columns=None, filters=None):
+    """Projected and filtered Arrow table, refreshing the columnar copy if stale"""
+    csv_path = Path(csv_path)
+    needed = None if columns is None else list(dict.fromkeys(
+        list(columns) + [column for column, _, _ in filters or []]))
+    path = columnar_path(csv_path)
+    table = feather.read_table(path, columns=needed, memory_map=True) if path.exists() else None
+    if table is None or not _is_current(table, csv_path):
+        # Drop the memory map before the file is rewritten (required on Windows)
+        table = None
+        table = _write_columnar(read_csv_typed(csv_path), csv_path)
+        if needed is not None:
+            table = table.select(needed)
+    if filters:
+        table = _arrow_filter(table, filters)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+
+def load_table(csv_path, columns=None, filters=None):
+    """Load a 1_Data_Files table as a DataFrame.
+
+    columns projects to a subset of columns; filters is a list of
+    (column, op, value) tuples that must all hold, e.g.
+    [('total_games', '>=', 20)]. Both are applied to the memory-mapped Arrow
+    table, so only the selected cells are ever converted to pandas.
+    """
+    if feather is not None:
+        return _select(csv_path, columns, filters).to_pandas()
+
+    needed = None if columns is None else list(dict.fromkeys(
+        list(columns) + [column for column, _, _ in filters or []]))
+    df = read_csv_typed(csv_path, needed)
+    if filters:
+        df = _apply_filters(df, filters)
+    return df if columns is None else df[list(columns)]
+
+
+def load_arrays(csv_path, columns, filters=None):
+    """Load columns of a table as a dict of NumPy arrays, skipping pandas"""
+    if feather is not None:
+        table = _select(csv_path, columns, filters)
+        return {column: table[column].to_numpy() for column in columns}
+    df = load_table(csv_path, columns, filters)
+    return {column: df[column].to_numpy() for column in columns}
+
+
+def save_table(df, csv_path):
+    """Write df as CSV (the export format) and refresh its columnar copy"""
+    df.to_csv(csv_path, index=False)
+    if feather is not None:
+        _write_columnar(df, csv_path)
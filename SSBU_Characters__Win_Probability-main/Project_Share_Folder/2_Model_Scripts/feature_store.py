@@ -0,0 +1,191 @@
+"""
+Content-hashed cache of the pairwise matchup feature matrix
+
+Every model script and predictor needs the same table: matchups with both
+characters' smash.csv attributes (and optionally their ultimate_param.csv
+technical parameters) merged in, plus char1 - char2 "_diff" features.
+load_pairwise_features() builds it once and stores it in
+1_Data_Files/feature_store/, keyed by a hash of the input files' contents,
+the roster aliases and the requested feature lists. Later calls load the
+stored table until one of those inputs actually changes.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_store import load_table
+from roster import ALIASES, load_roster
+from tech_params import NUMERIC_KINDS, load_tech_params
+
+FEATURE_STORE_VERSION = 1
+
+# smash.csv attributes turned into _diff features
+ATTRIBUTES = ['weight', 'recovery', 'speed', 'combo_game', 'projectiles',
+              'killpower', 'ledgetrap', 'edgeguard', 'spacing', 'cheese']
+
+# ultimate_param.csv parameters, matched case-insensitively against its columns
+TECH_FEATURES = [
+    'Weight', 'Gravity', 'Run Maximum Velocity', 'Walk Maximum Velocity',
+    'Maximum Horizontal Air Speed', 'Maximum Fall Speed', 'Dash Initial Velocity',
+    'Maximum Air Acceleration'
+]
+
+
+class PairwiseFeatures:
+    """Merged matchup table with the names of the feature columns it holds"""
+
+    def __init__(self, frame, attribute_features, tech_columns, key='', cached=False):
+        self.frame = frame
+        self.attribute_features = list(attribute_features)
+        self.tech_columns = list(tech_columns)
+        self.key = key
+        self.cached = cached
+
+    @property
+    def tech_features(self):
+        """_diff columns built from technical parameters"""
+        return [f"{col}_diff" for col in self.tech_columns]
+
+    @property
+    def feature_names(self):
+        """All _diff columns, attribute features first"""
+        return self.attribute_features + self.tech_features
+
+
+def hash_file(path):
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def feature_key(matchups_path, smash_path, tech_params_path=None,
+                attributes=ATTRIBUTES, tech_features=TECH_FEATURES):
+    """Cache key covering every input that changes the feature table"""
+    parts = {
+        'version': FEATURE_STORE_VERSION,
+        'matchups': hash_file(matchups_path),
+        'smash': hash_file(smash_path),
+        'tech_params': hash_file(tech_params_path) if tech_params_path is not None else None,
+        'aliases': ALIASES,
+        'attributes': list(attributes),
+        'tech_features': list(tech_features) if tech_params_path is not None else None,
+    }
+    return hashlib.sha1(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def build_pairwise_features(matchups_df, char_attrs, roster, tech_params=None,
+                            attributes=ATTRIBUTES, tech_features=TECH_FEATURES):
+    """Normalize names, merge both characters' attributes and compute _diff features.
+
+    tech_params is an optional TechParams; the first numeric parameter whose
+    description contains each of tech_features is merged in as well.
+    """
+    normalize_char_name = roster.normalize
+    matchups_df = matchups_df.copy()
+    matchups_df['char1_normalized'] = matchups_df['character_1'].apply(normalize_char_name)
+    matchups_df['char2_normalized'] = matchups_df['character_2'].apply(normalize_char_name)
+
+    char1_attrs = char_attrs.add_suffix('_char1')
+    char1_attrs = char1_attrs.rename(columns={'name_char1': 'char1_normalized'})
+    char2_attrs = char_attrs.add_suffix('_char2')
+    char2_attrs = char2_attrs.rename(columns={'name_char2': 'char2_normalized'})
+
+    frame = matchups_df.merge(
+        char1_attrs, on='char1_normalized', how='inner'
+    ).merge(
+        char2_attrs, on='char2_normalized', how='inner'
+    )
+
+    tech_columns = []
+    if tech_params is not None:
+        # First numeric parameter whose description contains each feature name
+        tech_keys = []
+        for feat in tech_features:
+            matching_keys = tech_params.find(feat, kinds=NUMERIC_KINDS, field='description')
+            if matching_keys:
+                tech_keys.append(matching_keys[0])
+
+        if tech_keys:
+            params = tech_params.frame(tech_keys)
+            tech_columns = [col for col in params.columns if col != 'fighter']
+            # Whole-number parameters stay integers, as when read from the CSV
+            for col in tech_columns:
+                values = params[col]
+                if values.notna().all() and (values % 1 == 0).all():
+                    params[col] = values.astype(np.int64)
+            params['char_normalized'] = params.pop('fighter').apply(normalize_char_name)
+            # Some fighters have several internal rows (popo/nana, the three Pokemon
+            # Trainer Pokemon); keep the first so the merges stay one row per matchup
+            params = params.drop_duplicates('char_normalized')
+
+            for side in ('char1', 'char2'):
+                side_params = params[['char_normalized'] + tech_columns].add_suffix(f'_{side}')
+                side_params = side_params.rename(columns={f'char_normalized_{side}': f'{side}_normalized'})
+                frame = frame.merge(side_params, on=f'{side}_normalized', how='left')
+
+    attribute_features = []
+    for attr in attributes:
+        char1_col = f"{attr}_char1"
+        char2_col = f"{attr}_char2"
+        if char1_col in frame.columns and char2_col in frame.columns:
+            frame[f"{attr}_diff"] = frame[char1_col] - frame[char2_col]
+            attribute_features.append(f"{attr}_diff")
+
+    for col in tech_columns:
+        frame[f"{col}_diff"] = frame[f"{col}_char1"] - frame[f"{col}_char2"]
+
+    return PairwiseFeatures(frame, attribute_features, tech_columns)
+
+
+def default_store_dir(matchups_path):
+    """feature_store/ next to the matchups CSV"""
+    return Path(matchups_path).parent / 'feature_store'
+
+
+def load_pairwise_features(matchups_path, smash_path, tech_params_path=None,
+                           attributes=ATTRIBUTES, tech_features=TECH_FEATURES, store_dir=None):
+    """PairwiseFeatures for these inputs, built and stored only when no entry matches"""
+    store_dir = Path(store_dir) if store_dir is not None else default_store_dir(matchups_path)
+    variant = 'tech' if tech_params_path is not None else 'attrs'
+    key = feature_key(matchups_path, smash_path, tech_params_path, attributes, tech_features)
+    entry_path = store_dir / f"pairwise_{variant}_{key}.pkl"
+
+    if entry_path.exists():
+        try:
+            entry = pd.read_pickle(entry_path)
+            return PairwiseFeatures(entry['frame'], entry['attribute_features'],
+                                    entry['tech_columns'], key, cached=True)
+        except Exception as e:
+            print(f"   Ignoring unreadable feature store entry: {e}")
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    tech_params = None
+    if tech_params_path is not None:
+        # float64 keeps the decoded values identical to the CSV's
+        tech_params = load_tech_params(tech_params_path, store_dir / 'ultimate_param.npz', dtype=np.float64)
+    features = build_pairwise_features(
+        load_table(matchups_path), load_table(smash_path), load_roster(smash_path),
+        tech_params, attributes, tech_features)
+    features.key = key
+
+    # Written under a temporary name so concurrent readers never see a partial entry
+    tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+    pd.to_pickle({
+        'frame': features.frame,
+        'attribute_features': features.attribute_features,
+        'tech_columns': features.tech_columns,
+    }, tmp_path)
+    os.replace(tmp_path, entry_path)
+
+    # One entry per variant: older ones were built from inputs that have changed
+    for stale in store_dir.glob(f"pairwise_{variant}_*.pkl"):
+        if stale != entry_path:
+            stale.unlink(missing_ok=True)
+    return features
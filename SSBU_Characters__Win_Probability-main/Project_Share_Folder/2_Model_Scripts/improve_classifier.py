@@ -1,7 +1,6 @@
 """
 Improved classifier with class weights to handle imbalance
 """
-import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
@@ -11,6 +10,8 @@ import warnings
 warnings.filterwarnings('ignore')
 from pathlib import Path
 
+from feature_store import load_pairwise_features
+
 def get_data_path(filename, results_dir=False):
     """Find data file in 1_Data_Files, 4_Results, or current directory"""
     script_dir = Path(__file__).parent
@@ -42,9 +43,11 @@ print("=" * 70)
 print("IMPROVED CLASSIFIER WITH CLASS WEIGHTS")
 print("=" * 70)
 
-# Load the merged data
+# Load the merged data from the feature store
 print("\n1. Loading data...")
-matchups_with_attrs = pd.read_csv(get_data_path('matchups_with_attributes.csv'))
+features = load_pairwise_features(get_data_path('character_matchups.csv'), get_data_path('smash.csv'))
+matchups_with_attrs = features.frame
+print(f"   {'Reused' if features.cached else 'Built and stored'} feature table {features.key[:12]}")
 
 # Recreate classification labels (same as before)
 def classify_matchup_tier(winrate):
@@ -65,9 +68,7 @@ matchups_with_attrs['matchup_tier'] = matchups_with_attrs['char1_winrate'].apply
 matchups_with_attrs['matchup_binary'] = matchups_with_attrs['char1_winrate'].apply(classify_matchup_binary)
 
 # Features
-attributes = ['weight', 'recovery', 'speed', 'combo_game', 'projectiles', 
-              'killpower', 'ledgetrap', 'edgeguard', 'spacing', 'cheese']
-feature_data = [f"{attr}_diff" for attr in attributes]
+feature_data = features.attribute_features
 
 # Prepare data
 X = matchups_with_attrs[feature_data].copy()
@@ -0,0 +1,281 @@
+"""
+Dense, memory-mapped character x character matchup matrix
+
+character_matchups.csv stores one row per pair, so every "who beats whom"
+lookup has to scan it. This module turns it into a bundle directory
+(1_Data_Files/matchup_matrix/) of four float32 .npy arrays indexed by the
+roster-id ordering of smash.csv plus a small JSON sidecar:
+
+    wins[i, j]       wins of i against j (0 on the diagonal)
+    games[i, j]      sets (or games) played between i and j (symmetric)
+    winrate[i, j]    wins / games, NaN without data and 0.5 on the diagonal
+    slot_wins[i, j]  sets won from the p1 slot between i and j (symmetric)
+
+char1_wins in character_matchups.csv counts the sets won from the p1 slot,
+not by character_1, so set wins cannot be credited to characters. When the
+CSV has the game-level columns of build_matchup_dataset.py --games, which
+are credited to characters, wins and games count games and the bundle is
+marked credited. Otherwise wins keep the orientation of the CSV rows (as the
+heatmap always showed them) and lookup() only reports the slot split.
+
+load_matchup_matrix() maps the arrays read-only, so opening the bundle costs
+no parsing and every process reading it shares the same pages.
+
+Build it from the current character_matchups.csv with:
+    python matchup_matrix.py
+(build_matchup_dataset.py also refreshes it after every run.)
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_store import csv_signature, load_table
+from roster import load_roster
+
+MATRIX_VERSION = 2
+ARRAYS = ('wins', 'games', 'winrate', 'slot_wins')
+# Game-level columns credited to characters (build_matchup_dataset.py --games)
+CREDITED_COLUMNS = ['char1_game_wins', 'char2_game_wins', 'game_count']
+INDEX_FILE = 'index.json'
+
+
+def get_data_path(filename):
+    """Find data file in 1_Data_Files or current directory"""
+    script_dir = Path(__file__).parent
+    data_dir = script_dir.parent / "1_Data_Files"
+    if data_dir.exists():
+        file_path = data_dir / filename
+        if file_path.exists():
+            return str(file_path)
+    if Path(filename).exists():
+        return filename
+    return str(data_dir / filename) if data_dir.exists() else filename
+
+
+def default_matrix_path(csv_path):
+    """Bundle directory stored next to a matchups CSV"""
+    return Path(csv_path).parent / 'matchup_matrix'
+
+
+class MatchupMatrix:
+    """Win, game and win-rate matrices over the roster, with O(1) pair lookups"""
+
+    def __init__(self, characters, ids, wins, games, winrate, slot_wins, credited=False, source=''):
+        self.characters = list(characters)
+        self.ids = [int(i) for i in ids]
+        self.wins = wins
+        self.games = games
+        self.winrate = winrate
+        self.slot_wins = slot_wins
+        self.credited = credited    # wins and games are games credited to characters
+        self.source = source
+        self._position = {name: pos for pos, name in enumerate(self.characters)}
+        self._roster = None
+
+    def __len__(self):
+        return len(self.characters)
+
+    @classmethod
+    def from_matchups(cls, matchups_df, roster, source=''):
+        """Aggregate character_matchups rows into dense matrices.
+
+        Names are resolved through the roster, so spellings that map to the
+        same fighter are summed; characters missing from smash.csv are dropped.
+        Wins are credited to characters when the CREDITED_COLUMNS are present.
+        """
+        order = sorted(zip(roster.ids, roster.names))
+        ids = [char_id for char_id, _ in order]
+        characters = [name for _, name in order]
+        position = {name: pos for pos, name in enumerate(characters)}
+
+        def positions(column):
+            resolved = matchups_df[column].map(lambda name: position.get(roster.resolve(name), -1))
+            return resolved.to_numpy(dtype=np.int64)
+
+        i = positions('character_1')
+        j = positions('character_2')
+        known = (i >= 0) & (j >= 0)
+        i, j = i[known], j[known]
+        credited = all(column in matchups_df.columns for column in CREDITED_COLUMNS)
+        p1_wins = matchups_df['char1_wins'].to_numpy(dtype=np.float64)[known]
+        win_columns = CREDITED_COLUMNS if credited else ['char1_wins', 'char2_wins', 'total_games']
+        char1_wins, char2_wins, total = (matchups_df[column].to_numpy(dtype=np.float64)[known]
+                                         for column in win_columns)
+
+        # Accumulate in float64 and round once to float32 at the end
+        n = len(characters)
+        wins = np.zeros((n, n))
+        games = np.zeros((n, n))
+        slot_wins = np.zeros((n, n))
+        mirror = i == j
+        # Mirror matches have no win split between the two sides
+        np.add.at(wins, (i[~mirror], j[~mirror]), char1_wins[~mirror])
+        np.add.at(wins, (j[~mirror], i[~mirror]), char2_wins[~mirror])
+        np.add.at(games, (i, j), total)
+        np.add.at(games, (j[~mirror], i[~mirror]), total[~mirror])
+        np.add.at(slot_wins, (i, j), p1_wins)
+        np.add.at(slot_wins, (j[~mirror], i[~mirror]), p1_wins[~mirror])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            winrate = np.where(games > 0, wins / games, np.nan)
+        np.fill_diagonal(winrate, 0.5)  # Mirror matchups are even by definition
+
+        return cls(characters, ids, wins.astype(np.float32), games.astype(np.float32),
+                   winrate.astype(np.float32), slot_wins.astype(np.float32), credited, source)
+
+    def position_of(self, name):
+        """Row/column index of a character (any spelling), or None if unknown"""
+        if name in self._position:
+            return self._position[name]
+        if self._roster is None:
+            self._roster = load_roster()
+        return self._position.get(self._roster.resolve(name))
+
+    def lookup(self, char1, char2):
+        """Head-to-head record of char1 against char2, or None if either is unknown.
+
+        total_games counts the record's unit ('sets', or 'games' when
+        credited). char1_wins, char2_wins and char1_winrate are only set when
+        wins are credited to characters; otherwise p1_wins and p2_wins split
+        the sets by player slot. Mirror matches have neither.
+        """
+        i = self.position_of(char1)
+        j = self.position_of(char2)
+        if i is None or j is None:
+            return None
+        games = float(self.games[i, j])
+        record = {
+            'char1': self.characters[i],
+            'char2': self.characters[j],
+            'total_games': games,
+            'unit': 'games' if self.credited else 'sets',
+            'char1_wins': None,
+            'char2_wins': None,
+            'char1_winrate': None,
+            'p1_wins': None,
+            'p2_wins': None,
+        }
+        if i == j:
+            return record
+        if self.credited:
+            record['char1_wins'] = float(self.wins[i, j])
+            record['char2_wins'] = float(self.wins[j, i])
+            record['char1_winrate'] = float(self.winrate[i, j])
+        else:
+            record['p1_wins'] = float(self.slot_wins[i, j])
+            record['p2_wins'] = games - record['p1_wins']
+        return record
+
+    def submatrix(self, names, values='winrate'):
+        """DataFrame of one matrix restricted to names (rows and columns in that order)"""
+        positions = [self.position_of(name) for name in names]
+        missing = [name for name, pos in zip(names, positions) if pos is None]
+        if missing:
+            raise KeyError(f"Unknown characters: {missing}")
+        matrix = getattr(self, values)
+        return pd.DataFrame(matrix[np.ix_(positions, positions)].astype(float),
+                            index=list(names), columns=list(names))
+
+    def save(self, path):
+        """Write the .npy arrays and the sidecar index into the bundle directory"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            # Replace files instead of rewriting them so open maps stay valid
+            tmp_path = path / f"{name}.npy.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name), dtype=np.float32))
+            os.replace(tmp_path, path / f"{name}.npy")
+        index = {
+            'version': MATRIX_VERSION,
+            'characters': self.characters,
+            'ids': self.ids,
+            'arrays': {name: f"{name}.npy" for name in ARRAYS},
+            'credited': self.credited,
+            'source': self.source,
+        }
+        # Written last and replaced like the arrays, so a reader never sees a
+        # partial index or one that describes arrays not yet in place
+        tmp_path = path / f"{INDEX_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, path / INDEX_FILE)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Open a bundle written by save(); arrays are read-only memory maps by default"""
+        path = Path(path)
+        with open(path / INDEX_FILE, encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != MATRIX_VERSION:
+            raise ValueError(f"Unsupported matchup matrix version in {path}")
+        arrays = [np.load(path / index['arrays'][name], mmap_mode=mmap_mode) for name in ARRAYS]
+        n = len(index['characters'])
+        if any(array.shape != (n, n) for array in arrays):
+            raise ValueError(f"Matrix shapes in {path} do not match its index")
+        return cls(index['characters'], index['ids'], *arrays, credited=index.get('credited', False),
+                   source=index.get('source', ''))
+
+
+def build_matchup_matrix(csv_path, matrix_path=None, roster=None):
+    """Build and save the matrix bundle for a character_matchups CSV"""
+    csv_path = Path(csv_path)
+    matrix_path = Path(matrix_path) if matrix_path is not None else default_matrix_path(csv_path)
+    columns = ['character_1', 'character_2', 'char1_wins', 'char2_wins', 'total_games']
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if all(column in header for column in CREDITED_COLUMNS):
+        columns += CREDITED_COLUMNS
+    matchups_df = load_table(csv_path, columns=columns)
+    matrix = MatchupMatrix.from_matchups(matchups_df, roster or load_roster(),
+                                         source=csv_signature(csv_path).decode())
+    matrix.save(matrix_path)
+    return matrix
+
+
+def load_matchup_matrix(csv_path=None, matrix_path=None):
+    """Memory-map the matrix bundle, rebuilding it first if the CSV changed since"""
+    csv_path = Path(csv_path) if csv_path is not None else Path(get_data_path('character_matchups.csv'))
+    matrix_path = Path(matrix_path) if matrix_path is not None else default_matrix_path(csv_path)
+    if (matrix_path / INDEX_FILE).exists():
+        try:
+            matrix = MatchupMatrix.load(matrix_path)
+        except (ValueError, KeyError, OSError):
+            matrix = None
+        if matrix is not None and (not csv_path.exists()
+                                   or matrix.source == csv_signature(csv_path).decode()):
+            return matrix
+    return build_matchup_matrix(csv_path, matrix_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the memory-mapped matchup matrix bundle")
+    parser.add_argument('--input', default=None,
+                        help="Matchups CSV (defaults to 1_Data_Files/character_matchups.csv)")
+    parser.add_argument('--output', default=None,
+                        help="Bundle directory (defaults to matchup_matrix/ next to the CSV)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 70)
+    print("MATCHUP MATRIX")
+    print("=" * 70)
+
+    csv_path = Path(args.input or get_data_path('character_matchups.csv'))
+    print(f"\n1. Building matrix from '{csv_path}'...")
+    matrix = build_matchup_matrix(csv_path, args.output)
+    output = args.output or default_matrix_path(csv_path)
+    pairs = int(np.count_nonzero(np.triu(matrix.games, k=1)))
+    print(f"   {len(matrix)} characters, {pairs} pairs with data")
+    print(f"   Wins {'credited to characters (games)' if matrix.credited else 'counted per player slot (sets)'}")
+    print(f"\n2. Saved matrix bundle to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,15 +9,33 @@ from sklearn.model_selection import train_test_split
 import pickle
 import os
 
+from antisymmetric import AntisymmetricClassifier
+from data_store import load_table
+from feature_store import ATTRIBUTES, feature_key, load_pairwise_features
+from model_registry import load_model, save_model
+from prediction_table import load_or_compile
+from roster import load_roster
+
+MODEL_NAME = 'matchup_predictor'
+
 class MatchupPredictor:
-    def __init__(self):
-        """Initialize the predictor with data and model"""
-        print("Loading data and building model...")
-        self.load_data()
-        self.build_model()
-        
-    def load_data(self):
-        """Load all necessary data"""
+    def __init__(self, retrain=False):
+        """Initialize the predictor with data and model.
+
+        The model is loaded from the model registry when one was trained on the
+        current data; otherwise (or with retrain=True) it is trained and registered.
+        """
+        print("Loading data and model...")
+        self.model_path = None
+        self.table = None
+        self.load_characters()
+        if retrain or not self.load_model():
+            self.load_data()
+            self.build_model()
+        self.compile()
+        
+    def load_characters(self):
+        """Locate the data files and load the character attributes"""
         from pathlib import Path
         
         # Find data files in 1_Data_Files directory
@@ -41,62 +59,40 @@ class MatchupPredictor:
             raise FileNotFoundError(f"Could not find character_matchups.csv. Looked in: {data_dir} and current directory")
         
         # Load character data
-        self.char_attrs = pd.read_csv(smash_path)
-        
-        # Load matchup data
-        matchups_df = pd.read_csv(matchups_path)
+        self.char_attrs = load_table(smash_path)
+        
+        # Normalize names through the shared roster resolver
+        self.normalize_char_name = load_roster(smash_path).normalize
+        self.attributes = list(ATTRIBUTES)
+        self.smash_path = smash_path
+        self.matchups_path = matchups_path
+        
+    def load_model(self):
+        """Use the newest registered model trained on the current data, if any"""
+        data_key = feature_key(self.matchups_path, self.smash_path)
+        artifact = load_model(MODEL_NAME, data_key=data_key)
+        if artifact is None:
+            return False
+        
+        # Models registered before the antisymmetric wrapper are wrapped on load
+        model = artifact.model
+        if not isinstance(model, AntisymmetricClassifier):
+            model = AntisymmetricClassifier.from_fitted(model)
+        self.model = model
+        self.feature_names = artifact.feature_names
+        self.data_key = data_key
+        self.model_path = artifact.path
+        print(f"Loaded model v{artifact.version} "
+              f"(accuracy {artifact.metrics.get('accuracy', float('nan'))*100:.2f}%)")
+        return True
         
-        # Normalize names
-        name_variations = {
-            'metaknight': 'Meta Knight', 'littlemac': 'Little Mac',
-            'pokemon trainer': 'Pokemon Trainer', 'king k. rool': 'King K. Rool',
-            'king dedede': 'King Dedede', 'diddy kong': 'Diddy Kong',
-            'young link': 'Young Link', 'toon link': 'Toon Link',
-            'dr. mario': 'Dr. Mario', 'mr. game & watch': 'Mr. Game & Watch',
-            'zero suit samus': 'Zero Suit Samus', 'wii fit trainer': 'Wii Fit Trainer',
-            'rosalina & luma': 'Rosalina & Luma', 'banjo & kazooie': 'Banjo & Kazooie',
-            'piranha plant': 'Piranha Plant', 'pyra mythra': 'Pyra Mythra',
-            'mii brawler': 'Mii Brawler', 'mii swordfighter': 'Mii Swordfighter',
-            'mii gunner': 'Mii Gunner', 'ice climbers': 'Ice Climbers'
-        }
-        
-        def normalize_char_name(matchup_name):
-            matchup_name = matchup_name.lower().strip()
-            if matchup_name in name_variations:
-                return name_variations[matchup_name]
-            for smash_name in self.char_attrs['name']:
-                if smash_name.lower() == matchup_name:
-                    return smash_name
-            return matchup_name.title()
-        
-        # Merge data
-        matchups_df['char1_normalized'] = matchups_df['character_1'].apply(normalize_char_name)
-        matchups_df['char2_normalized'] = matchups_df['character_2'].apply(normalize_char_name)
-        
-        char1_attrs = self.char_attrs.add_suffix('_char1')
-        char1_attrs = char1_attrs.rename(columns={'name_char1': 'char1_normalized'})
-        char2_attrs = self.char_attrs.add_suffix('_char2')
-        char2_attrs = char2_attrs.rename(columns={'name_char2': 'char2_normalized'})
-        
-        matchups_with_attrs = matchups_df.merge(
-            char1_attrs, on='char1_normalized', how='inner'
-        ).merge(
-            char2_attrs, on='char2_normalized', how='inner'
-        )
-        
-        # Create features
-        attributes = ['weight', 'recovery', 'speed', 'combo_game', 'projectiles', 
-                      'killpower', 'ledgetrap', 'edgeguard', 'spacing', 'cheese']
-        
-        self.feature_names = []
-        for attr in attributes:
-            char1_col = f"{attr}_char1"
-            char2_col = f"{attr}_char2"
-            if char1_col in matchups_with_attrs.columns:
-                matchups_with_attrs[f"{attr}_diff"] = (
-                    matchups_with_attrs[char1_col] - matchups_with_attrs[char2_col]
-                )
-                self.feature_names.append(f"{attr}_diff")
+    def load_data(self):
+        """Load the pairwise training data"""
+        # Merged attributes and _diff features from the feature store
+        features = load_pairwise_features(self.matchups_path, self.smash_path)
+        matchups_with_attrs = features.frame
+        self.feature_names = features.attribute_features
+        self.data_key = features.key
         
         # Create labels
         def classify_binary(winrate):
@@ -113,9 +109,6 @@ class MatchupPredictor:
         self.y = y[valid_mask]
         self.matchups_data = matchups_with_attrs[valid_mask].copy()
         
-        self.normalize_char_name = normalize_char_name
-        self.attributes = attributes
-        
     def build_model(self):
         """Build and train the model"""
         from sklearn.model_selection import train_test_split
@@ -124,21 +117,58 @@ class MatchupPredictor:
             self.X, self.y, test_size=0.2, random_state=42, stratify=self.y
         )
         
-        self.model = RandomForestClassifier(
+        # Antisymmetric by construction: P(A beats B) = 1 - P(B beats A)
+        self.model = AntisymmetricClassifier(RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
             random_state=42,
             n_jobs=-1,
             class_weight='balanced'
-        )
+        ))
         self.model.fit(X_train, y_train)
         
         from sklearn.metrics import accuracy_score
         accuracy = accuracy_score(y_test, self.model.predict(X_test))
         print(f"Model trained! Accuracy: {accuracy*100:.2f}%")
         
-    def predict(self, char1_name, char2_name):
-        """Predict matchup outcome with symmetric predictions (consistent regardless of order)"""
+        try:
+            path = save_model(MODEL_NAME, self.model, self.feature_names, data_key=self.data_key,
+                              metrics={'accuracy': accuracy, 'n_train': len(X_train)})
+            self.model_path = path
+            print(f"Registered model as {path.parent.name}/{path.name}")
+        except OSError as e:
+            print(f"Warning: Could not save model to the registry: {e}")
+        
+    def compile(self):
+        """Evaluate the model on every ordered pair of characters once (see prediction_table.py)"""
+        attrs = self.char_attrs.drop_duplicates('name').set_index('name')
+        characters = sorted(attrs.index)
+        values = attrs.loc[characters, self.attributes].to_numpy(dtype=np.float64)
+        self.table = load_or_compile(self.model_path, characters, self.attributes, values, self._char1_proba)
+        return self.table
+        
+    def _char1_proba(self, diffs):
+        """P(char1 wins) for each row of attribute differences"""
+        # The antisymmetric model scores both orientations in one call, so the
+        # same matchup gives the same prediction regardless of order
+        proba = self.model.predict_proba(pd.DataFrame(diffs, columns=self.feature_names))
+        return proba[:, list(self.model.classes_).index('Char1_Wins')]
+        
+    def predict(self, char1_name, char2_name, live=False):
+        """Predict matchup outcome; swapping the characters swaps the probabilities.
+        
+        Reads the precompiled table; with live=True (or for names missing from
+        the table) the model is evaluated instead. Table results are shared
+        between calls, so treat them as read-only.
+        """
+        if not live and self.table is not None:
+            result = self.table.result(char1_name, char2_name)
+            if result is None:
+                result = self.table.result(self.normalize_char_name(char1_name),
+                                           self.normalize_char_name(char2_name))
+            if result is not None:
+                return result, None
+        
         # Normalize names
         char1_norm = self.normalize_char_name(char1_name)
         char2_norm = self.normalize_char_name(char2_name)
@@ -152,80 +182,24 @@ class MatchupPredictor:
         if char2_data.empty:
             return None, f"Character '{char2_name}' not found"
         
-        # SYMMETRIC PREDICTION: Predict both directions and use consensus
-        # This ensures same matchup gives same prediction regardless of order
-        
-        # Direction 1: char1 vs char2
-        features1 = []
+        # Features: char1 - char2 differences
+        features = []
         for attr in self.attributes:
             diff = char1_data[attr].values[0] - char2_data[attr].values[0]
-            features1.append(diff)
-        
-        # Convert to DataFrame with feature names to avoid sklearn warning
-        features1_df = pd.DataFrame([features1], columns=self.feature_names)
-        
-        pred1 = self.model.predict(features1_df)[0]
-        prob1 = self.model.predict_proba(features1_df)[0]
-        
-        # Direction 2: char2 vs char1 (flipped order)
-        features2 = []
-        for attr in self.attributes:
-            diff = char2_data[attr].values[0] - char1_data[attr].values[0]
-            features2.append(diff)
-        
-        features2_df = pd.DataFrame([features2], columns=self.feature_names)
-        
-        pred2 = self.model.predict(features2_df)[0]
-        prob2 = self.model.predict_proba(features2_df)[0]
+            features.append(diff)
         
-        # Interpret predictions to get actual winner names
-        # Direction 1: char1 vs char2
-        if pred1 == 'Char1_Wins':
-            winner1 = char1_norm
-            prob_win1 = prob1[0]
-        else:
-            winner1 = char2_norm
-            prob_win1 = prob1[1]
-        
-        # Direction 2: char2 vs char1 (char2 is now character 1 in this direction)
-        if pred2 == 'Char1_Wins':
-            winner2 = char2_norm  # char2 is character 1 in this direction
-            prob_win2 = prob2[0]
-        else:
-            winner2 = char1_norm  # char1 is character 2 in this direction
-            prob_win2 = prob2[1]
-        
-        # Use consensus: average probabilities for consistent prediction
-        if winner1 == winner2:
-            # Both directions agree
-            final_winner = winner1
-            final_prob = (prob_win1 + prob_win2) / 2
-        else:
-            # Directions disagree - use average probability
-            # Calculate average probability for each character
-            if winner1 == char1_norm:
-                prob_char1_avg = (prob_win1 + (1 - prob_win2)) / 2
-                prob_char2_avg = ((1 - prob_win1) + prob_win2) / 2
-            else:
-                prob_char1_avg = ((1 - prob_win1) + prob_win2) / 2
-                prob_char2_avg = (prob_win1 + (1 - prob_win2)) / 2
-            
-            if prob_char1_avg > prob_char2_avg:
-                final_winner = char1_norm
-                final_prob = prob_char1_avg
-            else:
-                final_winner = char2_norm
-                final_prob = prob_char2_avg
+        char1_prob = self._char1_proba(np.array([features], dtype=np.float64))[0]
+        char2_prob = 1 - char1_prob
         
-        # Determine final prediction label
-        if final_winner == char1_norm:
+        # Determine final prediction label (an exact tie goes to char2)
+        if char1_prob > char2_prob:
             final_prediction = 'Char1_Wins'
-            char1_prob = final_prob
-            char2_prob = 1 - final_prob
+            final_winner = char1_norm
+            final_prob = char1_prob
         else:
             final_prediction = 'Char2_Wins'
-            char1_prob = 1 - final_prob
-            char2_prob = final_prob
+            final_winner = char2_norm
+            final_prob = char2_prob
         
         # Get attribute comparison
         comparison = {}
@@ -1,167 +1,144 @@
 """
 Enhanced Matchup Predictor - Uses enhanced classifier with technical parameters
 This is the updated version that should be used instead of the backup
+
+predict() reads a table of the model's predictions for every ordered pair of
+characters, compiled once per model and stored with it in the registry
+(prediction_table.py); the model itself is only evaluated for live=True.
+
+With backend='sgd' the predictor can absorb new results while it runs:
+update() takes a batch of per-pair set counts, updates the online logistic
+model with partial_fit and checkpoints it to the model registry.
 """
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.model_selection import train_test_split
 import os
 from pathlib import Path
 
+from antisymmetric import AntisymmetricClassifier
+from data_store import load_table
+from feature_store import ATTRIBUTES, feature_key, load_pairwise_features
+from model_registry import load_model, save_model
+from online_model import OnlineLogit
+from prediction_table import load_or_compile
+from roster import load_roster
+from set_weights import binomial_rows
+
+# Registry name per model backend
+MODEL_NAMES = {'rf': 'enhanced_predictor', 'hist': 'enhanced_predictor_hist', 'sgd': 'enhanced_predictor_sgd'}
+
+# Columns of the per-pair results passed to update()
+RESULT_COLUMNS = ['character_1', 'character_2', 'char1_wins', 'char2_wins']
+
+# Incremental updates between full refits of the online model
+RETRAIN_EVERY = 50
+
 class EnhancedMatchupPredictor:
-    def __init__(self, data_dir=None):
-        """Initialize the predictor with enhanced features (attributes + technical params)"""
-        print("Loading data and building enhanced model...")
+    def __init__(self, data_dir=None, retrain=False, backend='rf'):
+        """Initialize the predictor with enhanced features (attributes + technical params).
+
+        backend is 'rf' (random forest), 'hist' (histogram gradient boosting,
+        which handles missing technical parameters natively instead of as 0)
+        or 'sgd' (online logistic regression on the attributes, see update()).
+        The model is loaded from the model registry when one was trained on the
+        current data; otherwise (or with retrain=True) it is trained and registered.
+        """
+        if backend not in MODEL_NAMES:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {sorted(MODEL_NAMES)}")
+        print("Loading data and enhanced model...")
         self.data_dir = data_dir
-        self.load_data()
-        self.build_model()
-        
-    def load_data(self):
-        """Load all necessary data"""
+        self.backend = backend
+        self.metrics = {}
+        self.model_path = None
+        self.table = None
+        # Online state: results received since the tables were built
+        self.pending = pd.DataFrame(columns=RESULT_COLUMNS)
+        self.updates_since_retrain = 0
+        self.retrain_every = RETRAIN_EVERY
+        self.load_characters()
+        if retrain or not self.load_model():
+            self.load_data()
+            self.build_model()
+        self.compile()
+        
+    def load_characters(self):
+        """Locate the data files and load the character attributes"""
         base_dir = Path(__file__).parent.parent if self.data_dir is None else Path(self.data_dir)
         data_path = base_dir / "1_Data_Files"
         
-        # Load character data
-        smash_path = data_path / "smash.csv"
-        matchups_path = data_path / "character_matchups.csv"
-        tech_params_path = data_path / "ultimate_param.csv"
-        
-        if not smash_path.exists():
-            raise FileNotFoundError(f"Could not find smash.csv at {smash_path}")
-        if not matchups_path.exists():
-            raise FileNotFoundError(f"Could not find character_matchups.csv at {matchups_path}")
-        
-        self.char_attrs = pd.read_csv(smash_path)
-        
-        # Load matchup data
-        matchups_df = pd.read_csv(matchups_path)
+        self.smash_path = data_path / "smash.csv"
+        self.matchups_path = data_path / "character_matchups.csv"
+        self.tech_params_path = data_path / "ultimate_param.csv"
+        
+        if not self.smash_path.exists():
+            raise FileNotFoundError(f"Could not find smash.csv at {self.smash_path}")
+        if not self.matchups_path.exists():
+            raise FileNotFoundError(f"Could not find character_matchups.csv at {self.matchups_path}")
+        
+        self.char_attrs = load_table(self.smash_path)
+        
+        # Normalize names through the shared roster resolver
+        self.normalize_char_name = load_roster(self.smash_path).normalize
+        self.attributes = list(ATTRIBUTES)
+        
+    def load_model(self):
+        """Use the newest registered model trained on the current data, if any"""
+        tech_params_path = self.tech_params_path if self.tech_params_path.exists() else None
+        data_key = feature_key(self.matchups_path, self.smash_path, tech_params_path)
+        artifact = load_model(MODEL_NAMES[self.backend], data_key=data_key)
+        if artifact is None:
+            return False
+        
+        # Models registered before the antisymmetric wrapper are wrapped on load
+        model = artifact.model
+        if not isinstance(model, AntisymmetricClassifier):
+            model = AntisymmetricClassifier.from_fitted(model)
+        self.model = model
+        self.feature_names = artifact.feature_names
+        self.tech_features = artifact.meta['extra'].get('tech_features', [])
+        self.use_tech_params = bool(self.tech_features)
+        self.data_key = data_key
+        self.metrics = artifact.metrics
+        self.model_path = artifact.path
+        if self.backend == 'sgd':
+            extra = artifact.meta['extra']
+            self.pending = pd.DataFrame(extra.get('pending_results', []), columns=RESULT_COLUMNS)
+            self.updates_since_retrain = extra.get('updates_since_retrain', 0)
+        print(f"Loaded enhanced model v{artifact.version} "
+              f"(accuracy {artifact.metrics.get('accuracy', float('nan'))*100:.2f}%)")
+        return True
         
-        # Try to load technical parameters (optional)
-        tech_params = None
+    def load_data(self):
+        """Load the pairwise training data"""
+        smash_path = self.smash_path
+        matchups_path = self.matchups_path
+        tech_params_path = self.tech_params_path
+        
+        # Pairwise features (merged attributes, technical params, _diff columns)
+        # come from the feature store; technical parameters are optional
+        features = None
         if tech_params_path.exists():
             try:
-                tech_params = pd.read_csv(tech_params_path, skiprows=2)
-                tech_params = tech_params.loc[:, ~tech_params.columns.str.startswith('Unnamed')]
+                features = load_pairwise_features(matchups_path, smash_path, tech_params_path)
             except Exception as e:
                 print(f"Warning: Could not load technical parameters: {e}")
-        
-        # Normalize names
-        name_variations = {
-            'metaknight': 'Meta Knight', 'littlemac': 'Little Mac',
-            'pokemon trainer': 'Pokemon Trainer', 'king k. rool': 'King K. Rool',
-            'king dedede': 'King Dedede', 'diddy kong': 'Diddy Kong',
-            'young link': 'Young Link', 'toon link': 'Toon Link',
-            'dr. mario': 'Dr. Mario', 'mr. game & watch': 'Mr. Game & Watch',
-            'zero suit samus': 'Zero Suit Samus', 'wii fit trainer': 'Wii Fit Trainer',
-            'rosalina & luma': 'Rosalina & Luma', 'banjo & kazooie': 'Banjo & Kazooie',
-            'piranha plant': 'Piranha Plant', 'pyra mythra': 'Pyra Mythra',
-            'mii brawler': 'Mii Brawler', 'mii swordfighter': 'Mii Swordfighter',
-            'mii gunner': 'Mii Gunner', 'ice climbers': 'Ice Climbers'
-        }
-        
-        def normalize_char_name(matchup_name):
-            matchup_name = matchup_name.lower().strip()
-            if matchup_name in name_variations:
-                return name_variations[matchup_name]
-            for smash_name in self.char_attrs['name']:
-                if smash_name.lower() == matchup_name:
-                    return smash_name
-            return matchup_name.title()
-        
-        self.normalize_char_name = normalize_char_name
-        
-        # Merge matchup data with character attributes
-        matchups_df['char1_normalized'] = matchups_df['character_1'].apply(normalize_char_name)
-        matchups_df['char2_normalized'] = matchups_df['character_2'].apply(normalize_char_name)
-        
-        char1_attrs = self.char_attrs.add_suffix('_char1')
-        char1_attrs = char1_attrs.rename(columns={'name_char1': 'char1_normalized'})
-        char2_attrs = self.char_attrs.add_suffix('_char2')
-        char2_attrs = char2_attrs.rename(columns={'name_char2': 'char2_normalized'})
-        
-        matchups_with_attrs = matchups_df.merge(
-            char1_attrs, on='char1_normalized', how='inner'
-        ).merge(
-            char2_attrs, on='char2_normalized', how='inner'
-        )
-        
-        # Try to merge technical parameters if available
-        if tech_params is not None:
-            try:
-                tech_features = [
-                    'Weight', 'Gravity', 'Run Maximum Velocity', 'Walk Maximum Velocity',
-                    'Maximum Horizontal Air Speed', 'Maximum Fall Speed', 'Dash Initial Velocity',
-                    'Maximum Air Acceleration'
-                ]
-                
-                tech_params['char_normalized'] = tech_params['Description'].apply(normalize_char_name)
-                
-                available_tech_features = []
-                for feat in tech_features:
-                    matching_cols = [col for col in tech_params.columns if feat.lower() in col.lower()]
-                    if matching_cols:
-                        available_tech_features.append(matching_cols[0])
-                
-                if available_tech_features:
-                    tech_params_char1 = tech_params[['char_normalized'] + available_tech_features].copy()
-                    tech_params_char1 = tech_params_char1.add_suffix('_char1')
-                    tech_params_char1 = tech_params_char1.rename(columns={'char_normalized_char1': 'char1_normalized'})
-                    
-                    tech_params_char2 = tech_params[['char_normalized'] + available_tech_features].copy()
-                    tech_params_char2 = tech_params_char2.add_suffix('_char2')
-                    tech_params_char2 = tech_params_char2.rename(columns={'char_normalized_char2': 'char2_normalized'})
-                    
-                    for col in available_tech_features:
-                        if f"{col}_char1" in tech_params_char1.columns:
-                            tech_params_char1[f"{col}_char1"] = pd.to_numeric(tech_params_char1[f"{col}_char1"], errors='coerce')
-                        if f"{col}_char2" in tech_params_char2.columns:
-                            tech_params_char2[f"{col}_char2"] = pd.to_numeric(tech_params_char2[f"{col}_char2"], errors='coerce')
-                    
-                    matchups_with_attrs = matchups_with_attrs.merge(
-                        tech_params_char1, on='char1_normalized', how='left'
-                    ).merge(
-                        tech_params_char2, on='char2_normalized', how='left'
-                    )
-                    
-                    self.use_tech_params = True
-                    self.tech_features = available_tech_features
-                else:
-                    self.use_tech_params = False
-            except Exception as e:
-                print(f"Warning: Could not merge technical parameters: {e}")
-                self.use_tech_params = False
-        else:
+        if features is None:
+            features = load_pairwise_features(matchups_path, smash_path)
+        matchups_with_attrs = features.frame
+        self.data_key = features.key
+        
+        if self.backend == 'sgd':
+            # predict() only has placeholders for technical parameters, so the
+            # online model and its updates use the attribute features alone
             self.use_tech_params = False
-        
-        # Create features
-        attributes = ['weight', 'recovery', 'speed', 'combo_game', 'projectiles', 
-                      'killpower', 'ledgetrap', 'edgeguard', 'spacing', 'cheese']
-        
-        self.feature_names = []
-        self.attributes = attributes
-        
-        # Attribute differences
-        for attr in attributes:
-            char1_col = f"{attr}_char1"
-            char2_col = f"{attr}_char2"
-            if char1_col in matchups_with_attrs.columns and char2_col in matchups_with_attrs.columns:
-                matchups_with_attrs[f"{attr}_diff"] = (
-                    matchups_with_attrs[char1_col] - matchups_with_attrs[char2_col]
-                )
-                self.feature_names.append(f"{attr}_diff")
-        
-        # Technical parameter differences (if available)
-        if self.use_tech_params:
-            for tech_feat in self.tech_features:
-                char1_col = f"{tech_feat}_char1"
-                char2_col = f"{tech_feat}_char2"
-                if char1_col in matchups_with_attrs.columns and char2_col in matchups_with_attrs.columns:
-                    matchups_with_attrs[f"{tech_feat}_diff"] = (
-                        pd.to_numeric(matchups_with_attrs[char1_col], errors='coerce') - 
-                        pd.to_numeric(matchups_with_attrs[char2_col], errors='coerce')
-                    )
-                    self.feature_names.append(f"{tech_feat}_diff")
+            self.tech_features = []
+            self.feature_names = features.attribute_features
+        else:
+            self.use_tech_params = bool(features.tech_columns)
+            self.tech_features = features.tech_columns if self.use_tech_params else []
+            self.feature_names = features.feature_names
         
         # Create labels
         def classify_binary(winrate):
@@ -173,13 +150,18 @@ class EnhancedMatchupPredictor:
         X = matchups_with_attrs[self.feature_names].copy()
         y = matchups_with_attrs['matchup_binary'].copy()
         
-        valid_mask = ~(X.isnull().any(axis=1) | y.isnull())
+        if self.backend == 'hist':
+            # Missing technical parameters stay NaN for the native missing-value splits
+            valid_mask = ~(X[features.attribute_features].isnull().any(axis=1) | y.isnull())
+        else:
+            valid_mask = ~(X.isnull().any(axis=1) | y.isnull())
         self.X = X[valid_mask]
         self.y = y[valid_mask]
         self.matchups_data = matchups_with_attrs[valid_mask].copy()
         
-        # Fill NaN with 0 (for missing technical params)
-        self.X = self.X.fillna(0)
+        if self.backend != 'hist':
+            # Fill NaN with 0 (for missing technical params)
+            self.X = self.X.fillna(0)
         
     def build_model(self):
         """Build and train the model"""
@@ -187,25 +169,172 @@ class EnhancedMatchupPredictor:
             self.X, self.y, test_size=0.2, random_state=42, stratify=self.y
         )
         
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1,
-            class_weight='balanced'
-        )
-        self.model.fit(X_train, y_train)
+        if self.backend == 'sgd':
+            # Antisymmetric by construction: P(A beats B) = 1 - P(B beats A)
+            self.model = AntisymmetricClassifier(OnlineLogit())
+            # One row per outcome weighted by its set count, plus the results
+            # received since the tables were built
+            counts = self.matchups_data.loc[X_train.index]
+            X_rows, y_rows, weights = binomial_rows(
+                X_train.to_numpy(dtype=np.float64),
+                counts['char1_wins'].to_numpy(dtype=np.float64),
+                counts['char2_wins'].to_numpy(dtype=np.float64)
+            )
+            X_rows = pd.DataFrame(X_rows, columns=self.feature_names)
+            if not self.pending.empty:
+                X_new, y_new, weights_new = self._result_rows(self.pending)
+                X_rows = pd.concat([X_rows, X_new], ignore_index=True)
+                y_rows = np.concatenate([y_rows, y_new])
+                weights = np.concatenate([weights, weights_new])
+            self.model.fit(X_rows, y_rows, sample_weight=weights)
+            self.updates_since_retrain = 0
+        else:
+            if self.backend == 'hist':
+                base_model = HistGradientBoostingClassifier(
+                    max_iter=100,
+                    max_depth=5,
+                    random_state=42,
+                    class_weight='balanced'
+                )
+            else:
+                base_model = RandomForestClassifier(
+                    n_estimators=100,
+                    max_depth=10,
+                    random_state=42,
+                    n_jobs=-1,
+                    class_weight='balanced'
+                )
+            # Antisymmetric by construction: P(A beats B) = 1 - P(B beats A)
+            self.model = AntisymmetricClassifier(base_model)
+            self.model.fit(X_train, y_train)
         
         from sklearn.metrics import accuracy_score
         accuracy = accuracy_score(y_test, self.model.predict(X_test))
-        print(f"Enhanced model trained! Accuracy: {accuracy*100:.2f}%")
+        print(f"Enhanced model trained ({self.backend})! Accuracy: {accuracy*100:.2f}%")
         if self.use_tech_params:
             print(f"Using {len(self.feature_names)} features ({len(self.attributes)} attributes + {len(self.feature_names) - len(self.attributes)} technical params)")
         else:
             print(f"Using {len(self.feature_names)} features ({len(self.attributes)} attributes)")
+        
+        self.metrics = {'accuracy': accuracy, 'n_train': len(X_train)}
+        path = self.save_checkpoint()
+        if path is not None:
+            print(f"Registered model as {path.parent.name}/{path.name}")
+    
+    def save_checkpoint(self):
+        """Register the current model (with the online state for backend 'sgd')"""
+        extra = {'tech_features': self.tech_features}
+        if self.backend == 'sgd':
+            extra['pending_results'] = self.pending[RESULT_COLUMNS].values.tolist()
+            extra['updates_since_retrain'] = self.updates_since_retrain
+        try:
+            self.model_path = save_model(MODEL_NAMES[self.backend], self.model, self.feature_names,
+                                         data_key=self.data_key, metrics=self.metrics, extra=extra)
+        except OSError as e:
+            print(f"Warning: Could not save model to the registry: {e}")
+            self.model_path = None
+        return self.model_path
+    
+    def compile(self):
+        """Evaluate the model on every ordered pair of characters once (see prediction_table.py)"""
+        attrs = self.char_attrs.drop_duplicates('name').set_index('name')
+        characters = sorted(attrs.index)
+        values = attrs.loc[characters, self.attributes].to_numpy(dtype=np.float64)
+        self.table = load_or_compile(self.model_path, characters, self.attributes, values, self._char1_proba)
+        return self.table
+    
+    def _pair_features(self, diffs):
+        """Model input rows for an array of char1 - char2 attribute differences"""
+        if self.use_tech_params:
+            # Technical params are not loaded per character; use 0 as a placeholder
+            # (the histogram backend treats them as missing instead)
+            placeholder = np.nan if self.backend == 'hist' else 0
+            diffs = np.hstack([diffs, np.full((len(diffs), len(self.tech_features)), placeholder)])
+        return pd.DataFrame(diffs, columns=self.feature_names)
+    
+    def _char1_proba(self, diffs):
+        """P(char1 wins) for each row of attribute differences"""
+        # The antisymmetric model scores both orientations in one call
+        proba = self.model.predict_proba(self._pair_features(diffs))
+        return proba[:, list(self.model.classes_).index('Char1_Wins')]
+    
+    def _known_results(self, results):
+        """Per-pair results with normalized names, dropping unknown characters"""
+        results = pd.DataFrame({
+            'character_1': results['character_1'].map(self.normalize_char_name),
+            'character_2': results['character_2'].map(self.normalize_char_name),
+            'char1_wins': results['char1_wins'].to_numpy(),
+            'char2_wins': results['char2_wins'].to_numpy(),
+        })
+        names = set(self.char_attrs['name'])
+        known = results['character_1'].isin(names) & results['character_2'].isin(names)
+        if not known.all():
+            print(f"Warning: Skipping {int((~known).sum())} results with unknown characters")
+        return results[known].reset_index(drop=True)
+    
+    def _result_rows(self, results):
+        """Weighted training rows (X, y, sample_weight) of known per-pair results"""
+        attrs = self.char_attrs.drop_duplicates('name').set_index('name')[self.attributes]
+        diffs = (attrs.loc[results['character_1']].to_numpy(dtype=np.float64)
+                 - attrs.loc[results['character_2']].to_numpy(dtype=np.float64))
+        X_rows, y_rows, weights = binomial_rows(
+            diffs,
+            results['char1_wins'].to_numpy(dtype=np.float64),
+            results['char2_wins'].to_numpy(dtype=np.float64)
+        )
+        return pd.DataFrame(X_rows, columns=self.feature_names), y_rows, weights
+    
+    def update(self, results):
+        """Absorb a batch of new results into the online model (backend 'sgd').
+
+        results is a DataFrame with character_1, character_2, char1_wins and
+        char2_wins columns, e.g. the sets of one tournament round counted per
+        pair. The model takes a partial_fit step on them and is checkpointed
+        to the registry. Every retrain_every updates it is instead refit from
+        scratch on the matchup table plus every result received so far, which
+        resets the drift of the incremental steps. Once the tables are rebuilt
+        with the new sets (run_pipeline.py --db), the next start trains on them.
+        Returns the number of sets absorbed.
+        """
+        if self.backend != 'sgd':
+            raise ValueError(f"Incremental updates need backend='sgd', not '{self.backend}'")
+        batch = self._known_results(results)
+        X_rows, y_rows, weights = self._result_rows(batch)
+        if len(y_rows) == 0:
+            return 0
+        
+        self.model.partial_fit(X_rows, y_rows, sample_weight=weights)
+        if self.pending.empty:
+            self.pending = batch
+        else:
+            self.pending = (pd.concat([self.pending, batch], ignore_index=True)
+                            .groupby(['character_1', 'character_2'], as_index=False).sum())
+        self.updates_since_retrain += 1
+        
+        if self.updates_since_retrain >= self.retrain_every:
+            print(f"{self.updates_since_retrain} updates since the last full fit, refitting...")
+            self.load_data()
+            self.build_model()
+        else:
+            self.save_checkpoint()
+        self.compile()
+        return int(weights.sum())
     
-    def predict(self, char1_name, char2_name):
-        """Predict matchup outcome with symmetric predictions"""
+    def predict(self, char1_name, char2_name, live=False):
+        """Predict matchup outcome; swapping the characters swaps the probabilities.
+        
+        Reads the precompiled table; with live=True (or for names missing from
+        the table) the model is evaluated instead. Table results are shared
+        between calls, so treat them as read-only.
+        """
+        if not live and self.table is not None:
+            result = self.table.result(char1_name, char2_name)
+            if result is None:
+                result = self.table.result(self.normalize_char_name(char1_name),
+                                           self.normalize_char_name(char2_name))
+            if result is not None:
+                return result, None
+        
         char1_norm = self.normalize_char_name(char1_name)
         char2_norm = self.normalize_char_name(char2_name)
         
@@ -224,65 +353,19 @@ class EnhancedMatchupPredictor:
             diff = char1_data[attr].values[0] - char2_data[attr].values[0]
             features.append(diff)
         
-        # Add technical params if available (use 0 as default)
-        if self.use_tech_params:
-            # Try to get tech params for both characters
-            # For now, use 0 as placeholder (would need tech_params loaded)
-            for _ in self.tech_features:
-                features.append(0)  # Placeholder - would need full tech params loading
-        
-        # Convert to DataFrame with feature names to avoid sklearn warning
-        features_df = pd.DataFrame([features], columns=self.feature_names)
-        
-        # Predict both directions for symmetry
-        pred1 = self.model.predict(features_df)[0]
-        prob1 = self.model.predict_proba(features_df)[0]
-        
-        # Flipped direction
-        features_flipped = [-f for f in features]
-        features_flipped_df = pd.DataFrame([features_flipped], columns=self.feature_names)
-        pred2 = self.model.predict(features_flipped_df)[0]
-        prob2 = self.model.predict_proba(features_flipped_df)[0]
+        # Technical params get placeholders in _pair_features()
+        char1_prob = self._char1_proba(np.array([features], dtype=np.float64))[0]
+        char2_prob = 1 - char1_prob
         
-        # Use consensus
-        if pred1 == 'Char1_Wins':
-            winner1 = char1_norm
-            prob_win1 = prob1[0] if self.model.classes_[0] == 'Char1_Wins' else prob1[1]
-        else:
-            winner1 = char2_norm
-            prob_win1 = prob1[1] if self.model.classes_[0] == 'Char1_Wins' else prob1[0]
-        
-        if pred2 == 'Char1_Wins':
-            winner2 = char2_norm  # char2 is char1 in flipped direction
-            prob_win2 = prob2[0] if self.model.classes_[0] == 'Char1_Wins' else prob2[1]
-        else:
-            winner2 = char1_norm
-            prob_win2 = prob2[1] if self.model.classes_[0] == 'Char1_Wins' else prob2[0]
-        
-        # Average probabilities
-        if winner1 == winner2:
-            final_winner = winner1
-            final_prob = (prob_win1 + prob_win2) / 2
-        else:
-            prob_char1_avg = (prob_win1 + (1 - prob_win2)) / 2 if winner1 == char1_norm else ((1 - prob_win1) + prob_win2) / 2
-            prob_char2_avg = 1 - prob_char1_avg
-            
-            if prob_char1_avg > prob_char2_avg:
-                final_winner = char1_norm
-                final_prob = prob_char1_avg
-            else:
-                final_winner = char2_norm
-                final_prob = prob_char2_avg
-        
-        # Determine final prediction
-        if final_winner == char1_norm:
+        # Determine final prediction (an exact tie goes to char2)
+        if char1_prob > char2_prob:
             final_prediction = 'Char1_Wins'
-            char1_prob = final_prob
-            char2_prob = 1 - final_prob
+            final_winner = char1_norm
+            final_prob = char1_prob
         else:
             final_prediction = 'Char2_Wins'
-            char1_prob = 1 - final_prob
-            char2_prob = final_prob
+            final_winner = char2_norm
+            final_prob = char2_prob
         
         # Get attribute comparison
         comparison = {}
@@ -321,3 +404,10 @@ class EnhancedMatchupPredictor:
             }).sort_values('importance', ascending=False)
         return None
 
+
+if __name__ == "__main__":
+    # Retrain on the current data and register the model for the apps to load
+    import argparse
+    parser = argparse.ArgumentParser(description="Retrain and register the enhanced predictor")
+    parser.add_argument('--backend', choices=sorted(MODEL_NAMES), default='rf')
+    EnhancedMatchupPredictor(retrain=True, backend=parser.parse_args().backend)
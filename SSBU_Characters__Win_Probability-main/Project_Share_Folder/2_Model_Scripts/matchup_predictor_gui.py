@@ -36,6 +36,13 @@ class MatchupPredictorGUI:
             messagebox.showerror("Error", f"Failed to load model: {str(e)}")
             return
         
+        # Head-to-head records are optional; the matrix is memory-mapped, not parsed
+        try:
+            from matchup_matrix import load_matchup_matrix
+            self.matrix = load_matchup_matrix()
+        except Exception:
+            self.matrix = None
+        
         # Create main frame
         main_frame = ttk.Frame(root, padding="10")
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -155,6 +162,21 @@ class MatchupPredictorGUI:
         output += f"  {result['char1']}: {result['probabilities'].get('Char1_Wins', 0)*100:.1f}%\n"
         output += f"  {result['char2']}: {result['probabilities'].get('Char2_Wins', 0)*100:.1f}%\n\n"
         
+        # Head-to-head record from the matchup matrix
+        record = self.matrix.lookup(result['char1'], result['char2']) if self.matrix is not None else None
+        if record and record['total_games'] > 0:
+            output += f"Tournament Record ({record['total_games']:g} {record['unit']}):\n"
+            if record['char1_wins'] is not None:
+                output += f"  {record['char1']}: {record['char1_wins']:g} wins ({record['char1_winrate']*100:.1f}%)\n"
+                output += f"  {record['char2']}: {record['char2_wins']:g} wins\n"
+            elif record['p1_wins'] is not None:
+                # The data counts set wins per player slot, not per character
+                output += f"  Player 1 slot: {record['p1_wins']:g} wins\n"
+                output += f"  Player 2 slot: {record['p2_wins']:g} wins\n"
+            else:
+                output += "  Mirror match (no win split)\n"
+            output += "\n"
+        
         # Attribute comparison
         output += f"{'='*70}\n"
         output += "ATTRIBUTE COMPARISON\n"
@@ -167,6 +167,15 @@ def load_predictor():
         error_msg = f"{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
         return None, error_msg
 
+@st.cache_resource
+def load_matrix():
+    """Memory-map the dense matchup matrix (cached), or None if it is unavailable"""
+    try:
+        from matchup_matrix import load_matchup_matrix
+        return load_matchup_matrix()
+    except Exception:
+        return None
+
 def find_visualization_files():
     """Find all visualization files from model scripts"""
     script_dir = Path(__file__).parent
@@ -218,6 +227,7 @@ def main():
     
     # Load predictor
     predictor, error = load_predictor()
+    matrix = load_matrix()
     
     if error:
         st.error(f"Error loading model: {error}")
@@ -308,6 +318,26 @@ def main():
                                 value=f"{result['probabilities'].get('Char2_Wins', 0)*100:.1f}%"
                             )
                         
+                        # Head-to-head record straight from the matchup matrix
+                        record = matrix.lookup(result['char1'], result['char2']) if matrix is not None else None
+                        if record and record['total_games'] > 0:
+                            if record['char1_wins'] is not None:
+                                st.caption(
+                                    f"Tournament record: {record['char1']} {record['char1_wins']:g}-"
+                                    f"{record['char2_wins']:g} {record['char2']} over {record['total_games']:g} "
+                                    f"{record['unit']} ({record['char1_winrate']*100:.1f}% for {record['char1']})"
+                                )
+                            elif record['p1_wins'] is not None:
+                                # The data counts set wins per player slot, not per character
+                                st.caption(
+                                    f"Tournament record: {record['total_games']:g} {record['unit']}, "
+                                    f"{record['p1_wins']:g}-{record['p2_wins']:g} for the player 1 slot "
+                                    f"(wins are not counted per character)"
+                                )
+                            else:
+                                st.caption(f"Tournament record: {record['total_games']:g} {record['unit']} "
+                                           f"(mirror match)")
+                        
                         # Attribute comparison
                         st.markdown("---")
                         st.subheader("Attribute Comparison")
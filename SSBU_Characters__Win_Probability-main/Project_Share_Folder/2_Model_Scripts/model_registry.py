@@ -0,0 +1,207 @@
+"""
+Versioned on-disk registry of fitted models
+
+Training scripts register what they fit and the predictors load it back
+instead of retraining at startup. Each artifact is a directory
+
+    1_Data_Files/model_registry/<name>/v0001/
+        model.joblib   the fitted estimator (uncompressed, so its NumPy
+                       arrays can be memory-mapped on load)
+        meta.json      feature schema, classes, training metadata and the
+                       feature-store key of the data it was trained on
+
+load_model() returns the newest version that is compatible: written by the
+same registry format and scikit-learn version, with the requested feature
+schema and training data. Without one the caller trains and registers a
+new version.
+
+List what is stored with:
+    python model_registry.py
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import joblib
+import sklearn
+
+REGISTRY_VERSION = 1
+MODEL_FILE = 'model.joblib'
+META_FILE = 'meta.json'
+KEEP_VERSIONS = 5
+
+
+def default_registry_dir():
+    """model_registry/ in 1_Data_Files, or in the current directory"""
+    data_dir = Path(__file__).parent.parent / "1_Data_Files"
+    return data_dir / 'model_registry' if data_dir.exists() else Path('model_registry')
+
+
+class ModelArtifact:
+    """A fitted model loaded from the registry together with its metadata"""
+
+    def __init__(self, model, meta, path):
+        self.model = model
+        self.meta = meta
+        self.path = Path(path)
+
+    @property
+    def name(self):
+        return self.meta['name']
+
+    @property
+    def version(self):
+        return self.meta['version']
+
+    @property
+    def feature_names(self):
+        return list(self.meta['feature_names'])
+
+    @property
+    def metrics(self):
+        return self.meta.get('metrics', {})
+
+
+def _versions(model_dir):
+    """(version, path) of the stored versions of one model, newest first"""
+    if not model_dir.exists():
+        return []
+    versions = []
+    for path in model_dir.glob('v*'):
+        if path.is_dir() and path.name[1:].isdigit():
+            versions.append((int(path.name[1:]), path))
+    return sorted(versions, reverse=True)
+
+
+def _read_meta(path):
+    """Metadata of a complete artifact, or None (meta.json is written last)"""
+    try:
+        with open(path / META_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_compatible(meta, feature_names=None, data_key=None):
+    """True when an artifact can be used by this code for these features and data"""
+    if meta.get('registry_version') != REGISTRY_VERSION:
+        return False
+    # Pickled estimators are only guaranteed to load in the version that wrote them
+    if meta.get('sklearn_version') != sklearn.__version__:
+        return False
+    if feature_names is not None and meta.get('feature_names') != list(feature_names):
+        return False
+    if data_key is not None and meta.get('data_key') != data_key:
+        return False
+    return True
+
+
+def save_model(name, model, feature_names, data_key=None, metrics=None, extra=None,
+               registry_dir=None, keep=KEEP_VERSIONS):
+    """Register a fitted model as the next version of name and return its directory.
+
+    metrics (e.g. accuracy) and extra (anything the loader needs to rebuild
+    its inputs) must be JSON-serializable. Only the newest keep versions are
+    kept.
+    """
+    model_dir = Path(registry_dir or default_registry_dir()) / name
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    # Claim the next version number; mkdir fails if a concurrent run took it
+    versions = _versions(model_dir)
+    version = versions[0][0] + 1 if versions else 1
+    while True:
+        path = model_dir / f"v{version:04d}"
+        try:
+            path.mkdir()
+            break
+        except FileExistsError:
+            version += 1
+
+    joblib.dump(model, path / MODEL_FILE)
+    meta = {
+        'registry_version': REGISTRY_VERSION,
+        'name': name,
+        'version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'model_class': type(model).__name__,
+        'sklearn_version': sklearn.__version__,
+        'feature_names': list(feature_names),
+        'classes': [str(c) for c in getattr(model, 'classes_', [])],
+        'params': {key: repr(value) for key, value in model.get_params().items()},
+        'data_key': data_key,
+        'metrics': metrics or {},
+        'extra': extra or {},
+    }
+    tmp_path = path / f"{META_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp_path, path / META_FILE)
+
+    for _, old_path in _versions(model_dir)[keep:]:
+        shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+
+def load_model(name, feature_names=None, data_key=None, registry_dir=None, mmap_mode='r'):
+    """Newest compatible ModelArtifact for name, or None if there is none"""
+    model_dir = Path(registry_dir or default_registry_dir()) / name
+    for _, path in _versions(model_dir):
+        meta = _read_meta(path)
+        if meta is None or not is_compatible(meta, feature_names, data_key):
+            continue
+        try:
+            model = joblib.load(path / MODEL_FILE, mmap_mode=mmap_mode)
+        except Exception as e:
+            print(f"   Skipping unreadable model {path}: {e}")
+            continue
+        return ModelArtifact(model, meta, path)
+    return None
+
+
+def list_models(registry_dir=None):
+    """Metadata of every complete artifact, grouped by model name, newest first"""
+    registry_dir = Path(registry_dir or default_registry_dir())
+    if not registry_dir.exists():
+        return {}
+    models = {}
+    for model_dir in sorted(p for p in registry_dir.iterdir() if p.is_dir()):
+        metas = [_read_meta(path) for _, path in _versions(model_dir)]
+        models[model_dir.name] = [meta for meta in metas if meta is not None]
+    return models
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="List the models stored in the registry")
+    parser.add_argument('--registry', default=None,
+                        help="Registry directory (defaults to 1_Data_Files/model_registry)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    registry_dir = Path(args.registry or default_registry_dir())
+
+    print("=" * 70)
+    print("MODEL REGISTRY")
+    print("=" * 70)
+
+    print(f"\n1. Models in '{registry_dir}':")
+    models = list_models(registry_dir)
+    if not models:
+        print("   (none)")
+    for name, metas in models.items():
+        print(f"\n   {name}")
+        for meta in metas:
+            status = 'ok' if is_compatible(meta) else 'incompatible'
+            metrics = ', '.join(f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+                                for key, value in meta.get('metrics', {}).items())
+            print(f"     v{meta['version']:04d}  {meta['created']}  {meta['model_class']:<28} "
+                  f"{len(meta['feature_names']):>2} features  {status:<12} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
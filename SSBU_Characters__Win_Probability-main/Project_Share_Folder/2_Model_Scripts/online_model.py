@@ -0,0 +1,59 @@
+"""
+Logistic matchup model that can be updated incrementally
+
+OnlineLogit is a logistic regression fitted by stochastic gradient descent
+(SGDClassifier with log loss) on features scaled to unit variance. fit()
+trains from scratch; partial_fit() only takes gradient steps on a batch of
+new rows, about a millisecond for a tournament round, so a running
+predictor can absorb results without retraining. The feature scale and the
+sample-weight normalisation are fixed by fit() and reused by every update.
+"""
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+
+class OnlineLogit(ClassifierMixin, BaseEstimator):
+    """SGD logistic regression on scaled features, with partial_fit"""
+
+    def __init__(self, alpha=1e-3, random_state=42):
+        self.alpha = alpha
+        self.random_state = random_state
+
+    def _weights(self, sample_weight):
+        # Weights relative to the mean of the full fit keep the SGD step size
+        # independent of how many sets a row stands for
+        return None if sample_weight is None else np.asarray(sample_weight) / self.weight_scale_
+
+    def fit(self, X, y, sample_weight=None):
+        """Train from scratch on all rows"""
+        # No centring: the scaled features of a mirrored matchup are still negated
+        self.scaler_ = StandardScaler(with_mean=False).fit(X)
+        self.weight_scale_ = 1.0 if sample_weight is None else float(np.mean(sample_weight))
+        self.sgd_ = SGDClassifier(loss='log_loss', alpha=self.alpha, max_iter=1000, tol=1e-4,
+                                  random_state=self.random_state)
+        self.sgd_.fit(self.scaler_.transform(X), y, sample_weight=self._weights(sample_weight))
+        self.classes_ = self.sgd_.classes_
+        self.n_features_in_ = self.scaler_.n_features_in_
+        if hasattr(self.scaler_, 'feature_names_in_'):
+            self.feature_names_in_ = self.scaler_.feature_names_in_
+        return self
+
+    def partial_fit(self, X, y, sample_weight=None):
+        """Update the fitted model with a batch of new rows (fits it if it is not fitted yet)"""
+        if not hasattr(self, 'sgd_'):
+            return self.fit(X, y, sample_weight)
+        # SGD updates the coefficients in place; a model loaded from the
+        # registry has them as read-only memory maps
+        for name in ('coef_', 'intercept_'):
+            if not getattr(self.sgd_, name).flags.writeable:
+                setattr(self.sgd_, name, np.array(getattr(self.sgd_, name)))
+        self.sgd_.partial_fit(self.scaler_.transform(X), y, sample_weight=self._weights(sample_weight))
+        return self
+
+    def predict_proba(self, X):
+        return self.sgd_.predict_proba(self.scaler_.transform(X))
+
+    def predict(self, X):
+        return self.sgd_.predict(self.scaler_.transform(X))
@@ -0,0 +1,217 @@
+"""
+Bulk parsing and on-disk caching of each player's most-used characters
+
+The players table stores character usage as a JSON object per player
+({"ultimate/fox": 20, "ultimate/falco": 3}). Parsing it row by row with
+json.loads dominates start-up of the dataset build, so the common flat
+objects are parsed for all players at once with one vectorized regex pass,
+and the result is cached as compact arrays keyed by a hash of the column.
+"""
+import hashlib
+import json
+from itertools import chain
+import numpy as np
+import pandas as pd
+
+# A flat JSON object of "name": number pairs with no escapes, exponents or
+# duplicate handling concerns; anything else goes through json.loads
+_JSON_NUMBER = r'-?(?:0|[1-9]\d*)(?:\.\d+)?'
+_JSON_PAIR = r'"([^"\\]*)"\s*:\s*(' + _JSON_NUMBER + r')'
+_FLAT_OBJECT = (r'\s*\{\s*(?:"[^"\\]*"\s*:\s*' + _JSON_NUMBER +
+                r'\s*(?:,\s*"[^"\\]*"\s*:\s*' + _JSON_NUMBER + r'\s*)*)?\}\s*')
+
+CACHE_VERSION = 1
+
+
+# Parse character data and get primary characters for each player
+def get_primary_characters(char_string, top_n=3):
+    """Extract top N most used characters for a player"""
+    try:
+        chars = json.loads(char_string)
+        if not chars:
+            return []
+
+        # Sort by usage count (descending)
+        sorted_chars = sorted(chars.items(), key=lambda x: x[1], reverse=True)
+
+        # Extract character names (remove 'ultimate/' prefix)
+        primary = []
+        for char_key, count in sorted_chars[:top_n]:
+            char_name = char_key.replace('ultimate/', '').strip()
+            if char_name and char_name != 'random':
+                primary.append(char_name.lower())
+
+        return primary
+    except:
+        return []
+
+
+def _primary_usage(char_string, top_n=3):
+    """get_primary_characters() that also returns the usage counts"""
+    try:
+        chars = json.loads(char_string)
+        sorted_chars = sorted(chars.items(), key=lambda x: x[1], reverse=True)
+        primary = []
+        for char_key, count in sorted_chars[:top_n]:
+            char_name = char_key.replace('ultimate/', '').strip()
+            if char_name and char_name != 'random':
+                usage = count if isinstance(count, (int, float)) else 0
+                primary.append((char_name.lower(), usage))
+        return primary
+    except:
+        return []
+
+
+class PlayerMains:
+    """Top-N characters per player as compact arrays.
+
+    char_codes[i, k] indexes into names (the raw, lowercased character names
+    as they appear in the players table) and is -1 for an empty slot;
+    usage[i, k] is that character's usage count. Only players with at least
+    one usable character are kept, one row per player id.
+    """
+
+    def __init__(self, player_ids, char_codes, usage, names, column_hash=''):
+        self.player_ids = player_ids
+        self.char_codes = char_codes
+        self.usage = usage
+        self.names = list(names)
+        self.column_hash = column_hash
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def as_dict(self):
+        """player id -> list of main names, the layout get_primary_characters() produced"""
+        names = np.array(self.names + [''], dtype=object)
+        lists = names[self.char_codes]
+        return {player_id: [name for name in row if name]
+                for player_id, row in zip(self.player_ids.tolist(), lists)}
+
+    def save(self, path):
+        """Write the arrays and the hash of the column they were parsed from"""
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                version=np.int64(CACHE_VERSION),
+                column_hash=np.array(self.column_hash),
+                player_ids=self.player_ids,
+                char_codes=self.char_codes,
+                usage=self.usage,
+                names=np.array(self.names, dtype=str),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Read arrays written by save()"""
+        with np.load(path) as cache:
+            if int(cache['version']) != CACHE_VERSION:
+                raise ValueError(f"Unsupported player mains cache version in {path}")
+            return cls(cache['player_ids'], cache['char_codes'], cache['usage'],
+                       cache['names'].tolist(), str(cache['column_hash']))
+
+
+def hash_players(players_df):
+    """Content hash of the player_id and characters columns"""
+    row_hashes = pd.util.hash_pandas_object(players_df[['player_id', 'characters']], index=False)
+    return hashlib.sha1(row_hashes.to_numpy().tobytes()).hexdigest()
+
+
+def parse_player_mains(players_df, top_n=3):
+    """Extract the top_n mains of every player in one vectorized pass.
+
+    Matches get_primary_characters() exactly: ties keep JSON order, 'random'
+    and empty names are dropped after taking the top_n, and a player id that
+    appears more than once keeps its last row with any usable characters.
+    """
+    chars = players_df['characters'].reset_index(drop=True).astype(str)
+
+    # Fast path: flat objects parsed with a single regex over the whole column
+    flat = chars.str.fullmatch(_FLAT_OBJECT)
+    found = chars[flat].str.findall(_JSON_PAIR)
+    found_pairs = list(chain.from_iterable(found))
+    pairs = pd.DataFrame({
+        'row': np.repeat(found.index.to_numpy(), found.str.len().to_numpy()),
+        'key': np.array([key for key, _ in found_pairs], dtype=object),
+        'count': np.array([count for _, count in found_pairs], dtype=float),
+    })
+
+    # json.loads keeps the last value of a duplicated key; leave those rows to it
+    duplicated_rows = pairs.loc[pairs.duplicated(['row', 'key']), 'row'].unique()
+    pairs = pairs[~pairs['row'].isin(duplicated_rows)]
+    slow_rows = np.union1d(np.flatnonzero(~flat.to_numpy()), duplicated_rows)
+
+    # Stable sort keeps JSON order between equal counts, like sorted(reverse=True)
+    pairs = pairs.sort_values(['row', 'count'], ascending=[True, False], kind='stable')
+    pairs = pairs[pairs.groupby('row').cumcount() < top_n]
+    name = pairs['key'].str.replace('ultimate/', '', regex=False).str.strip()
+    keep = (name != '') & (name != 'random')
+    pairs = pairs.assign(name=name.str.lower())[keep]
+    pairs['slot'] = pairs.groupby('row').cumcount()
+
+    # Slow path: anything the regex cannot prove is a flat object
+    slow = []
+    for row in slow_rows:
+        for slot, (slow_name, count) in enumerate(_primary_usage(chars.iat[row], top_n)):
+            slow.append((row, slot, slow_name, count))
+    if slow:
+        slow_df = pd.DataFrame(slow, columns=['row', 'slot', 'name', 'count'])
+        pairs = pd.concat([pairs[['row', 'slot', 'name', 'count']], slow_df], ignore_index=True)
+
+    names = sorted(pairs['name'].unique())
+    code_of = {n: code for code, n in enumerate(names)}
+
+    n_rows = len(chars)
+    char_codes = np.full((n_rows, top_n), -1, dtype=np.int16)
+    usage = np.zeros((n_rows, top_n), dtype=np.int32)
+    rows = pairs['row'].to_numpy(dtype=np.int64)
+    slots = pairs['slot'].to_numpy(dtype=np.int64)
+    char_codes[rows, slots] = pairs['name'].map(code_of).to_numpy(dtype=np.int16)
+    counts = pairs['count'].to_numpy(dtype=float)
+    usage[rows, slots] = np.clip(counts, 0, np.iinfo(np.int32).max).astype(np.int32)
+
+    # Players without usable characters are dropped; duplicate ids keep the last
+    player_ids = players_df['player_id'].reset_index(drop=True)
+    has_main = char_codes[:, 0] >= 0
+    keep_rows = np.sort(player_ids[has_main].drop_duplicates(keep='last').index.to_numpy())
+
+    ids = player_ids.iloc[keep_rows]
+    # Plain numpy arrays so the cache can be written without pickling
+    if pd.api.types.is_numeric_dtype(ids):
+        ids = ids.to_numpy()
+    else:
+        ids = ids.astype(str).to_numpy(dtype=str)
+    return PlayerMains(ids, char_codes[keep_rows], usage[keep_rows], names)
+
+
+def load_player_mains(conn, cache_path=None, top_n=3):
+    """Read the players table and return PlayerMains, reusing the cache when unchanged"""
+    players_query = """
+        SELECT player_id, characters
+        FROM players
+        WHERE game = 'ultimate'
+          AND characters IS NOT NULL
+          AND characters != ''
+          AND characters != '{}'
+    """
+
+    players_df = pd.read_sql_query(players_query, conn)
+    print(f"   Loaded {len(players_df)} players with character data")
+
+    column_hash = f"{hash_players(players_df)}:{top_n}"
+    if cache_path is not None and cache_path.exists():
+        try:
+            mains = PlayerMains.load(cache_path)
+        except (ValueError, KeyError, OSError) as e:
+            print(f"   Ignoring unreadable player cache: {e}")
+        else:
+            if mains.column_hash == column_hash:
+                print(f"   Reused parsed characters from '{cache_path}'")
+                return mains
+
+    mains = parse_player_mains(players_df, top_n)
+    mains.column_hash = column_hash
+    if cache_path is not None:
+        mains.save(cache_path)
+        print(f"   Cached parsed characters to '{cache_path}'")
+    return mains
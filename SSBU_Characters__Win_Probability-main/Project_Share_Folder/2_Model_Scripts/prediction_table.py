@@ -0,0 +1,173 @@
+"""
+Precompiled predictions for every ordered pair of characters
+
+The predictors only ever see ~85 characters, so there are ~7,000 ordered
+pairs. Instead of assembling features and calling the model on every request,
+compile() evaluates the model on all of them in one predict_proba call and
+keeps the results as a compact array table, indexed by the sorted roster:
+
+    proba[i, j]      P(character i beats character j)
+    winner[i, j]     True when i is the predicted winner (an exact tie goes to j)
+    values[i, a]     attribute a of character i
+    deltas[i, j, a]  values[i, a] - values[j, a], the model's attribute features
+
+The table is saved next to the model in its registry version directory
+(model_registry/<name>/vNNNN/prediction_table/), as .npy arrays plus a JSON
+sidecar like matchup_matrix.py, and memory-mapped on load. result() builds
+the predictors' result dict from one indexed read and caches it, so a
+repeated prediction is a dictionary lookup. Names that are not in the table
+fall back to the live model in the predictors.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+TABLE_VERSION = 1
+ARRAYS = ('proba', 'winner', 'values', 'deltas')
+INDEX_FILE = 'index.json'
+TABLE_DIR = 'prediction_table'
+
+
+class PredictionTable:
+    """Model predictions for all ordered pairs of characters, with O(1) lookups"""
+
+    def __init__(self, characters, attributes, proba, winner, values, deltas):
+        self.characters = list(characters)
+        self.attributes = list(attributes)
+        self.proba = proba
+        self.winner = winner
+        self.values = values
+        self.deltas = deltas
+        self._position = {name: pos for pos, name in enumerate(self.characters)}
+        self._results = {}
+
+    def __len__(self):
+        return len(self.characters)
+
+    @classmethod
+    def compile(cls, characters, attributes, values, char1_proba):
+        """Evaluate char1_proba(deltas) -> P(char1 wins) on every ordered pair in one call.
+
+        values is the (characters x attributes) matrix; char1_proba receives the
+        (n * n, attributes) array of char1 - char2 differences, row i * n + j
+        for characters i and j.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(characters)
+        deltas = values[:, None, :] - values[None, :, :]
+        proba = np.asarray(char1_proba(deltas.reshape(n * n, -1)), dtype=np.float64).reshape(n, n)
+        # Same comparison as the live predictions: P(char1) > P(char2)
+        winner = proba > 1 - proba
+        return cls(characters, attributes, proba, winner, values, deltas)
+
+    def matches(self, characters, attributes, values):
+        """True when the table was compiled for these characters and attribute values"""
+        return (self.characters == list(characters) and self.attributes == list(attributes)
+                and np.array_equal(self.values, np.asarray(values, dtype=np.float64)))
+
+    def probability(self, char1, char2):
+        """P(char1 beats char2) for two table names, or None if either is unknown"""
+        i = self._position.get(char1)
+        j = self._position.get(char2)
+        if i is None or j is None:
+            return None
+        return float(self.proba[i, j])
+
+    def result(self, char1, char2):
+        """The predictors' result dict for two table names, or None if either is unknown.
+
+        Results are cached and shared between calls, so treat them as read-only.
+        """
+        result = self._results.get((char1, char2))
+        if result is not None:
+            return result
+        i = self._position.get(char1)
+        j = self._position.get(char2)
+        if i is None or j is None:
+            return None
+
+        char1_prob = self.proba[i, j]
+        char2_prob = 1 - char1_prob
+        if self.winner[i, j]:
+            final_prediction, final_winner, final_prob = 'Char1_Wins', char1, char1_prob
+        else:
+            final_prediction, final_winner, final_prob = 'Char2_Wins', char2, char2_prob
+        comparison = {}
+        for a, attr in enumerate(self.attributes):
+            comparison[attr] = {
+                char1: self.values[i, a],
+                char2: self.values[j, a],
+                'difference': self.deltas[i, j, a]
+            }
+        result = self._results[(char1, char2)] = {
+            'char1': char1,
+            'char2': char2,
+            'prediction': final_prediction,
+            'probabilities': {
+                'Char1_Wins': char1_prob,
+                'Char2_Wins': char2_prob
+            },
+            'comparison': comparison,
+            'predicted_winner': final_winner,
+            'confidence': final_prob
+        }
+        return result
+
+    def save(self, path):
+        """Write the .npy arrays and the sidecar index into the table directory"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            tmp_path = path / f"{name}.npy.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_path, path / f"{name}.npy")
+        index = {
+            'version': TABLE_VERSION,
+            'characters': self.characters,
+            'attributes': self.attributes,
+            'arrays': {name: f"{name}.npy" for name in ARRAYS},
+        }
+        # Written last: a directory without the index is an incomplete table
+        tmp_path = path / f"{INDEX_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, path / INDEX_FILE)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Open a table written by save(); arrays are read-only memory maps by default"""
+        path = Path(path)
+        with open(path / INDEX_FILE, encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != TABLE_VERSION:
+            raise ValueError(f"Unsupported prediction table version in {path}")
+        arrays = {name: np.load(path / index['arrays'][name], mmap_mode=mmap_mode) for name in ARRAYS}
+        n, k = len(index['characters']), len(index['attributes'])
+        shapes = {'proba': (n, n), 'winner': (n, n), 'values': (n, k), 'deltas': (n, n, k)}
+        if any(arrays[name].shape != shape for name, shape in shapes.items()):
+            raise ValueError(f"Array shapes in {path} do not match its index")
+        return cls(index['characters'], index['attributes'], **arrays)
+
+
+def load_or_compile(model_path, characters, attributes, values, char1_proba):
+    """The table stored with a registered model, compiled and saved there if it
+    is missing or was compiled for other characters. model_path may be None
+    (model not registered), in which case the table is only kept in memory."""
+    table_path = None if model_path is None else Path(model_path) / TABLE_DIR
+    if table_path is not None and (table_path / INDEX_FILE).exists():
+        try:
+            table = PredictionTable.load(table_path)
+        except (ValueError, KeyError, OSError):
+            table = None
+        if table is not None and table.matches(characters, attributes, values):
+            return table
+    table = PredictionTable.compile(characters, attributes, values, char1_proba)
+    if table_path is not None:
+        try:
+            table.save(table_path)
+        except OSError as e:
+            print(f"Warning: Could not save the prediction table: {e}")
+    return table
@@ -0,0 +1,94 @@
+"""
+Windowed and rolling matchup win rates from the time-bucketed matchup cube
+
+Build the cube first with: python build_matchup_dataset.py --cube
+"""
+import argparse
+import time
+from pathlib import Path
+
+from build_matchup_dataset import MatchupCube, counts_to_dataframe, normalize_character_name
+
+
+def get_data_path(filename):
+    """Find data file in 1_Data_Files or current directory"""
+    script_dir = Path(__file__).parent
+    data_dir = script_dir.parent / "1_Data_Files"
+    if data_dir.exists():
+        file_path = data_dir / filename
+        if file_path.exists():
+            return str(file_path)
+    if Path(filename).exists():
+        return filename
+    return str(data_dir / filename) if data_dir.exists() else filename
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Query win rates over a time window of the matchup cube")
+    parser.add_argument('--cube', default=None,
+                        help="Cube file (defaults to 1_Data_Files/character_matchup_cube.npz)")
+    parser.add_argument('--since', help="First date to include, e.g. 2024-01-01 (its whole bucket counts)")
+    parser.add_argument('--until', help="Stop before the bucket holding this date")
+    parser.add_argument('--half-life', type=float, default=None,
+                        help="Exponentially decay older buckets with this half-life in days "
+                             "instead of summing a window")
+    parser.add_argument('--as-of', help="Reference date for --half-life (default: end of the cube)")
+    parser.add_argument('--character', help="Only show matchups involving this character")
+    parser.add_argument('--games', action='store_true',
+                        help="Add game-level columns and apply --min-games to games played")
+    parser.add_argument('--min-games', type=float, default=5,
+                        help="Drop matchups with fewer (possibly decayed) sets or games (default 5)")
+    parser.add_argument('--output', help="Save the win rates to this CSV")
+    args = parser.parse_args(argv)
+    if args.half_life is not None and (args.since or args.until):
+        parser.error("--half-life cannot be combined with --since/--until")
+    if args.as_of and args.half_life is None:
+        parser.error("--as-of only applies with --half-life")
+    if args.half_life is not None and args.half_life <= 0:
+        parser.error("--half-life must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 70)
+    print("MATCHUP CUBE QUERY")
+    print("=" * 70)
+
+    cube_path = args.cube or get_data_path('character_matchup_cube.npz')
+    print(f"\n1. Loading cube from '{cube_path}'...")
+    cube = MatchupCube.load(cube_path)
+    print(f"   {len(cube.characters)} characters, {len(cube)} {cube.bucket}ly buckets "
+          f"({cube.periods[0] if len(cube) else '-'} to {cube.periods[-1] if len(cube) else '-'})")
+
+    # Summing slices of the cube replaces a rescan of the sets table
+    query_start = time.perf_counter()
+    if args.half_life is not None:
+        counts = cube.decayed(args.half_life, args.as_of)
+        description = f"half-life {args.half_life:g} days as of {args.as_of or 'end of cube'}"
+    else:
+        counts = cube.window(args.since, args.until)
+        description = f"{args.since or 'start'} to {args.until or 'end'}"
+    matchups_df = counts_to_dataframe(counts, args.min_games, games=args.games)
+    query_ms = (time.perf_counter() - query_start) * 1000
+
+    print(f"\n2. Win rates for {description}")
+    print(f"   {len(matchups_df)} matchups in {query_ms:.1f} ms")
+
+    if args.character:
+        name = normalize_character_name(args.character)
+        involved = (matchups_df['character_1'] == name) | (matchups_df['character_2'] == name)
+        matchups_df = matchups_df[involved]
+        print(f"   {len(matchups_df)} matchups involving {name}")
+
+    print("\n3. Sample:")
+    print(matchups_df.sort_values('total_games', ascending=False).head(20).to_string(index=False))
+
+    if args.output:
+        matchups_df.to_csv(args.output, index=False)
+        print(f"\n   Saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
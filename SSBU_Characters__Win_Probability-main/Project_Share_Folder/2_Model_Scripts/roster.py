@@ -0,0 +1,151 @@
+"""
+Character roster resolver shared by every pipeline stage and predictor
+
+Maps any spelling of a fighter (smash.csv display names, tournament
+database keys like 'ultimate/mrgameandwatch', ultimateframedata names,
+internal game names from ultimate_param.csv such as 'purin' or 'koopa')
+to the canonical smash.csv name and its stable integer id.
+"""
+import csv
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+# Alias -> smash.csv name. Only spellings that do not already reduce to the
+# same canonical key as the display name need to be listed here.
+ALIASES = {
+    # Tournament database / start.gg character keys
+    'gamewatch': 'Mr. Game & Watch',
+    'mr game and watch': 'Mr. Game & Watch',
+    'mrgameandwatch': 'Mr. Game & Watch',
+    'mariod': 'Dr. Mario',
+    'kingkr': 'King K. Rool',
+    'k rool': 'King K. Rool',
+    'rosalina': 'Rosalina & Luma',
+    'banjo and kazooie': 'Banjo & Kazooie',
+    'pyra': 'Pyra Mythra',
+    'mythra': 'Pyra Mythra',
+    'pyra/mythra': 'Pyra Mythra',
+    'pt': 'Pokemon Trainer',
+    'mega man': 'Megaman',
+
+    # Internal fighter names used in ultimate_param.csv
+    'donkey': 'Donkey Kong',
+    'captain': 'Captain Falcon',
+    'purin': 'Jigglypuff',
+    'koopa': 'Bowser',
+    'popo': 'Ice Climbers',
+    'nana': 'Ice Climbers',
+    'ganon': 'Ganondorf',
+    'szerosuit': 'Zero Suit Samus',
+    'pzenigame': 'Pokemon Trainer',
+    'pfushigisou': 'Pokemon Trainer',
+    'plizardon': 'Pokemon Trainer',
+    'diddy': 'Diddy Kong',
+    'dedede': 'King Dedede',
+    'pikmin': 'Olimar',
+    'robot': 'R.O.B.',
+    'murabito': 'Villager',
+    'rockman': 'Megaman',
+    'wiifit': 'Wii Fit Trainer',
+    'rosetta': 'Rosalina & Luma',
+    'gekkouga': 'Greninja',
+    'reflet': 'Robin',
+    'koopajr': 'Bowser Jr.',
+    'kamui': 'Corrin',
+    'krool': 'King K. Rool',
+    'shizue': 'Isabelle',
+    'gaogaen': 'Incineroar',
+    'packun': 'Piranha Plant',
+    'jack': 'Joker',
+    'brave': 'Hero',
+    'buddy': 'Banjo & Kazooie',
+    'dolly': 'Terry',
+    'master': 'Byleth',
+    'tantan': 'Min Min',
+    'pickel': 'Steve',
+    'demon': 'Kazuya',
+    'trail': 'Sora',
+    'eflame': 'Pyra Mythra',
+    'elight': 'Pyra Mythra',
+    'edge': 'Sephiroth',
+    'miifighter': 'Mii Brawler',
+    'miiswordsman': 'Mii Swordfighter',
+}
+
+
+@lru_cache(maxsize=None)
+def canonical_key(name):
+    """Reduce a name to lowercase ASCII letters and digits ('Mr. Game & Watch' -> 'mrgamewatch')"""
+    s = unicodedata.normalize('NFKD', str(name or ''))
+    s = s.encode('ascii', 'ignore').decode('ascii').lower().strip()
+    if s.startswith('ultimate/'):
+        s = s[len('ultimate/'):]
+    return re.sub(r'[^a-z0-9]', '', s)
+
+
+class Roster:
+    """Canonical character names with O(1), memoized alias resolution"""
+
+    def __init__(self, names, ids=None, aliases=ALIASES):
+        self.names = list(names)
+        self.ids = list(ids) if ids is not None else list(range(len(self.names)))
+        self._id_of_name = dict(zip(self.names, self.ids))
+        self._name_of_id = dict(zip(self.ids, self.names))
+
+        # canonical key -> display name, display names win over aliases
+        self._by_key = {canonical_key(name): name for name in self.names}
+        for alias, target in aliases.items():
+            if target in self._id_of_name:
+                self._by_key.setdefault(canonical_key(alias), target)
+
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.resolve(name) is not None
+
+    def resolve(self, name, default=None):
+        """Canonical smash.csv name for any spelling, or default if unknown"""
+        try:
+            resolved = self._cache[name]
+        except KeyError:
+            resolved = self._by_key.get(canonical_key(name))
+            self._cache[name] = resolved
+        return default if resolved is None else resolved
+
+    def normalize(self, name):
+        """Canonical name, falling back to title case for characters not in smash.csv"""
+        resolved = self.resolve(name)
+        if resolved is None:
+            return str(name).lower().strip().title()
+        return resolved
+
+    def id_of(self, name):
+        """Stable integer character id (smash.csv id column), or None if unknown"""
+        resolved = self.resolve(name)
+        return None if resolved is None else self._id_of_name[resolved]
+
+    def name_of(self, char_id):
+        """Canonical name for a character id"""
+        return self._name_of_id[char_id]
+
+
+def default_roster_path():
+    """smash.csv in 1_Data_Files, falling back to the current directory"""
+    data_path = Path(__file__).parent.parent / "1_Data_Files" / "smash.csv"
+    if data_path.exists():
+        return data_path
+    return Path("smash.csv")
+
+
+@lru_cache(maxsize=None)
+def load_roster(path=None):
+    """Build (once per process) the roster from smash.csv's id and name columns"""
+    path = Path(path) if path is not None else default_roster_path()
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return Roster([row['name'] for row in rows], [int(row['id']) for row in rows])
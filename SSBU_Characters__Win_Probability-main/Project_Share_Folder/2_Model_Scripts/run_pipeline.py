@@ -0,0 +1,368 @@
+"""
+Run the model pipeline as a graph of stages
+
+Each stage is one of the scripts in this folder with its declared input and
+output files. A stage only runs when the content of one of its inputs
+(including its own code and the sibling modules it imports) changed since
+its last successful run, or when an output is missing. Stages whose inputs
+are ready run concurrently, e.g. the classifier builds and the
+visualizations. Script output goes to pipeline_logs/<stage>.log.
+
+    python run_pipeline.py                  # rebuild what changed
+    python run_pipeline.py --dry-run        # only show what would run
+    python run_pipeline.py --force model    # rerun a stage and what depends on it
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+script_dir = Path(__file__).parent.resolve()
+project_dir = script_dir.parent
+data_dir = project_dir / "1_Data_Files"
+results_dir = project_dir / "4_Results"
+
+STATE_FILE = script_dir / '.pipeline_state.json'
+LOG_DIR = script_dir / 'pipeline_logs'
+STATE_VERSION = 1
+
+
+class Stage:
+    """One script with the files it reads and writes.
+
+    inputs are file names looked up like the scripts' get_data_path()
+    (search order given by `search`); outputs are paths relative to the
+    folder the script writes into.
+    """
+
+    def __init__(self, name, script, inputs=(), outputs=(), args=(),
+                 search=('data', 'scripts'), output_dir='scripts'):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.search = search
+        self.output_dir = output_dir
+
+
+FOLDERS = {'data': data_dir, 'results': results_dir, 'scripts': script_dir}
+
+MATCHUP_INPUTS = ['character_matchups.csv', 'smash.csv']
+
+STAGES = [
+    Stage('dataset', 'build_matchup_dataset.py',
+          inputs=['smash.csv'], outputs=['character_matchups.csv'], output_dir='data'),
+    Stage('model', 'build_matchup_model.py', inputs=MATCHUP_INPUTS,
+          outputs=['matchups_with_attributes.csv', 'model_results.csv', 'feature_importance.csv']),
+    Stage('classifier', 'build_matchup_classifier.py', inputs=MATCHUP_INPUTS,
+          outputs=['feature_importance_classifier.csv', 'classifier_tier_results.csv',
+                   'classifier_binary_results.csv']),
+    Stage('enhanced', 'build_enhanced_classifier.py', inputs=MATCHUP_INPUTS + ['ultimate_param.csv'],
+          outputs=['matchups_enhanced.csv', 'feature_importance_enhanced.csv']),
+    Stage('improved', 'improve_classifier.py', inputs=MATCHUP_INPUTS),
+    # create_visualizations.py prefers the copies in 4_Results (get_data_path(results_dir=True))
+    Stage('visualizations', 'create_visualizations.py',
+          inputs=MATCHUP_INPUTS + ['feature_importance_enhanced.csv', 'classifier_binary_results.csv'],
+          outputs=['feature_importance.png', 'winrate_distribution.png', 'top_matchups.png',
+                   'character_attributes.png', 'matchup_matrix_heatmap.png', 'feature_type_breakdown.png'],
+          search=('results', 'data', 'scripts')),
+]
+
+
+def find_database():
+    """ultimate_player_database.db in the places build_matchup_dataset.py looks, or None"""
+    for db_path in (project_dir / 'ultimate_player_database' / 'ultimate_player_database.db',
+                    Path('ultimate_player_database/ultimate_player_database.db'),
+                    project_dir.parent / 'ultimate_player_database' / 'ultimate_player_database.db'):
+        if db_path.exists():
+            return db_path.resolve()
+    return None
+
+
+def local_imports(script, seen=None):
+    """The script plus every sibling module it imports, recursively"""
+    seen = set() if seen is None else seen
+    path = script_dir / script
+    if path in seen or not path.exists():
+        return seen
+    seen.add(path)
+    tree = ast.parse(path.read_text(encoding='utf-8'))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            module = name.split('.')[0] + '.py'
+            if (script_dir / module).exists():
+                local_imports(module, seen)
+    return seen
+
+
+class FileHasher:
+    """SHA-1 of file contents, only re-read when size or mtime changed"""
+
+    def __init__(self, memo=None):
+        self.memo = dict(memo or {})
+
+    def __call__(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        signature = [stat.st_size, stat.st_mtime_ns]
+        cached = self.memo.get(str(path))
+        if cached is not None and cached[:2] == signature:
+            return cached[2]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.memo[str(path)] = signature + [digest.hexdigest()]
+        return digest.hexdigest()
+
+
+class Pipeline:
+    """Stages with resolved file paths and the dependencies between them"""
+
+    def __init__(self, stages, db_path=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.db_path = db_path
+
+        produced = {}
+        for stage in stages:
+            folder = FOLDERS[stage.output_dir]
+            stage.output_paths = [(folder / output).resolve() for output in stage.outputs]
+            for path in stage.output_paths:
+                produced[path] = stage.name
+
+        for stage in stages:
+            stage.input_paths = [self._resolve(name, stage.search, produced) for name in stage.inputs]
+            stage.code_paths = sorted(local_imports(stage.script))
+            if stage.name == 'dataset':
+                # Only new sets are folded in; it falls back to a full rebuild by itself
+                stage.args = ['--db', str(db_path), '--incremental'] if db_path is not None else []
+                if db_path is not None:
+                    stage.input_paths.append(db_path)
+            stage.depends = sorted({produced[path] for path in stage.input_paths
+                                    if path in produced and produced[path] != stage.name})
+
+    @staticmethod
+    def _resolve(name, search, produced):
+        """First folder in search order holding the file (or a stage that writes it there)"""
+        candidates = [(FOLDERS[folder] / name).resolve() for folder in search]
+        for path in candidates:
+            if path.exists() or path in produced:
+                return path
+        return candidates[0]
+
+    def dependents(self, names):
+        """names plus every stage downstream of them"""
+        selected = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for stage in self.stages.values():
+                if stage.name not in selected and selected.intersection(stage.depends):
+                    selected.add(stage.name)
+                    changed = True
+        return selected
+
+    def upstream(self, names):
+        """names plus every stage they depend on"""
+        selected = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.stages[name].depends)
+        return selected
+
+
+def load_state():
+    """Recorded input hashes per stage and the file hash memo"""
+    try:
+        with open(STATE_FILE, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+    if state.get('version') != STATE_VERSION:
+        return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+    return state
+
+
+def save_state(state):
+    tmp_path = STATE_FILE.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def stage_fingerprint(stage, hasher):
+    """path -> content hash of everything the stage reads (None for missing files)"""
+    return {str(path): hasher(path) for path in stage.input_paths + stage.code_paths}
+
+
+def why_run(stage, fingerprint, recorded, forced):
+    """Reason the stage has to run, or None if it is up to date"""
+    if forced:
+        return "forced"
+    if recorded is None:
+        return "never run"
+    missing = [path.name for path in stage.output_paths if not path.exists()]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    changed = [Path(path).name for path, digest in fingerprint.items() if recorded.get(path) != digest]
+    if changed:
+        return f"changed {', '.join(changed[:3])}{'...' if len(changed) > 3 else ''}"
+    return None
+
+
+def run_stage(stage):
+    """Run one script, writing its output to the stage log; returns (ok, seconds)"""
+    LOG_DIR.mkdir(exist_ok=True)
+    env = dict(os.environ, PYTHONIOENCODING='utf-8', MPLBACKEND='Agg')
+    start = time.perf_counter()
+    with open(LOG_DIR / f"{stage.name}.log", 'w', encoding='utf-8') as log:
+        result = subprocess.run([sys.executable, str(script_dir / stage.script)] + stage.args,
+                                cwd=script_dir, stdout=log, stderr=subprocess.STDOUT, env=env)
+    return result.returncode == 0, time.perf_counter() - start
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the pipeline stages whose inputs changed")
+    parser.add_argument('stages', nargs='*',
+                        help="Only these stages (and the stages they depend on); default all")
+    parser.add_argument('--force', nargs='*', default=None, metavar='STAGE',
+                        help="Rerun these stages (all if none given) and everything downstream")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Maximum number of stages running at once (default: CPU count)")
+    parser.add_argument('--db', default=None, help="Tournament database for the dataset stage")
+    parser.add_argument('--dry-run', action='store_true', help="Show what would run without running it")
+    parser.add_argument('--list', action='store_true', help="List the stages and their dependencies")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    wall_start = time.perf_counter()
+
+    db_path = Path(args.db).resolve() if args.db else find_database()
+    pipeline = Pipeline(STAGES, db_path)
+
+    unknown = [name for name in (args.stages or []) + (args.force or []) if name not in pipeline.stages]
+    if unknown:
+        print(f"Unknown stages: {', '.join(unknown)} (choose from {', '.join(pipeline.stages)})")
+        sys.exit(2)
+
+    if args.list:
+        for stage in pipeline.stages.values():
+            depends = ', '.join(stage.depends) or '-'
+            print(f"{stage.name:<15} {stage.script:<32} after: {depends}")
+        return
+
+    print("=" * 70)
+    print("RUNNING PIPELINE")
+    print("=" * 70)
+
+    selected = pipeline.upstream(args.stages) if args.stages else set(pipeline.stages)
+    forced = set()
+    if args.force is not None:
+        forced = pipeline.dependents(args.force or pipeline.stages)
+    if db_path is None and 'dataset' in selected:
+        print("\n   No tournament database found, the dataset stage keeps the existing character_matchups.csv")
+        selected.discard('dataset')
+
+    state = load_state()
+    hasher = FileHasher(state.get('files'))
+    order = [name for name in pipeline.stages if name in selected]
+    print(f"\n1. Checking {len(order)} stages ({args.jobs} at a time)...")
+
+    status = {}
+    timings = {}
+    done = {name for name in pipeline.stages if name not in selected}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        while len(status) < len(order):
+            # Start every stage whose dependencies have finished
+            progress = False
+            for name in order:
+                if name in status or name in running:
+                    continue
+                stage = pipeline.stages[name]
+                if any(dep in selected and dep not in done for dep in stage.depends):
+                    continue
+                failed = [dep for dep in stage.depends if status.get(dep) in ('failed', 'blocked')]
+                progress = True
+                if failed:
+                    status[name] = 'blocked'
+                    timings[name] = 0.0
+                    print(f"   {name}: not run, {', '.join(failed)} failed")
+                    done.add(name)
+                    continue
+
+                check_start = time.perf_counter()
+                fingerprint = stage_fingerprint(stage, hasher)
+                reason = why_run(stage, fingerprint, state['stages'].get(name), name in forced)
+                if reason is None:
+                    status[name] = 'up to date'
+                    timings[name] = time.perf_counter() - check_start
+                    done.add(name)
+                elif args.dry_run:
+                    status[name] = f'would run ({reason})'
+                    timings[name] = 0.0
+                    done.add(name)
+                else:
+                    print(f"   {name}: running {stage.script} ({reason})")
+                    running[name] = (executor.submit(run_stage, stage), fingerprint)
+
+            if not running:
+                if not progress:
+                    raise RuntimeError("Stage graph has a cycle")
+                continue
+            finished, _ = wait([future for future, _ in running.values()], return_when=FIRST_COMPLETED)
+            for name in [name for name, (future, _) in running.items() if future in finished]:
+                future, fingerprint = running.pop(name)
+                ok, seconds = future.result()
+                timings[name] = seconds
+                done.add(name)
+                if ok:
+                    status[name] = 'ran'
+                    state['stages'][name] = fingerprint
+                    print(f"   {name}: done in {seconds:.1f}s")
+                else:
+                    status[name] = 'failed'
+                    state['stages'].pop(name, None)
+                    print(f"   {name}: FAILED after {seconds:.1f}s, see {LOG_DIR / (name + '.log')}")
+
+    if not args.dry_run:
+        state['files'] = hasher.memo
+        save_state(state)
+
+    print("\n2. Stage summary:")
+    print(f"   {'Stage':<15} {'Status':<40} {'Time':>8}")
+    for name in order:
+        print(f"   {name:<15} {status[name]:<40} {timings[name]:>7.2f}s")
+    print(f"\n   Total wall time: {time.perf_counter() - wall_start:.2f}s")
+
+    print("\n" + "=" * 70)
+    if any(result == 'failed' for result in status.values()):
+        print("PIPELINE FINISHED WITH FAILURES")
+        print("=" * 70)
+        sys.exit(1)
+    print("PIPELINE COMPLETE")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Per-set views of the aggregated matchup rows
+
+Each row of the matchup tables stands for all the sets played between two
+characters. These helpers turn its win and loss counts into weighted
+training rows, per-set rows or a set-level accuracy. They only need numpy,
+so the predictors can share them with train_all_models.py and
+benchmark_weighting.py without importing the training driver.
+"""
+import numpy as np
+
+
+def binomial_rows(X, wins, losses):
+    """Aggregated rows as one row per outcome, weighted by how often it happened.
+
+    A matchup with w wins and l losses becomes (x, 'Char1_Wins') with weight w
+    and (x, 'Char2_Wins') with weight l. Since all of a matchup's sets share
+    x, a weighted fit sees the same loss and split statistics as w + l
+    per-set rows (expand_sets()) at the size of the aggregated table.
+    Returns (X, y, sample_weight) without the zero-weight rows.
+    """
+    y = np.repeat(np.array(['Char1_Wins', 'Char2_Wins']), len(X))
+    X = np.concatenate([X, X])
+    weights = np.concatenate([wins, losses]).astype(np.float64)
+    keep = weights > 0
+    return X[keep], y[keep], weights[keep]
+
+
+def expand_sets(X, wins, losses):
+    """One row per set: X repeated and labelled by the winner of each set"""
+    X, y, weights = binomial_rows(X, wins, losses)
+    counts = np.rint(weights).astype(np.int64)
+    return np.repeat(X, counts, axis=0), np.repeat(y, counts)
+
+
+def set_accuracy(pred, wins, losses):
+    """Share of the sets behind the matchups whose winner pred names"""
+    correct = np.where(pred == 'Char1_Wins', wins, losses)
+    return correct.sum() / (wins.sum() + losses.sum())
@@ -0,0 +1,337 @@
+"""
+Typed loader for ultimate_param.csv (per-fighter technical parameters)
+
+The file has three header rows before the fighter rows:
+
+    344/367 (93.73%), , 0x0ef53a098c, ...   coverage, hash40 of each param name
+    , , walk_accel_mul, ...                  internal param names (some unknown)
+    , Description, Walk Maximum ..., ...     human-readable descriptions
+
+and the cells mix plain floats, integers written in hex ('0x3C'),
+TRUE/FALSE flags and text labels ('bust', 'hip'). parse_tech_params()
+classifies every column once and decodes it into compact arrays:
+
+    values   (fighters, numeric columns)  float, hex integers and flags
+    hashes   (fighters, hash columns)     uint64, hex wider than 32 bits
+    labels   (fighters, label columns)    str
+
+load_tech_params() caches the decoded arrays next to the CSV
+(ultimate_param.npz), keyed by a hash of the file contents.
+
+List and search the parameters with:
+    python tech_params.py --search velocity
+"""
+import argparse
+import hashlib
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+HEADER_ROWS = 3
+
+KINDS = ('float', 'hex', 'bool', 'hash', 'label')
+NUMERIC_KINDS = ('float', 'hex', 'bool')
+
+_FLOAT = re.compile(r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_HEX = re.compile(r'0[xX]([0-9A-Fa-f]+)')
+_BOOLS = {'TRUE': 1.0, 'FALSE': 0.0}
+_COVERAGE = re.compile(r'(\d+)\s*/\s*(\d+)')
+
+# Hex cells wider than this many digits are hashes, not small integers
+_MAX_INT_DIGITS = 8
+
+
+def get_data_path(filename):
+    """Find data file in 1_Data_Files or current directory"""
+    script_dir = Path(__file__).parent
+    data_dir = script_dir.parent / "1_Data_Files"
+    if data_dir.exists():
+        file_path = data_dir / filename
+        if file_path.exists():
+            return str(file_path)
+    if Path(filename).exists():
+        return filename
+    return str(data_dir / filename) if data_dir.exists() else filename
+
+
+def classify_column(cells):
+    """Kind of one column from its non-empty cells (see KINDS)"""
+    cells = [cell for cell in cells if cell != '']
+    if all(cell in _BOOLS for cell in cells):
+        return 'bool' if cells else 'float'
+    hex_digits = [len(m.group(1)) for m in map(_HEX.fullmatch, cells) if m]
+    if len(hex_digits) == len(cells):
+        return 'hash' if max(hex_digits) > _MAX_INT_DIGITS else 'hex'
+    if all(_FLOAT.fullmatch(cell) or _HEX.fullmatch(cell) or cell in _BOOLS for cell in cells):
+        return 'float'
+    return 'label'
+
+
+def _decode_number(cell):
+    """Float value of a float, hex or TRUE/FALSE cell (NaN when empty)"""
+    if cell == '':
+        return np.nan
+    if cell in _BOOLS:
+        return _BOOLS[cell]
+    match = _HEX.fullmatch(cell)
+    if match:
+        return float(int(match.group(1), 16))
+    return float(cell)
+
+
+def _decode_hash(cell):
+    """Integer value of a hex cell (0 when empty)"""
+    match = _HEX.fullmatch(cell)
+    return int(match.group(1), 16) if match else 0
+
+
+class TechParams:
+    """Decoded ultimate_param.csv with a column-name index.
+
+    Every column has a unique key: its internal name, or the hex hash of
+    that name when the name is unknown. find() and column() also accept
+    the human-readable descriptions.
+    """
+
+    def __init__(self, fighters, keys, descriptions, param_hashes, kinds,
+                 values, hashes, labels, coverage=(0, 0), content_hash=''):
+        self.fighters = np.asarray(fighters, dtype=str)
+        self.keys = list(keys)
+        self.descriptions = list(descriptions)
+        self.param_hashes = np.asarray(param_hashes, dtype=np.uint64)
+        self.kinds = list(kinds)
+        self.values = values
+        self.hashes = hashes
+        self.labels = labels
+        self.coverage = tuple(int(c) for c in coverage)
+        self.content_hash = content_hash
+
+        # key -> (kind, position in that kind's array)
+        self.index = {}
+        counters = {'numeric': 0, 'hash': 0, 'label': 0}
+        for key, kind in zip(self.keys, self.kinds):
+            group = 'numeric' if kind in NUMERIC_KINDS else kind
+            self.index[key] = (group, counters[group])
+            counters[group] += 1
+
+        # First column with each description, as a header row lookup would find it
+        self._by_description = {}
+        for key, description in zip(self.keys, self.descriptions):
+            if description:
+                self._by_description.setdefault(description, key)
+
+    def __len__(self):
+        return len(self.fighters)
+
+    def key_of(self, name):
+        """Column key for a key or description, or None if unknown"""
+        if name in self.index:
+            return name
+        return self._by_description.get(name)
+
+    def column(self, name):
+        """Decoded values of one column for every fighter"""
+        key = self.key_of(name)
+        if key is None:
+            raise KeyError(name)
+        group, position = self.index[key]
+        array = {'numeric': self.values, 'hash': self.hashes, 'label': self.labels}[group]
+        return array[:, position]
+
+    def find(self, pattern, kinds=None, field='any'):
+        """Keys of columns whose key and/or description contains pattern (case-insensitive).
+
+        field is 'any', 'key' or 'description'; kinds restricts the column kinds.
+        """
+        pattern = pattern.lower()
+        found = []
+        for key, description, kind in zip(self.keys, self.descriptions, self.kinds):
+            if kinds is not None and kind not in kinds:
+                continue
+            in_key = field in ('any', 'key') and pattern in key.lower()
+            in_description = field in ('any', 'description') and pattern in description.lower()
+            if in_key or in_description:
+                found.append(key)
+        return found
+
+    def label_of(self, key):
+        """Description when it identifies the column uniquely, else the key"""
+        position = self.keys.index(key)
+        description = self.descriptions[position]
+        if description and self._by_description.get(description) == key:
+            return description
+        return key
+
+    def frame(self, columns=None, label='description'):
+        """DataFrame of numeric columns with one row per fighter ('fighter' column first).
+
+        Columns are keys or descriptions (default: every numeric column) and
+        are labelled by description where unique, or by key with label='key'.
+        """
+        if columns is None:
+            keys = [key for key, kind in zip(self.keys, self.kinds) if kind in NUMERIC_KINDS]
+        else:
+            keys = [self.key_of(column) for column in columns]
+            missing = [column for column, key in zip(columns, keys) if key is None]
+            if missing:
+                raise KeyError(f"Unknown technical parameters: {missing}")
+        data = {'fighter': self.fighters}
+        for key in keys:
+            group, position = self.index[key]
+            if group != 'numeric':
+                raise ValueError(f"'{key}' is a {self.kinds[self.keys.index(key)]} column, not numeric")
+            data[self.label_of(key) if label == 'description' else key] = self.values[:, position]
+        return pd.DataFrame(data)
+
+    def summary(self):
+        """One row per column: key, description, kind and param hash"""
+        return pd.DataFrame({
+            'key': self.keys,
+            'description': self.descriptions,
+            'kind': self.kinds,
+            'param_hash': [f"0x{h:010x}" if h else '' for h in self.param_hashes.tolist()],
+        })
+
+    def save(self, path):
+        """Write the decoded arrays and the hash of the file they came from"""
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                version=np.int64(CACHE_VERSION),
+                content_hash=np.array(self.content_hash),
+                fighters=self.fighters,
+                keys=np.array(self.keys, dtype=str),
+                descriptions=np.array(self.descriptions, dtype=str),
+                param_hashes=self.param_hashes,
+                kinds=np.array(self.kinds, dtype=str),
+                values=self.values,
+                hashes=self.hashes,
+                labels=self.labels,
+                coverage=np.array(self.coverage, dtype=np.int64),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Read arrays written by save()"""
+        with np.load(path) as cache:
+            if int(cache['version']) != CACHE_VERSION:
+                raise ValueError(f"Unsupported technical parameter cache version in {path}")
+            return cls(cache['fighters'], cache['keys'].tolist(), cache['descriptions'].tolist(),
+                       cache['param_hashes'], cache['kinds'].tolist(), cache['values'],
+                       cache['hashes'], cache['labels'], cache['coverage'].tolist(),
+                       str(cache['content_hash']))
+
+
+def hash_file(path):
+    """SHA-1 of a file's contents"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def parse_tech_params(path, dtype=np.float32):
+    """Classify and decode every column of ultimate_param.csv"""
+    raw = pd.read_csv(path, header=None, dtype=str, keep_default_na=False)
+    header, body = raw.iloc[:HEADER_ROWS], raw.iloc[HEADER_ROWS:]
+
+    coverage = _COVERAGE.search(header.iat[0, 0])
+    coverage = (int(coverage.group(1)), int(coverage.group(2))) if coverage else (0, 0)
+    fighters = body.iloc[:, 1].str.strip().to_numpy(dtype=str)
+
+    keys, descriptions, param_hashes, kinds = [], [], [], []
+    numeric, hashed, labelled = [], [], []
+    for position in range(2, raw.shape[1]):
+        cells = body.iloc[:, position].str.strip().tolist()
+        param_hash = _decode_hash(header.iat[0, position].strip())
+        name = header.iat[1, position].strip()
+        key = name or (f"0x{param_hash:010x}" if param_hash else f"column_{position}")
+
+        kind = classify_column(cells)
+        if kind in NUMERIC_KINDS:
+            numeric.append([_decode_number(cell) for cell in cells])
+        elif kind == 'hash':
+            hashed.append([_decode_hash(cell) for cell in cells])
+        else:
+            labelled.append(cells)
+
+        keys.append(key)
+        descriptions.append(header.iat[2, position].strip())
+        param_hashes.append(param_hash)
+        kinds.append(kind)
+
+    n = len(fighters)
+    values = np.array(numeric, dtype=dtype).T.reshape(n, len(numeric))
+    hashes = np.array(hashed, dtype=np.uint64).T.reshape(n, len(hashed))
+    labels = np.array(labelled, dtype=str).T.reshape(n, len(labelled))
+    return TechParams(fighters, keys, descriptions, param_hashes, kinds,
+                      values, hashes, labels, coverage)
+
+
+def default_cache_path(path):
+    """Binary cache stored next to the CSV"""
+    return Path(path).with_suffix('.npz')
+
+
+def load_tech_params(path=None, cache_path=None, dtype=np.float32):
+    """TechParams for ultimate_param.csv, reusing the binary cache when the file is unchanged"""
+    path = Path(path) if path is not None else Path(get_data_path('ultimate_param.csv'))
+    cache_path = Path(cache_path) if cache_path is not None else default_cache_path(path)
+    content_hash = f"{hash_file(path)}:{np.dtype(dtype).name}"
+
+    if cache_path.exists():
+        try:
+            params = TechParams.load(cache_path)
+        except (ValueError, KeyError, OSError):
+            params = None
+        if params is not None and params.content_hash == content_hash:
+            return params
+
+    params = parse_tech_params(path, dtype)
+    params.content_hash = content_hash
+    params.save(cache_path)
+    return params
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="List and search the technical parameters in ultimate_param.csv")
+    parser.add_argument('--input', default=None,
+                        help="Parameter CSV (defaults to 1_Data_Files/ultimate_param.csv)")
+    parser.add_argument('--search', help="Only show parameters whose name or description contains this")
+    parser.add_argument('--kind', choices=KINDS, help="Only show parameters of this kind")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 70)
+    print("TECHNICAL PARAMETERS")
+    print("=" * 70)
+
+    path = args.input or get_data_path('ultimate_param.csv')
+    print(f"\n1. Loading '{path}'...")
+    params = load_tech_params(path)
+    documented, total = params.coverage
+    print(f"   {len(params)} fighters, {len(params.keys)} parameters "
+          f"({documented}/{total} param names documented)")
+    summary = params.summary()
+    print("   " + ", ".join(f"{kind}: {count}" for kind, count in summary['kind'].value_counts().items()))
+
+    keys = params.find(args.search or '', kinds=[args.kind] if args.kind else None)
+    summary = summary[summary['key'].isin(keys)].copy()
+    numeric = summary['kind'].isin(NUMERIC_KINDS)
+    summary['min'] = np.nan
+    summary['max'] = np.nan
+    for key in summary.loc[numeric, 'key']:
+        column = params.column(key).astype(float)
+        summary.loc[summary['key'] == key, ['min', 'max']] = np.nanmin(column), np.nanmax(column)
+
+    print(f"\n2. {len(summary)} matching parameters:")
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
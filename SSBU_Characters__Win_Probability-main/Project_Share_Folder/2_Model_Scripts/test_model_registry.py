@@ -0,0 +1,48 @@
+"""
+Registering and loading models the way the training scripts do
+
+build_matchup_classifier.py registers its forests with the feature table
+itself as the feature schema and the feature-store key as data_key; the
+predictors load them back by data_key.
+
+    python -m pytest test_model_registry.py
+"""
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from model_registry import load_model, save_model
+
+
+def fit_classifier():
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.normal(size=(40, 3)), columns=['weight_diff', 'speed_diff', 'recovery_diff'])
+    labels = np.where(features['weight_diff'] > 0, 'Char1_Wins', 'Char2_Wins')
+    model = RandomForestClassifier(n_estimators=5, random_state=42).fit(features, labels)
+    return model, features
+
+
+def test_load_returns_the_registered_classifier(tmp_path):
+    model, features = fit_classifier()
+    path = save_model('matchup_classifier_binary', model, features, data_key='abc',
+                      metrics={'accuracy': 0.9}, registry_dir=tmp_path)
+
+    artifact = load_model('matchup_classifier_binary', data_key='abc', registry_dir=tmp_path)
+    assert artifact is not None and artifact.path == path
+    assert artifact.feature_names == list(features.columns)
+    assert artifact.meta['classes'] == ['Char1_Wins', 'Char2_Wins']
+    assert (artifact.model.predict(features) == model.predict(features)).all()
+
+
+def test_load_skips_models_trained_on_other_data(tmp_path):
+    model, features = fit_classifier()
+    save_model('matchup_classifier_binary', model, features, data_key='abc', registry_dir=tmp_path)
+    assert load_model('matchup_classifier_binary', data_key='other', registry_dir=tmp_path) is None
+
+
+def test_load_prefers_the_newest_version(tmp_path):
+    model, features = fit_classifier()
+    save_model('matchup_classifier_tier', model, features, data_key='abc', registry_dir=tmp_path)
+    newest = save_model('matchup_classifier_tier', model, features, data_key='abc', registry_dir=tmp_path)
+    artifact = load_model('matchup_classifier_tier', data_key='abc', registry_dir=tmp_path)
+    assert artifact.path == newest and artifact.version == 2
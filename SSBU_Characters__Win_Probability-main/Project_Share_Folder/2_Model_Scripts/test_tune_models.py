@@ -0,0 +1,39 @@
+"""
+Early stopping of the successive-halving search in tune_models.py
+
+Every trial is stored up front, so successive_halving() never starts the
+process pool and only the stopping rule is exercised.
+
+    python -m pytest test_tune_models.py
+"""
+from tune_models import Budget, TrialStore, successive_halving
+
+RUNGS = [25, 75, 225]
+CONFIGS = [{'max_depth': depth} for depth in (3, 5, 10)]
+
+
+def run_search(tmp_path, best_scores):
+    """Search with the best config scoring best_scores[rung] (the others 0.5);
+    returns the rungs that were scored"""
+    store = TrialStore(tmp_path / 'trials.jsonl')
+    for rung, n_estimators in enumerate(RUNGS):
+        for i, params in enumerate(CONFIGS):
+            for fold in range(2):
+                accuracy = best_scores[rung] if i == 0 else 0.5
+                store.add({'params': params, 'n_estimators': n_estimators, 'fold': fold,
+                           'accuracy': accuracy, 'seconds': 0.0})
+    results = successive_halving('rf', 'binary', CONFIGS, RUNGS, n_folds=2, eta=3, store=store,
+                                 budget=Budget(), pool_args=None)
+    return sorted({row['rung'] for row in results})
+
+
+def test_stops_when_the_best_score_ties(tmp_path):
+    assert run_search(tmp_path, [0.8, 0.8, 0.9]) == [1, 2]
+
+
+def test_stops_when_the_best_score_drops(tmp_path):
+    assert run_search(tmp_path, [0.8, 0.7, 0.9]) == [1, 2]
+
+
+def test_continues_while_the_best_score_improves(tmp_path):
+    assert run_search(tmp_path, [0.7, 0.8, 0.9]) == [1, 2, 3]
@@ -0,0 +1,575 @@
+"""
+Train every model variant in one run on a process pool
+
+Replaces running build_matchup_model.py, build_matchup_classifier.py,
+improve_classifier.py and build_enhanced_classifier.py one after another.
+The pairwise feature tables are loaded once, written as .npy matrices to a
+temporary folder and memory-mapped by every worker, so each job only
+receives its model, target and row indices. All jobs (regressors, three-class
+and binary classifiers, the class-weighted variants and the enhanced forest)
+run concurrently and the results are written to the same files the separate
+scripts produce:
+
+    matchups_with_attributes.csv, matchups_enhanced.csv, model_results.csv,
+    classifier_tier_results.csv, classifier_binary_results.csv,
+    classifier_balanced_results.csv, feature_importance.csv,
+    feature_importance_classifier.csv, feature_importance_enhanced.csv
+
+With --cv every job is instead scored by repeated stratified k-fold
+cross-validation, run in parallel over (job x fold), and the mean and
+standard deviation of each metric are written to cv_results.csv. Fold
+assignments and per-fold scores are cached in 1_Data_Files/feature_store/cv/,
+so --models re-evaluates only the matching jobs and reuses the other scores.
+
+--backend hist swaps the exact gradient boosting models for histogram-binned
+HistGradientBoosting ones (for training sets far larger than the aggregated
+matchups) and adds a boosted enhanced classifier that keeps missing
+technical parameters as NaN instead of filling them with 0.
+
+--weighting games fits every model on the aggregated rows weighted by the
+number of sets behind them, which gives the same fit as one row per set
+(see set_weights.binomial_rows()) without the larger table. Win/loss targets become two
+rows per matchup, one per outcome, weighted by its count; win-rate and tier
+targets are weighted by total_games. Splits stay per matchup, and the
+results gain the set-level set_accuracy / weighted_r2.
+
+The Bradley-Terry job (bradley_terry.py) predicts the win rate from the two
+characters alone and is always fitted from the win counts of its training
+matchups.
+
+    python train_all_models.py            # one worker per CPU
+    python train_all_models.py --jobs 4
+    python train_all_models.py --cv --folds 5 --repeats 3
+    python train_all_models.py --cv --models "random forest"
+    python train_all_models.py --backend hist
+    python train_all_models.py --weighting games
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import (GradientBoostingClassifier, GradientBoostingRegressor,
+                              HistGradientBoostingClassifier, HistGradientBoostingRegressor,
+                              RandomForestClassifier, RandomForestRegressor)
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.metrics import accuracy_score, mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import RepeatedStratifiedKFold, train_test_split
+
+from bradley_terry import PAIR_COLUMNS, BradleyTerryRegressor, character_codes
+from data_store import save_table
+from feature_store import default_store_dir, load_pairwise_features
+from model_registry import save_model
+from set_weights import binomial_rows, set_accuracy
+
+
+def get_data_path(filename):
+    """Find data file in 1_Data_Files or current directory"""
+    script_dir = Path(__file__).parent
+    data_dir = script_dir.parent / "1_Data_Files"
+    if data_dir.exists():
+        file_path = data_dir / filename
+        if file_path.exists():
+            return str(file_path)
+    if Path(filename).exists():
+        return filename
+    return str(data_dir / filename) if data_dir.exists() else filename
+
+
+def classify_matchup_tier(winrate):
+    if winrate >= 0.55:
+        return 'Char1_Advantaged'
+    elif winrate <= 0.45:
+        return 'Char2_Advantaged'
+    else:
+        return 'Even'
+
+
+def classify_matchup_binary(winrate):
+    return 'Char1_Wins' if winrate >= 0.50 else 'Char2_Wins'
+
+
+# Same hyperparameters as the individual scripts. Forests use one core each
+# because the pool already runs one job per core (their results do not
+# depend on n_jobs).
+MODELS = {
+    'linear': lambda: LinearRegression(),
+    'rf_regressor': lambda: RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42, n_jobs=1),
+    'gb_regressor': lambda: GradientBoostingRegressor(n_estimators=100, max_depth=5, random_state=42),
+    # lbfgs fits the multinomial model for three classes, which is what
+    # multi_class='multinomial' asked for before that argument was removed
+    'logistic': lambda: LogisticRegression(max_iter=1000, random_state=42),
+    'rf_classifier': lambda: RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, n_jobs=1),
+    'gb_classifier': lambda: GradientBoostingClassifier(n_estimators=100, max_depth=5, random_state=42),
+    'rf_balanced': lambda: RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42, n_jobs=1,
+                                                  class_weight='balanced'),
+    # Histogram-binned boosting with the same iterations, depth and learning rate
+    'hist_regressor': lambda: HistGradientBoostingRegressor(max_iter=100, max_depth=5, random_state=42),
+    'hist_classifier': lambda: HistGradientBoostingClassifier(max_iter=100, max_depth=5, random_state=42),
+    'hist_balanced': lambda: HistGradientBoostingClassifier(max_iter=100, max_depth=5, random_state=42,
+                                                            class_weight='balanced'),
+    'bradley_terry': lambda: BradleyTerryRegressor(),
+}
+
+# Models fitted from the win counts (as sets-weighted rows) whatever the weighting
+COUNT_MODELS = {'bradley_terry'}
+
+# Exact boosting model -> its histogram counterpart for --backend hist
+HIST_MODELS = {'gb_regressor': 'hist_regressor', 'gb_classifier': 'hist_classifier'}
+
+# Win and loss counts of the rows of each feature matrix, for --weighting games
+COUNT_ARRAYS = {
+    'attrs': ('wins', 'losses'),
+    'pairs': ('wins', 'losses'),
+    'tech': ('tech_wins', 'tech_losses'),
+    'tech_missing': ('tech_wins', 'tech_losses'),
+}
+
+# Targets that say who won, and so can be split into one row per outcome
+BINOMIAL_TARGETS = {'binary', 'tech_binary'}
+
+METRICS = ('accuracy', 'set_accuracy', 'r2', 'weighted_r2', 'rmse')
+
+
+class TrainingJob:
+    """One model fitted on one target of a shared feature matrix"""
+
+    def __init__(self, name, group, model, matrix, target, split, weighting='none'):
+        self.name = name            # row label in the results CSV
+        self.group = group          # results file the job belongs to
+        self.model = model          # key of MODELS
+        self.matrix = matrix        # shared feature matrix
+        self.target = target        # shared target array
+        self.split = split          # train/test row indices
+        self.weighting = weighting  # 'none' or 'games' (rows weighted by sets played)
+
+
+JOBS = [
+    TrainingJob('Linear Regression', 'regression', 'linear', 'attrs', 'winrate', 'regression'),
+    TrainingJob('Random Forest', 'regression', 'rf_regressor', 'attrs', 'winrate', 'regression'),
+    TrainingJob('Gradient Boosting', 'regression', 'gb_regressor', 'attrs', 'winrate', 'regression'),
+    TrainingJob('Bradley-Terry', 'regression', 'bradley_terry', 'pairs', 'winrate', 'regression'),
+    TrainingJob('Logistic Regression (3-class)', 'tier', 'logistic', 'attrs', 'tier', 'tier'),
+    TrainingJob('Random Forest (3-class)', 'tier', 'rf_classifier', 'attrs', 'tier', 'tier'),
+    TrainingJob('Gradient Boosting (3-class)', 'tier', 'gb_classifier', 'attrs', 'tier', 'tier'),
+    TrainingJob('Logistic Regression (binary)', 'binary', 'logistic', 'attrs', 'binary', 'binary'),
+    TrainingJob('Random Forest (binary)', 'binary', 'rf_classifier', 'attrs', 'binary', 'binary'),
+    TrainingJob('Gradient Boosting (binary)', 'binary', 'gb_classifier', 'attrs', 'binary', 'binary'),
+    TrainingJob('Random Forest balanced (3-class)', 'balanced', 'rf_balanced', 'attrs', 'tier', 'tier'),
+    TrainingJob('Random Forest balanced (binary)', 'balanced', 'rf_balanced', 'attrs', 'binary', 'binary'),
+    TrainingJob('Random Forest enhanced (binary)', 'balanced', 'rf_balanced', 'tech', 'tech_binary', 'enhanced'),
+]
+
+
+def make_jobs(backend='exact', weighting='none'):
+    """JOBS, with histogram boosting in place of exact boosting for backend 'hist'
+    and every model fitted on games-weighted rows for weighting 'games'"""
+    jobs = []
+    for job in JOBS:
+        name, model = job.name, job.model
+        if backend == 'hist' and model in HIST_MODELS:
+            name, model = name.replace('Gradient Boosting', 'Histogram Gradient Boosting'), HIST_MODELS[model]
+        jobs.append(TrainingJob(name, job.group, model, job.matrix, job.target, job.split, weighting))
+    if backend == 'hist':
+        # Native missing-value handling: technical parameters are not filled with 0
+        jobs.append(TrainingJob('Histogram Gradient Boosting enhanced (binary)', 'balanced', 'hist_balanced',
+                                'tech_missing', 'tech_binary', 'enhanced', weighting))
+    return jobs
+
+
+RESULT_FILES = {
+    'regression': 'model_results.csv',
+    'tier': 'classifier_tier_results.csv',
+    'binary': 'classifier_binary_results.csv',
+    'balanced': 'classifier_balanced_results.csv',
+}
+
+# (job, output file) of the feature importances each script used to write
+IMPORTANCE_FILES = [
+    ('Random Forest', 'feature_importance.csv'),
+    ('Random Forest (3-class)', 'feature_importance_classifier.csv'),
+    ('Random Forest enhanced (binary)', 'feature_importance_enhanced.csv'),
+]
+
+# Registry names the individual scripts register their forests under
+REGISTERED_MODELS = {
+    'Random Forest': 'matchup_regressor',
+    'Random Forest (3-class)': 'matchup_classifier_tier',
+    'Random Forest (binary)': 'matchup_classifier_binary',
+    'Random Forest enhanced (binary)': 'enhanced_classifier',
+}
+
+
+def split_rows(valid, stratify=None):
+    """Train/test indices into the full table, as train_test_split(X[valid]) draws them"""
+    rows = np.flatnonzero(valid)
+    labels = None if stratify is None else stratify[valid]
+    train, test = train_test_split(rows, test_size=0.2, random_state=42, stratify=labels)
+    return {'train': train, 'test': test}
+
+
+def prepare_data(attrs, tech):
+    """Shared matrices, targets, the splits the individual scripts used and
+    the (valid rows, stratification labels) each split is drawn from"""
+    attr_frame = attrs.frame
+    tech_frame = tech.frame
+    X_attrs = attr_frame[attrs.attribute_features].to_numpy(dtype=np.float64)
+    X_tech = tech_frame[tech.feature_names].to_numpy(dtype=np.float64)
+    winrate = attr_frame['char1_winrate'].to_numpy(dtype=np.float64)
+    tier = np.array([classify_matchup_tier(w) for w in winrate])
+    binary = np.array([classify_matchup_binary(w) for w in winrate])
+    tech_binary = np.array([classify_matchup_binary(w)
+                            for w in tech_frame['char1_winrate'].to_numpy(dtype=np.float64)])
+    wins = attr_frame['char1_wins'].to_numpy(dtype=np.float64)
+    losses = attr_frame['char2_wins'].to_numpy(dtype=np.float64)
+    tech_wins = tech_frame['char1_wins'].to_numpy(dtype=np.float64)
+    tech_losses = tech_frame['char2_wins'].to_numpy(dtype=np.float64)
+
+    complete = ~np.isnan(X_attrs).any(axis=1)
+    # build_enhanced_classifier.py only drops rows without any feature and
+    # fills missing technical parameters with 0
+    tech_valid = ~np.isnan(X_tech).all(axis=1)
+    X_tech_missing = X_tech
+    X_tech = np.nan_to_num(X_tech, nan=0.0)
+
+    arrays = {
+        'attrs': X_attrs, 'tech': X_tech, 'tech_missing': X_tech_missing, 'pairs': character_codes(attr_frame),
+        'winrate': winrate, 'tier': tier, 'binary': binary, 'tech_binary': tech_binary,
+        'wins': wins, 'losses': losses, 'tech_wins': tech_wins, 'tech_losses': tech_losses,
+    }
+    samples = {
+        'regression': (complete & ~np.isnan(winrate), None),
+        'tier': (complete, tier),
+        'binary': (complete, binary),
+        'enhanced': (tech_valid, tech_binary),
+    }
+    splits = {name: split_rows(valid, labels) for name, (valid, labels) in samples.items()}
+    return arrays, splits, samples
+
+
+_shared = {}
+
+
+def _init_worker(array_paths, feature_names, splits):
+    """Memory-map the shared arrays once per worker process"""
+    warnings.filterwarnings('ignore')
+    for name, path in array_paths.items():
+        _shared[name] = np.load(path, mmap_mode='r')
+    _shared['feature_names'] = feature_names
+    _shared['splits'] = splits
+
+
+def _fit_and_score(job, train, test):
+    """Fit a job's model on the train rows and score it on the test rows"""
+    start = time.perf_counter()
+    X = _shared[job.matrix]
+    y = _shared[job.target]
+    columns = _shared['feature_names'][job.matrix]
+    X_train = pd.DataFrame(X[train], columns=columns)
+    X_test = pd.DataFrame(X[test], columns=columns)
+    y_train, y_test = y[train], y[test]
+
+    model = MODELS[job.model]()
+    if job.weighting == 'games' or job.model in COUNT_MODELS:
+        wins, losses = (_shared[name] for name in COUNT_ARRAYS[job.matrix])
+        if job.target in BINOMIAL_TARGETS:
+            X_rows, y_train, weights = binomial_rows(X[train], wins[train], losses[train])
+            X_train = pd.DataFrame(X_rows, columns=columns)
+        else:
+            weights = wins[train] + losses[train]
+        model.fit(X_train, y_train, sample_weight=weights)
+    else:
+        model.fit(X_train, y_train)
+    pred = model.predict(X_test)
+
+    if job.group == 'regression':
+        mse = mean_squared_error(y_test, pred)
+        metrics = {'model': job.name, 'r2': r2_score(y_test, pred), 'rmse': np.sqrt(mse),
+                   'mae': mean_absolute_error(y_test, pred)}
+        if job.weighting == 'games':
+            metrics['weighted_r2'] = r2_score(y_test, pred, sample_weight=wins[test] + losses[test])
+    else:
+        metrics = {'model': job.name, 'accuracy': accuracy_score(y_test, pred)}
+        if job.weighting == 'games' and job.target in BINOMIAL_TARGETS:
+            metrics['set_accuracy'] = set_accuracy(pred, wins[test], losses[test])
+    return model, metrics, time.perf_counter() - start
+
+
+def run_job(job):
+    """Fit and evaluate one job on its hold-out split; returns (model, metrics, n_train, seconds)"""
+    split = _shared['splits'][job.split]
+    model, metrics, seconds = _fit_and_score(job, split['train'], split['test'])
+    return model, metrics, len(split['train']), seconds
+
+
+def shared_array(name):
+    """A memory-mapped array in a pool worker"""
+    return _shared[name]
+
+
+def fold_rows(split, repeat, fold):
+    """Train and test rows of one cross-validation fold in a pool worker"""
+    fold_ids = _shared[f"folds_{split}"][repeat]
+    return np.flatnonzero((fold_ids >= 0) & (fold_ids != fold)), np.flatnonzero(fold_ids == fold)
+
+
+def run_fold(job, repeat, fold):
+    """Fit and evaluate one job on one cross-validation fold; returns (metrics, seconds)"""
+    train, test = fold_rows(job.split, repeat, fold)
+    _, metrics, seconds = _fit_and_score(job, train, test)
+    return metrics, seconds
+
+
+def run_on_pool(workers, arrays, feature_names, splits, function, tasks):
+    """Yield (task, function(*task)) as tasks finish on a pool sharing the arrays"""
+    with tempfile.TemporaryDirectory(prefix='train_all_') as tmp_dir:
+        array_paths = {}
+        for name, array in arrays.items():
+            array_paths[name] = os.path.join(tmp_dir, f"{name}.npy")
+            np.save(array_paths[name], array)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(array_paths, feature_names, splits)) as executor:
+            futures = {executor.submit(function, *task): task for task in tasks}
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                # A caller that stops early (e.g. out of budget) drops the queued tasks
+                executor.shutdown(cancel_futures=True)
+
+
+def cv_folds(valid, labels, n_splits, n_repeats, cache_path):
+    """Fold number of every row in each repeat (-1 for rows not used), cached on disk"""
+    if cache_path.exists():
+        folds = np.load(cache_path)
+        if folds.shape == (n_repeats, len(valid)):
+            return folds
+
+    rows = np.flatnonzero(valid)
+    folds = np.full((n_repeats, len(valid)), -1, dtype=np.int16)
+    splitter = RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=42)
+    for i, (_, test) in enumerate(splitter.split(rows, labels[valid])):
+        folds[i // n_splits, rows[test]] = i % n_splits
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, folds)
+    os.replace(tmp_path, cache_path)
+    return folds
+
+
+def remove_stale(cache_path):
+    """Delete older versions of a cache file (same name up to the trailing key)"""
+    base = cache_path.stem.rsplit('_', 1)[0]
+    for stale in cache_path.parent.glob(f"{base}_*{cache_path.suffix}"):
+        if stale != cache_path and stale.stem.rsplit('_', 1)[0] == base:
+            stale.unlink(missing_ok=True)
+
+
+def score_cache_path(cache_dir, job, folds_name):
+    """Per-fold score file of a job; the name changes with the data, folds or model"""
+    spec = {'model': repr(MODELS[job.model]()), 'matrix': job.matrix,
+            'target': job.target, 'folds': folds_name}
+    if job.weighting != 'none':
+        spec['weighting'] = job.weighting
+    digest = hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+    slug = re.sub(r'[^a-z0-9]+', '_', job.name.lower()).strip('_')
+    return cache_dir / f"scores_{slug}_{digest}.csv"
+
+
+def assign_folds(arrays, samples, data_keys, cache_dir, n_splits, n_repeats):
+    """Add the cached folds of every split to arrays; returns their cache names"""
+    folds_names = {}
+    for name, (valid, labels) in samples.items():
+        # The regression folds are stratified by matchup tier
+        labels = arrays['tier'] if labels is None else labels
+        data_key = data_keys['tech' if name == 'enhanced' else 'attrs']
+        folds_names[name] = f"folds_{name}_{n_splits}x{n_repeats}_{data_key[:16]}"
+        cache_path = cache_dir / f"{folds_names[name]}.npy"
+        cached = cache_path.exists()
+        arrays[f"folds_{name}"] = cv_folds(valid, labels, n_splits, n_repeats, cache_path)
+        remove_stale(cache_path)
+        print(f"   {name}: {int(valid.sum())} rows ({'cached' if cached else 'assigned'})")
+    return folds_names
+
+
+def cross_validate(args, jobs, arrays, samples, feature_names, data_keys, cache_dir):
+    """Repeated stratified k-fold scores of every job, reusing cached folds and scores"""
+    n_splits, n_repeats = args.folds, args.repeats
+
+    print(f"\n2. Assigning {n_repeats} x {n_splits} stratified folds...")
+    folds_names = assign_folds(arrays, samples, data_keys, cache_dir, n_splits, n_repeats)
+
+    selected = [pattern.lower() for pattern in args.models or []]
+    scores, tasks = {}, []
+    for job in jobs:
+        path = score_cache_path(cache_dir, job, folds_names[job.split])
+        refit = any(pattern in job.name.lower() for pattern in selected)
+        if path.exists() and not refit:
+            scores[job.name] = pd.read_csv(path, float_precision='round_trip')
+        else:
+            tasks += [(job, repeat, fold) for repeat in range(n_repeats) for fold in range(n_splits)]
+
+    workers = args.jobs or os.cpu_count() or 1
+    refit_jobs = list(dict.fromkeys(job.name for job, _, _ in tasks))
+    print(f"\n3. Fitting {len(tasks)} folds of {len(refit_jobs)} models on {workers} worker(s) "
+          f"({len(scores)} models cached)...")
+    new_scores = {name: [] for name in refit_jobs}
+    for (job, repeat, fold), (metrics, seconds) in run_on_pool(
+            workers, arrays, feature_names, {}, run_fold, tasks):
+        metrics = {key: value for key, value in metrics.items() if key != 'model'}
+        new_scores[job.name].append({'repeat': repeat, 'fold': fold, **metrics, 'seconds': seconds})
+    for job in jobs:
+        if job.name in new_scores:
+            scores[job.name] = pd.DataFrame(new_scores[job.name]).sort_values(['repeat', 'fold'])
+            path = score_cache_path(cache_dir, job, folds_names[job.split])
+            scores[job.name].to_csv(path, index=False)
+            remove_stale(path)
+            seconds = scores[job.name]['seconds'].sum()
+            print(f"   Done: {job.name} ({seconds:.2f}s)")
+
+    print("\n4. Cross-validation summary:")
+    rows = []
+    print(f"   {'Model':<46} {'Metric':>12} {'Mean':>8} {'Std':>8}")
+    for job in jobs:
+        fold_scores = scores[job.name]
+        row = {'model': job.name, 'folds': len(fold_scores)}
+        for metric in METRICS:
+            if metric in fold_scores:
+                row[f"{metric}_mean"] = fold_scores[metric].mean()
+                row[f"{metric}_std"] = fold_scores[metric].std()
+                print(f"   {job.name:<46} {metric:>12} {row[f'{metric}_mean']:>8.4f} {row[f'{metric}_std']:>8.4f}")
+        rows.append(row)
+    present = [metric for metric in METRICS if any(f"{metric}_mean" in row for row in rows)]
+    columns = ['model', 'folds'] + [f"{metric}_{stat}" for metric in present for stat in ('mean', 'std')]
+    pd.DataFrame(rows, columns=columns).to_csv('cv_results.csv', index=False)
+    print("\n   Saved cv_results.csv")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train all matchup models in parallel")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--backend', choices=['exact', 'hist'], default='exact',
+                        help="Gradient boosting implementation (default: exact)")
+    parser.add_argument('--weighting', choices=['none', 'games'], default='none',
+                        help="Weight each matchup by the sets behind it (default: none)")
+    parser.add_argument('--cv', action='store_true',
+                        help="Score every model by repeated stratified k-fold instead of one split")
+    parser.add_argument('--folds', type=int, default=5, help="Folds per repeat (default: 5)")
+    parser.add_argument('--repeats', type=int, default=3, help="Cross-validation repeats (default: 3)")
+    parser.add_argument('--models', nargs='+', default=None, metavar='NAME',
+                        help="Re-evaluate only models whose name contains NAME; others reuse cached scores")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    warnings.filterwarnings('ignore')
+    total_start = time.perf_counter()
+
+    print("=" * 70)
+    print("TRAINING ALL MATCHUP MODELS")
+    print("=" * 70)
+
+    # 1. Feature tables, built once for every job
+    print("\n1. Loading pairwise features...")
+    matchups_path = get_data_path('character_matchups.csv')
+    smash_path = get_data_path('smash.csv')
+    attrs = load_pairwise_features(matchups_path, smash_path)
+    tech = load_pairwise_features(matchups_path, smash_path, get_data_path('ultimate_param.csv'))
+    for label, features in (('Attribute', attrs), ('Technical', tech)):
+        print(f"   {label} table: {len(features.frame)} matchups, {len(features.feature_names)} features "
+              f"({'reused' if features.cached else 'built'} {features.key[:12]})")
+
+    arrays, splits, samples = prepare_data(attrs, tech)
+    feature_names = {'attrs': attrs.attribute_features, 'tech': tech.feature_names,
+                     'tech_missing': tech.feature_names, 'pairs': PAIR_COLUMNS}
+    jobs = make_jobs(args.backend, args.weighting)
+    data_keys = {'attrs': attrs.key, 'tech': tech.key}
+
+    if args.cv:
+        cache_dir = default_store_dir(matchups_path) / 'cv'
+        cross_validate(args, jobs, arrays, samples, feature_names, data_keys, cache_dir)
+        print(f"\n   Wall time {time.perf_counter() - total_start:.2f}s")
+        print("\n" + "=" * 70)
+        print("CROSS-VALIDATION COMPLETE!")
+        print("=" * 70)
+        return
+
+    # 2. Run every job against the memory-mapped matrices
+    workers = args.jobs or os.cpu_count() or 1
+    print(f"\n2. Training {len(jobs)} models on {workers} worker(s)...")
+    results = {}
+    for (job,), result in run_on_pool(workers, arrays, feature_names, splits, run_job,
+                                      [(job,) for job in jobs]):
+        results[job.name] = result
+        print(f"   Done: {job.name} ({result[3]:.2f}s)")
+
+    # 3. Results tables, in the row order of the individual scripts
+    print("\n3. Saving results...")
+    attr_frame = attrs.frame
+    tech_frame = tech.frame.copy()
+    tech_frame['matchup_binary'] = tech_frame['char1_winrate'].apply(classify_matchup_binary)
+    save_table(attr_frame, 'matchups_with_attributes.csv')
+    save_table(tech_frame, 'matchups_enhanced.csv')
+    saved = ['matchups_with_attributes.csv', 'matchups_enhanced.csv']
+
+    for group, filename in RESULT_FILES.items():
+        rows = [results[job.name][1] for job in jobs if job.group == group]
+        pd.DataFrame(rows).to_csv(filename, index=False)
+        saved.append(filename)
+
+    for job_name, filename in IMPORTANCE_FILES:
+        job = next(job for job in jobs if job.name == job_name)
+        model = results[job_name][0]
+        pd.DataFrame({
+            'feature': feature_names[job.matrix],
+            'importance': model.feature_importances_
+        }).sort_values('importance', ascending=False).to_csv(filename, index=False)
+        saved.append(filename)
+
+    for job_name, registry_name in REGISTERED_MODELS.items():
+        job = next(job for job in jobs if job.name == job_name)
+        model, metrics, n_train, _ = results[job_name]
+        metrics = {key: value for key, value in metrics.items() if key != 'model'}
+        extra = {'tech_features': tech.tech_columns} if job.matrix == 'tech' else {}
+        if job.weighting != 'none':
+            extra['weighting'] = job.weighting
+        save_model(registry_name, model, feature_names[job.matrix], data_key=data_keys[job.matrix],
+                   metrics={**metrics, 'n_train': n_train}, extra=extra)
+
+    print("   Saved files:")
+    for filename in saved:
+        print(f"     - {filename}")
+    print(f"   Registered models: {', '.join(REGISTERED_MODELS.values())}")
+
+    # 4. Per-job timing
+    print("\n4. Job summary:")
+    print(f"   {'Model':<46} {'Score':>14} {'Time':>8}")
+    for job in jobs:
+        _, metrics, _, seconds = results[job.name]
+        score = (f"accuracy {metrics['accuracy']:.4f}" if 'accuracy' in metrics
+                 else f"r2 {metrics['r2']:.4f}")
+        print(f"   {job.name:<46} {score:>14} {seconds:>7.2f}s")
+    fit_seconds = sum(result[3] for result in results.values())
+    wall_seconds = time.perf_counter() - total_start
+    print(f"\n   Total fit time {fit_seconds:.2f}s, wall time {wall_seconds:.2f}s")
+
+    print("\n" + "=" * 70)
+    print("ALL MODELS TRAINED!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Budgeted hyperparameter search for the random forest and gradient boosting classifiers
+
+Every model script uses n_estimators=100 with max_depth=10 (forest) or 5
+(boosting). This searches depth, leaf size and (for boosting) learning rate
+by successive halving with the number of trees as the resource: all sampled
+configurations are scored with few trees, only the best 1/eta of them get
+eta times as many, and so on up to --max-estimators. The current default
+configuration is always one of the candidates.
+
+Each trial (configuration, trees, fold) is one task on the train_all_models
+process pool, scored by accuracy on the cached stratified folds. The search
+stops early when more trees stop improving the best score, or when the
+wall-clock (--time-budget) or summed fit-time (--cpu-budget) budget runs
+out, and reports the best (configuration, trees) scored so far.
+
+Every finished trial is appended to
+1_Data_Files/feature_store/tuning/trials_<model>_<target>_<folds>_<key>.jsonl, so an
+interrupted search resumes where it stopped and configurations that were
+already scored are never refit. Results go to tuning_results.csv.
+
+    python tune_models.py --model rf gb --target binary
+    python tune_models.py --model gb --time-budget 300
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score
+
+from feature_store import default_store_dir, load_pairwise_features
+from train_all_models import (assign_folds, fold_rows, get_data_path, prepare_data, run_on_pool,
+                              shared_array)
+
+# Search spaces; the resource (n_estimators) is set by the halving schedule
+SEARCH_SPACES = {
+    'rf': {
+        'max_depth': [5, 10, 15, 20, None],
+        'min_samples_leaf': [1, 2, 5, 10],
+    },
+    'gb': {
+        'max_depth': [2, 3, 5, 7],
+        'min_samples_leaf': [1, 5, 10, 20],
+        'learning_rate': [0.03, 0.1, 0.3],
+    },
+}
+
+# Configurations the model scripts use today
+DEFAULTS = {
+    'rf': {'max_depth': 10, 'min_samples_leaf': 1},
+    'gb': {'max_depth': 5, 'min_samples_leaf': 1, 'learning_rate': 0.1},
+}
+
+ESTIMATORS = {
+    'rf': lambda **params: RandomForestClassifier(random_state=42, n_jobs=1, **params),
+    'gb': lambda **params: GradientBoostingClassifier(random_state=42, **params),
+}
+
+# Target -> (feature matrix, target array, split) in train_all_models.prepare_data()
+TARGETS = {
+    'binary': ('attrs', 'binary', 'binary'),
+    'tier': ('attrs', 'tier', 'tier'),
+    'enhanced': ('tech', 'tech_binary', 'enhanced'),
+}
+
+
+def config_key(params):
+    """Canonical text of a configuration, used to recognise repeated trials"""
+    return json.dumps(params, sort_keys=True)
+
+
+def sample_configs(model, n_configs, seed=42):
+    """Up to n_configs configurations of the grid, always including the default"""
+    space = SEARCH_SPACES[model]
+    names = sorted(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    rng = np.random.default_rng(seed)
+    configs = [DEFAULTS[model]]
+    for i in rng.permutation(len(grid)):
+        if len(configs) >= n_configs:
+            break
+        if config_key(grid[i]) != config_key(DEFAULTS[model]):
+            configs.append(grid[i])
+    return configs
+
+
+def halving_schedule(min_resource, max_resource, eta):
+    """Tree counts of the successive-halving rungs"""
+    rungs = []
+    resource = min_resource
+    while resource < max_resource:
+        rungs.append(resource)
+        resource *= eta
+    rungs.append(max_resource)
+    return rungs
+
+
+class TrialStore:
+    """Append-only JSON-lines log of finished trials"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.trials = {}
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        trial = json.loads(line)
+                    except ValueError:
+                        continue  # Partial last line of an interrupted run
+                    self.trials[self.key(trial['params'], trial['n_estimators'], trial['fold'])] = trial
+
+    @staticmethod
+    def key(params, n_estimators, fold):
+        return (config_key(params), n_estimators, fold)
+
+    def get(self, params, n_estimators, fold):
+        return self.trials.get(self.key(params, n_estimators, fold))
+
+    def add(self, trial):
+        self.trials[self.key(trial['params'], trial['n_estimators'], trial['fold'])] = trial
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(trial) + '\n')
+
+
+def run_trial(model, target, params, n_estimators, fold):
+    """Fit one configuration on one fold in a pool worker; returns (accuracy, seconds)"""
+    start = time.perf_counter()
+    matrix, target_name, split = TARGETS[target]
+    X = shared_array(matrix)
+    y = shared_array(target_name)
+    train, test = fold_rows(split, 0, fold)
+    estimator = ESTIMATORS[model](n_estimators=n_estimators, **params)
+    estimator.fit(X[train], y[train])
+    accuracy = accuracy_score(y[test], estimator.predict(X[test]))
+    return accuracy, time.perf_counter() - start
+
+
+class Budget:
+    """Wall-clock and summed fit-time limits (None means unlimited)"""
+
+    def __init__(self, wall_seconds=None, cpu_seconds=None):
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.start = time.perf_counter()
+        self.cpu_used = 0.0
+
+    def exhausted(self):
+        if self.wall_seconds is not None and time.perf_counter() - self.start >= self.wall_seconds:
+            return True
+        return self.cpu_seconds is not None and self.cpu_used >= self.cpu_seconds
+
+
+def successive_halving(model, target, configs, rungs, n_folds, eta, store, budget, pool_args,
+                       early_stop=True):
+    """Score configs rung by rung, keeping the best 1/eta; returns per-(config, rung) scores"""
+    results = []
+    survivors = list(configs)
+    previous_best = None
+    for rung, n_estimators in enumerate(rungs):
+        tasks = [(model, target, params, n_estimators, fold)
+                 for params in survivors for fold in range(n_folds)
+                 if store.get(params, n_estimators, fold) is None]
+        reused = len(survivors) * n_folds - len(tasks)
+        print(f"   Rung {rung + 1}: {len(survivors)} configs x {n_estimators} trees "
+              f"({len(tasks)} fits, {reused} reused)")
+
+        stopped = False
+        if tasks and budget.exhausted():
+            stopped = True
+        elif tasks:
+            for (_, _, params, _, fold), (accuracy, seconds) in run_on_pool(
+                    *pool_args, run_trial, tasks):
+                store.add({'params': params, 'n_estimators': n_estimators, 'fold': fold,
+                           'accuracy': accuracy, 'seconds': seconds})
+                budget.cpu_used += seconds
+                if budget.exhausted():
+                    stopped = True
+                    break
+
+        # Rank the configurations that have every fold scored at this rung
+        scored = []
+        for params in survivors:
+            trials = [store.get(params, n_estimators, fold) for fold in range(n_folds)]
+            if all(trial is not None for trial in trials):
+                scores = [trial['accuracy'] for trial in trials]
+                scored.append((np.mean(scores), params))
+                results.append({'model': model, 'target': target, 'rung': rung + 1,
+                                'n_estimators': n_estimators, 'params': config_key(params), 'folds': n_folds,
+                                'accuracy_mean': np.mean(scores), 'accuracy_std': np.std(scores, ddof=1)})
+        if stopped:
+            print("   Budget exhausted, stopping the search")
+            break
+        scored.sort(key=lambda item: -item[0])
+        # A rung that only ties the previous best is not an improvement either
+        if early_stop and previous_best is not None and scored and scored[0][0] <= previous_best:
+            print("   More trees no longer improve the best score, stopping early")
+            break
+        previous_best = scored[0][0] if scored else previous_best
+        survivors = [params for _, params in scored[:max(1, len(scored) // eta)]]
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Successive-halving search over RF/GB hyperparameters")
+    parser.add_argument('--model', nargs='+', choices=sorted(SEARCH_SPACES), default=['rf', 'gb'])
+    parser.add_argument('--target', choices=sorted(TARGETS), default='binary')
+    parser.add_argument('--configs', type=int, default=27, help="Configurations sampled per model (default: 27)")
+    parser.add_argument('--min-estimators', type=int, default=25, help="Trees in the first rung (default: 25)")
+    parser.add_argument('--max-estimators', type=int, default=400, help="Trees in the last rung (default: 400)")
+    parser.add_argument('--eta', type=int, default=3, help="Keep 1/eta of the configs per rung (default: 3)")
+    parser.add_argument('--folds', type=int, default=3, help="Stratified folds per trial (default: 3)")
+    parser.add_argument('--time-budget', type=float, default=None, help="Wall-clock limit in seconds")
+    parser.add_argument('--cpu-budget', type=float, default=None, help="Limit on summed fit time in seconds")
+    parser.add_argument('--no-early-stop', action='store_true',
+                        help="Run every rung even when more trees stop improving the best score")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    print("=" * 70)
+    print("HYPERPARAMETER SEARCH (SUCCESSIVE HALVING)")
+    print("=" * 70)
+
+    # 1. Shared feature matrices and folds, as in train_all_models.py --cv
+    print("\n1. Loading pairwise features and folds...")
+    matchups_path = get_data_path('character_matchups.csv')
+    smash_path = get_data_path('smash.csv')
+    attrs = load_pairwise_features(matchups_path, smash_path)
+    tech = load_pairwise_features(matchups_path, smash_path, get_data_path('ultimate_param.csv'))
+    arrays, _, samples = prepare_data(attrs, tech)
+    feature_names = {'attrs': attrs.attribute_features, 'tech': tech.feature_names}
+    data_keys = {'attrs': attrs.key, 'tech': tech.key}
+    store_dir = default_store_dir(matchups_path)
+    split = TARGETS[args.target][2]
+    folds_names = assign_folds(arrays, {split: samples[split]}, data_keys, store_dir / 'cv', args.folds, 1)
+
+    workers = args.jobs or os.cpu_count() or 1
+    pool_args = (workers, arrays, feature_names, {})
+    rungs = halving_schedule(args.min_estimators, args.max_estimators, args.eta)
+    budget = Budget(args.time_budget, args.cpu_budget)
+
+    # 2. One halving run per model
+    results = []
+    for step, model in enumerate(args.model, start=2):
+        configs = sample_configs(model, args.configs)
+        # Named after the folds, so new data or fold counts start a new log
+        store = TrialStore(store_dir / 'tuning' / f"trials_{model}_{folds_names[split][len('folds_'):]}.jsonl")
+        print(f"\n{step}. Searching {model} on {args.target}: {len(configs)} configs, "
+              f"trees {rungs}, {workers} worker(s), {len(store.trials)} stored trials")
+        results += successive_halving(model, args.target, configs, rungs, args.folds, args.eta,
+                                      store, budget, pool_args, early_stop=not args.no_early_stop)
+
+    # Results: best (configuration, trees) per model over all rungs
+    step = len(args.model) + 2
+    print(f"\n{step}. Best configurations:")
+    results_df = pd.DataFrame(results)
+    if results_df.empty:
+        print("   No configuration finished within the budget")
+        return
+    results_df = results_df.sort_values(['model', 'accuracy_mean'], ascending=[True, False])
+    results_df.to_csv('tuning_results.csv', index=False)
+    for model in args.model:
+        model_results = results_df[results_df['model'] == model]
+        if model_results.empty:
+            continue
+        best = model_results.iloc[0]
+        default = model_results[model_results['params'] == config_key(DEFAULTS[model])]
+        print(f"   {model}: {best['params']}, {int(best['n_estimators'])} trees -> "
+              f"accuracy {best['accuracy_mean']:.4f} +/- {best['accuracy_std']:.4f}")
+        if not default.empty:
+            print(f"       default config: {default.iloc[0]['accuracy_mean']:.4f} "
+                  f"at {int(default.iloc[0]['n_estimators'])} trees")
+    print(f"\n   Saved tuning_results.csv (fit time {budget.cpu_used:.1f}s, "
+          f"wall time {time.perf_counter() - budget.start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ from bs4 import BeautifulSoup
 URL = "https://ultimateframedata.com/stats"
 
 # Alias map to normalize tricky names for later joins (Need to add more to this) 
+# Kept separate from the model scripts' roster: that one folds Pyra, Mythra and
+# Pyra & Mythra into a single fighter, while UFD lists their frame data apart
 ALIASES = {
     "r.o.b": "ROB", "rob": "ROB", "r o b": "ROB",
     "mr game & watch": "Mr. Game & Watch", "mr game and watch": "Mr. Game & Watch",